@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('product', '0017_productvariant_is_hot_sku'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductDailyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('orders', models.PositiveIntegerField(default=0, help_text='Number of the orders placed')),
+                ('units_sold', models.PositiveIntegerField(default=0, help_text='Number of the units of the delivered orders')),
+                ('revenue', models.BigIntegerField(default=0, help_text='Total price of the delivered orders')),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_facts', to='product.product')),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='product_daily_facts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('seller', 'day', 'product'), include=('views', 'orders', 'units_sold', 'revenue', 'rating_sum', 'rating_count'), name='product_fact_seller_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SellerDailyFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('orders', models.PositiveIntegerField(default=0, help_text='Number of the orders placed')),
+                ('units_sold', models.PositiveIntegerField(default=0, help_text='Number of the units of the delivered orders')),
+                ('revenue', models.BigIntegerField(default=0, help_text='Total price of the delivered orders')),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('seller', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_facts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('seller', 'day'), include=('views', 'orders', 'units_sold', 'revenue', 'rating_sum', 'rating_count'), name='seller_fact_seller_day_uniq')],
+            },
+        ),
+    ]
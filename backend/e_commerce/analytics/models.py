@@ -0,0 +1,76 @@
+from django.db import models
+from ecom_user.models import EcomUser
+from product.models import Product
+
+FACT_MEASURES = [
+    "views",
+    "orders",
+    "units_sold",
+    "revenue",
+    "rating_sum",
+    "rating_count",
+]
+
+
+class FactMeasures(models.Model):
+    """
+    The measures of the seller analytics facts of a day, which are added up by
+    the rollups of the order transitions, the reviews and the flushed view
+    counts (refer to `analytics.services.facts`).
+    """
+
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    orders = models.PositiveIntegerField(
+        default=0, help_text="Number of the orders placed"
+    )
+    units_sold = models.PositiveIntegerField(
+        default=0, help_text="Number of the units of the delivered orders"
+    )
+    revenue = models.BigIntegerField(
+        default=0, help_text="Total price of the delivered orders"
+    )
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SellerDailyFact(FactMeasures):
+    seller = models.ForeignKey(
+        EcomUser, on_delete=models.DO_NOTHING, related_name="daily_facts"
+    )
+
+    class Meta:
+        # the measures are included in the index, so the facts of any range
+        # are read by an index-only scan
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "day"],
+                include=FACT_MEASURES,
+                name="seller_fact_seller_day_uniq",
+            ),
+        ]
+
+
+class ProductDailyFact(FactMeasures):
+    seller = models.ForeignKey(
+        EcomUser, on_delete=models.DO_NOTHING, related_name="product_daily_facts"
+    )
+    # the facts outlive the deleted products
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="daily_facts",
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["seller", "day", "product"],
+                include=FACT_MEASURES,
+                name="product_fact_seller_day_uniq",
+            ),
+        ]
@@ -0,0 +1,50 @@
+from financeops.services.settlement import DAY, REPORT_PERIODS
+from rest_framework import serializers
+
+from analytics.services.dashboard import TOP_PRODUCTS_LIMIT, TOP_PRODUCTS_ORDERINGS
+
+
+class SellerAnalyticsQuerySerializer(serializers.Serializer):
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    period = serializers.ChoiceField(choices=list(REPORT_PERIODS), default=DAY)
+    top_products_by = serializers.ChoiceField(
+        choices=TOP_PRODUCTS_ORDERINGS, default="revenue"
+    )
+    top_products_limit = serializers.IntegerField(
+        min_value=1, max_value=50, default=TOP_PRODUCTS_LIMIT
+    )
+    seller = serializers.IntegerField(
+        required=False, help_text="Only for the admins, the sellers get their own analytics"
+    )
+
+    def validate(self, attrs):
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from should not be after date_to.")
+        return attrs
+
+
+class AnalyticsMetricsSerializer(serializers.Serializer):
+    views = serializers.IntegerField()
+    orders = serializers.IntegerField()
+    units_sold = serializers.IntegerField()
+    revenue = serializers.IntegerField()
+    conversion_rate = serializers.FloatField(allow_null=True)
+    rating_avg = serializers.FloatField(allow_null=True)
+
+
+class AnalyticsPeriodSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    metrics = AnalyticsMetricsSerializer()
+
+
+class TopProductSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    name = serializers.CharField(allow_null=True)
+    metrics = AnalyticsMetricsSerializer()
+
+
+class SellerAnalyticsSerializer(serializers.Serializer):
+    totals = AnalyticsMetricsSerializer()
+    series = AnalyticsPeriodSerializer(many=True)
+    top_products = TopProductSerializer(many=True)
@@ -0,0 +1,115 @@
+"""
+The seller analytics dashboard, read from the daily facts of the sellers and
+their products (refer to `analytics.services.facts`).
+
+Both the time series and the top products are aggregated from the facts of the
+range, which are read by index-only scans of their covering indexes.
+"""
+
+from datetime import date
+from typing import NamedTuple, Optional
+
+from django.db.models import F, Sum
+from financeops.services.settlement import DAY, REPORT_PERIODS
+from product.models import Product
+
+from analytics.models import FACT_MEASURES, ProductDailyFact, SellerDailyFact
+
+TOP_PRODUCTS_LIMIT = 10
+TOP_PRODUCTS_ORDERINGS = ["revenue", "units_sold", "orders", "views"]
+
+
+class AnalyticsMetrics(NamedTuple):
+    views: int
+    orders: int
+    units_sold: int
+    revenue: int
+    conversion_rate: Optional[float]  # orders per view
+    rating_avg: Optional[float]
+
+
+class AnalyticsPeriod(NamedTuple):
+    period: date
+    metrics: AnalyticsMetrics
+
+
+class TopProduct(NamedTuple):
+    product_id: int
+    name: Optional[str]
+    metrics: AnalyticsMetrics
+
+
+class SellerAnalytics(NamedTuple):
+    totals: AnalyticsMetrics
+    series: list[AnalyticsPeriod]
+    top_products: list[TopProduct]
+
+
+def _sum_measures() -> dict:
+    return {f"total_{measure}": Sum(measure) for measure in FACT_MEASURES}
+
+
+def _get_metrics(totals: dict) -> AnalyticsMetrics:
+    measures = {measure: totals[f"total_{measure}"] or 0 for measure in FACT_MEASURES}
+    views, orders = measures["views"], measures["orders"]
+    rating_count = measures["rating_count"]
+    return AnalyticsMetrics(
+        views=views,
+        orders=orders,
+        units_sold=measures["units_sold"],
+        revenue=measures["revenue"],
+        conversion_rate=orders / views if views else None,
+        rating_avg=measures["rating_sum"] / rating_count if rating_count else None,
+    )
+
+
+def get_seller_analytics(
+    seller_id: int,
+    date_from: date,
+    date_to: date,
+    period: str = DAY,
+    top_products_by: str = "revenue",
+    top_products_limit: int = TOP_PRODUCTS_LIMIT,
+) -> SellerAnalytics:
+    """
+    Return the seller's metrics within the date range (inclusive) in total and
+    per period (day, week or month), along with the seller's top products.
+    """
+    seller_facts = SellerDailyFact.objects.filter(
+        seller_id=seller_id, day__range=(date_from, date_to)
+    )
+    truncate = REPORT_PERIODS[period]
+    series = (
+        seller_facts.annotate(period=truncate("day") if truncate else F("day"))
+        .values("period")
+        .annotate(**_sum_measures())
+        .order_by("period")
+    )
+    top_products = list(
+        ProductDailyFact.objects.filter(
+            seller_id=seller_id, day__range=(date_from, date_to)
+        )
+        .values("product_id")
+        .annotate(**_sum_measures())
+        .order_by(F(f"total_{top_products_by}").desc(), "product_id")[:top_products_limit]
+    )
+    names = dict(
+        Product.objects.filter(
+            id__in=[product["product_id"] for product in top_products]
+        ).values_list("id", "name")
+    )
+    return SellerAnalytics(
+        totals=_get_metrics(seller_facts.aggregate(**_sum_measures())),
+        series=[
+            AnalyticsPeriod(measures["period"], _get_metrics(measures))
+            for measures in series
+        ],
+        top_products=[
+            TopProduct(
+                product["product_id"],
+                names.get(product["product_id"]),
+                _get_metrics(product),
+            )
+            for product in top_products
+        ],
+    )
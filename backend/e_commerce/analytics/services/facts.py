@@ -0,0 +1,172 @@
+"""
+The facts of the seller analytics (refer to `SellerDailyFact` and `ProductDailyFact`).
+
+The facts are fed incrementally, from the high-water marks of the events they
+are rolled up from (refer to `financeops.services.watermark`):
+
+- The placed orders (the orders' creation) add to the orders.
+- The delivered orders (their `ORDER_REVENUE` financial records) add to the
+  units sold and the revenue, the same as the products' owner stats.
+- The reviews of the products add to the ratings.
+
+The views are added by the flush of the buffered view counts, within the same
+transaction (refer to `product.services.view_count`).
+"""
+
+from collections import Counter, defaultdict
+from typing import Iterable, Type
+
+from django.db.models import F, QuerySet
+from django.utils import timezone
+from feedback.models import ProductReview
+from financeops.models import FinancialRecord, RollupWatermark
+from financeops.services.watermark import roll_up_past_watermark
+from order.models import Order, OrderItem
+from product.models import Product
+
+from analytics.models import FACT_MEASURES, ProductDailyFact, SellerDailyFact
+
+FACTS_BATCH_SIZE = 2000
+
+PLACED_ORDERS_WATERMARK = "seller_facts_placed_orders"
+DELIVERED_ORDERS_WATERMARK = "seller_facts_delivered_orders"
+REVIEWS_WATERMARK = "seller_facts_reviews"
+FACTS_LOCK = "seller_facts"
+
+# (seller id, day) and (seller id, day, product id) mapped to their measures
+Facts = dict[tuple, Counter]
+
+
+def _add_facts(model: Type[SellerDailyFact | ProductDailyFact], facts: Facts) -> None:
+    # the writers of the facts (the rollups and the view counts' flush) are
+    # serialized, so they can't create the same fact concurrently
+    RollupWatermark.objects.select_for_update().get_or_create(name=FACTS_LOCK)
+    key_fields = ["seller_id", "day"] + (["product_id"] if model is ProductDailyFact else [])
+    existing = {
+        tuple(getattr(fact, field) for field in key_fields): fact
+        for fact in model.objects.select_for_update().filter(
+            seller_id__in={key[0] for key in facts},
+            day__in={key[1] for key in facts},
+        )
+    }
+    updated, created = [], []
+    for key, measures in facts.items():
+        fact = existing.get(key)
+        if fact is None:
+            fact = model(**dict(zip(key_fields, key)))
+            created.append(fact)
+        else:
+            updated.append(fact)
+        for measure, value in measures.items():
+            setattr(fact, measure, getattr(fact, measure) + value)
+    model.objects.bulk_update(updated, FACT_MEASURES)
+    model.objects.bulk_create(created)
+
+
+def add_facts(product_facts: Facts) -> None:
+    "Add the measures of the products' facts to them and to their sellers' facts."
+    seller_facts = defaultdict(Counter)
+    for (seller_id, day, _), measures in product_facts.items():
+        seller_facts[(seller_id, day)].update(measures)
+    _add_facts(ProductDailyFact, product_facts)
+    _add_facts(SellerDailyFact, seller_facts)
+
+
+def add_view_facts(view_deltas: dict[int, int]) -> None:
+    "Add the flushed view counts of the products (mapped by their id) to today's facts."
+    day = timezone.localdate()
+    product_facts = defaultdict(Counter)
+    for product_id, owner_id in Product.objects.filter(
+        id__in=view_deltas, owner__isnull=False
+    ).values_list("id", "owner_id"):
+        product_facts[(owner_id, day, product_id)]["views"] += view_deltas[product_id]
+    if product_facts:
+        add_facts(product_facts)
+
+
+def _get_order_items(order_ids: Iterable[int]) -> QuerySet:
+    return OrderItem.objects.filter(
+        order_id__in=order_ids, product_variant__isnull=False
+    ).values_list(
+        "order_id",
+        "product_variant__product_id",
+        "quantity",
+        F("quantity") * F("submitted_price"),
+    )
+
+
+def _add_placed_orders(rows: list[tuple]) -> None:
+    orders = {
+        order_id: (seller_id, timezone.localdate(created_at))
+        for order_id, created_at, seller_id in rows
+    }
+    product_facts = defaultdict(Counter)
+    seller_facts = defaultdict(Counter)
+    # an order is counted once per each of its products, and once for its seller
+    for order_id, product_id in {
+        (order_id, product_id) for order_id, product_id, _, _ in _get_order_items(orders)
+    }:
+        seller_id, day = orders[order_id]
+        product_facts[(seller_id, day, product_id)]["orders"] += 1
+    for seller_id, day in orders.values():
+        seller_facts[(seller_id, day)]["orders"] += 1
+    _add_facts(ProductDailyFact, product_facts)
+    _add_facts(SellerDailyFact, seller_facts)
+
+
+def _add_delivered_orders(rows: list[tuple]) -> None:
+    orders = {
+        order_id: (seller_id, timezone.localdate(created_at))
+        for _, created_at, order_id, seller_id in rows
+    }
+    product_facts = defaultdict(Counter)
+    for order_id, product_id, quantity, price in _get_order_items(orders):
+        seller_id, day = orders[order_id]
+        product_facts[(seller_id, day, product_id)].update(
+            units_sold=quantity, revenue=price
+        )
+    add_facts(product_facts)
+
+
+def _add_reviews(rows: list[tuple]) -> None:
+    product_facts = defaultdict(Counter)
+    for _, created_at, product_id, owner_id, rating in rows:
+        product_facts[(owner_id, timezone.localdate(created_at), product_id)].update(
+            rating_sum=rating, rating_count=1
+        )
+    add_facts(product_facts)
+
+
+def rollup_seller_facts(batch_size: int = FACTS_BATCH_SIZE) -> int:
+    "Roll up the events past their high-water marks, returns the number of the events rolled up."
+    rolled_up = roll_up_past_watermark(
+        PLACED_ORDERS_WATERMARK,
+        lambda last_id: Order.objects.filter(id__gt=last_id, seller__isnull=False)
+        .order_by("id")
+        .values_list("id", "created_at", "seller_id"),
+        _add_placed_orders,
+        batch_size,
+    )
+    rolled_up += roll_up_past_watermark(
+        DELIVERED_ORDERS_WATERMARK,
+        lambda last_id: FinancialRecord.objects.filter(
+            id__gt=last_id,
+            type=FinancialRecord.ORDER_REVENUE,
+            order__seller__isnull=False,
+        )
+        .order_by("id")
+        .values_list("id", "created_at", "order_id", "order__seller_id"),
+        _add_delivered_orders,
+        batch_size,
+    )
+    rolled_up += roll_up_past_watermark(
+        REVIEWS_WATERMARK,
+        lambda last_id: ProductReview.objects.filter(
+            id__gt=last_id, product__owner__isnull=False
+        )
+        .order_by("id")
+        .values_list("id", "created_at", "product_id", "product__owner_id", "rating"),
+        _add_reviews,
+        batch_size,
+    )
+    return rolled_up
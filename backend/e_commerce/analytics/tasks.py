@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from analytics.services.facts import (
+    rollup_seller_facts as rollup_seller_facts_in_batches,
+)
+
+
+@shared_task
+def rollup_seller_facts() -> int:
+    """
+    Roll up the new placed and delivered orders and reviews into the sellers'
+    analytics facts, returns the number of the events rolled up.
+
+    Should be executed as a scheduler
+    """
+    return rollup_seller_facts_in_batches()
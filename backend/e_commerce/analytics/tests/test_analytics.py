@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from ecom_user_profile.tests.profile_factory import SellerFactory
+from feedback.models import ProductReview
+from feedback.tests.feedback_factory import ProductReviewFactory
+from financeops.models import FinancialRecord
+from order.models import Order
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+from product.tests.product_factory import ProductFactory, ProductVariantFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from analytics.models import ProductDailyFact, SellerDailyFact
+from analytics.services.dashboard import get_seller_analytics
+from analytics.services.facts import add_view_facts, rollup_seller_facts
+from analytics.views import SellerAnalyticsView
+
+
+def age(model, instance, days: int) -> None:
+    model.objects.filter(id=instance.id).update(
+        created_at=timezone.now() - timedelta(days=days)
+    )
+
+
+@pytest.fixture
+def seller_products(db):
+    seller = SellerFactory()
+    first, second = ProductFactory(owner=seller), ProductFactory(owner=seller)
+    return (
+        seller,
+        ProductVariantFactory(product=first, price=1000),
+        ProductVariantFactory(product=second, price=3000),
+    )
+
+
+def place_order(seller, items, days_ago: int = 1) -> Order:
+    order = OrderFactory(seller=seller, status=Order.UNPAID)
+    for variant, quantity in items:
+        OrderItemFactory(order=order, product_variant=variant, quantity=quantity)
+    age(Order, order, days_ago)
+    return order
+
+
+def deliver(order: Order, days_ago: int = 1) -> None:
+    record = FinancialRecord.objects.create(
+        order=order, amount=0, type=FinancialRecord.ORDER_REVENUE
+    )
+    age(FinancialRecord, record, days_ago)
+
+
+def test_rollup_seller_facts(seller_products):
+    seller, first_variant, second_variant = seller_products
+    yesterday = timezone.localdate() - timedelta(days=1)
+    first_order = place_order(seller, [(first_variant, 2), (second_variant, 1)])
+    place_order(seller, [(first_variant, 1)])
+    deliver(first_order)
+    review = ProductReviewFactory(product=first_variant.product, rating=4)
+    age(ProductReview, review, 1)
+
+    assert rollup_seller_facts(batch_size=1) == 4
+    assert rollup_seller_facts() == 0
+
+    fact = SellerDailyFact.objects.get(seller=seller, day=yesterday)
+    assert (fact.orders, fact.units_sold, fact.revenue) == (2, 3, 5000)
+    assert (fact.rating_sum, fact.rating_count) == (4, 1)
+    fact = ProductDailyFact.objects.get(product=first_variant.product, day=yesterday)
+    assert (fact.orders, fact.units_sold, fact.revenue) == (2, 2, 2000)
+
+    add_view_facts({first_variant.product.id: 8, second_variant.product.id: 2})
+    add_view_facts({first_variant.product.id: 2})
+    fact = SellerDailyFact.objects.get(seller=seller, day=timezone.localdate())
+    assert (fact.views, fact.orders) == (12, 0)
+
+
+def test_seller_analytics(seller_products):
+    seller, first_variant, second_variant = seller_products
+    today = timezone.localdate()
+    deliver(place_order(seller, [(second_variant, 1)], days_ago=2), days_ago=2)
+    deliver(place_order(seller, [(first_variant, 1)]))
+    rollup_seller_facts()
+    add_view_facts({first_variant.product.id: 10, second_variant.product.id: 10})
+
+    analytics = get_seller_analytics(seller.id, today - timedelta(days=2), today)
+
+    assert analytics.totals.orders == 2
+    assert analytics.totals.revenue == 4000
+    assert analytics.totals.conversion_rate == 0.1
+    assert analytics.totals.rating_avg is None
+    assert [period.period for period in analytics.series] == [
+        today - timedelta(days=2),
+        today - timedelta(days=1),
+        today,
+    ]
+    assert [product.product_id for product in analytics.top_products] == [
+        second_variant.product.id,
+        first_variant.product.id,
+    ]
+    assert analytics.top_products[0].name == second_variant.product.name
+
+    yesterday = get_seller_analytics(seller.id, today - timedelta(days=1), today - timedelta(days=1))
+    assert (yesterday.totals.revenue, len(yesterday.top_products)) == (1000, 1)
+
+
+def test_seller_analytics_view_is_limited_to_the_seller(seller_products):
+    seller, first_variant, _ = seller_products
+    deliver(place_order(seller, [(first_variant, 1)]))
+    rollup_seller_facts()
+    today = timezone.localdate()
+    request = APIRequestFactory().get(
+        "/",
+        {"date_from": today - timedelta(days=7), "date_to": today, "seller": seller.id},
+    )
+    force_authenticate(request, user=SellerFactory())
+
+    response = SellerAnalyticsView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.data["totals"]["revenue"] == 0
+    assert response.data["top_products"] == []
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from analytics import views
+
+urlpatterns = [
+    path("", views.SellerAnalyticsView.as_view(), name="seller-analytics"),
+]
@@ -0,0 +1,42 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from analytics.serializers import (
+    SellerAnalyticsQuerySerializer,
+    SellerAnalyticsSerializer,
+)
+from analytics.services.dashboard import get_seller_analytics
+
+
+class SellerAnalyticsView(APIView):
+    """
+    The seller's revenue, units sold, orders, conversion (views to orders),
+    average rating and top products within a date range, in total and per
+    day, week or month.
+
+    Sellers get their own analytics, admins should specify the seller.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = SellerAnalyticsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        seller_id = params.get("seller") if request.user.is_admin else request.user.id
+        if seller_id is None:
+            return Response(
+                data="The seller should be specified.",
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        analytics = get_seller_analytics(
+            seller_id,
+            params["date_from"],
+            params["date_to"],
+            period=params["period"],
+            top_products_by=params["top_products_by"],
+            top_products_limit=params["top_products_limit"],
+        )
+        return Response(SellerAnalyticsSerializer(analytics).data)
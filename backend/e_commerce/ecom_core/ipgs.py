@@ -1,2 +1,3 @@
 ZIBAL = 1
-ASAN_PARDAKHT = 2
\ No newline at end of file
+ASAN_PARDAKHT = 2
+ZARIN_PAL = 3
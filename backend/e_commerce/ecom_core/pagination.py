@@ -0,0 +1,216 @@
+import json
+from base64 import b64decode, b64encode
+from datetime import date, datetime
+from typing import Any, Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+APPROXIMATE_COUNT_HEADER = "X-Approximate-Count"
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """
+    Returns the planner's row estimate for the given queryset without executing
+    it, which is only supported on PostgreSQL (None is returned otherwise).
+    """
+    if connection.vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (a.k.a seek) pagination, the page is located by comparing the
+    ordering field and `pk` (as a tiebreaker) of the last seen row, instead of
+    using OFFSET, so fetching any page costs the same regardless of its depth,
+    given that a composite index of the ordering field and `pk` exists.
+
+    The ordering field is taken from the queryset's ordering (i.e. after
+    `OrderingFilter` is applied), or `ordering` if the queryset is unordered.
+    Only the first ordering field is used as the key, and the field should not be
+    nullable.
+
+    Passing `approximate_count=true` adds the header `X-Approximate-Count`
+    containing the planner's estimated number of rows, as no COUNT query
+    is executed for this type of pagination.
+    """
+
+    cursor_query_param = "cursor"
+    approximate_count_query_param = "approximate_count"
+    page_size = api_settings.PAGE_SIZE
+    ordering = "-created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.key = self.get_ordering_key(queryset)
+        self.cursor = self.decode_cursor(request)
+        self.approximate_count = None
+        if request.query_params.get(self.approximate_count_query_param) == "true":
+            self.approximate_count = estimate_count(queryset)
+
+        field = self.key.lstrip("-")
+        descending = self.key.startswith("-")
+        reverse = bool(self.cursor and self.cursor["r"])
+        if reverse:
+            descending = not descending
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}pk")
+
+        if self.cursor:
+            lookup = "lt" if descending else "gt"
+            value, pk = self.cursor["v"], self.cursor["p"]
+            queryset = queryset.filter(
+                Q(**{f"{field}__{lookup}": value})
+                | Q(**{field: value, f"pk__{lookup}": pk})
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_ordering_key(self, queryset: QuerySet) -> str:
+        order_by = queryset.query.order_by
+        if order_by and isinstance(order_by[0], str):
+            return order_by[0]
+        return self.ordering
+
+    def get_paginated_response(self, data):
+        headers = {}
+        if self.approximate_count is not None:
+            headers[APPROXIMATE_COUNT_HEADER] = str(self.approximate_count)
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            },
+            headers=headers,
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.approximate_count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include an estimated total count as a response header.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        value = getattr(instance, self.key.lstrip("-"))
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        position = {"v": value, "p": instance.pk, "r": int(reverse)}
+        encoded = b64encode(json.dumps(position).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request) -> Optional[dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode("ascii")).decode("ascii"))
+            cursor["p"] = int(cursor["p"])
+            cursor["r"] = bool(cursor["r"])
+            value = cursor["v"]
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # the value is compared to the ordering field, so only scalars are valid
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise NotFound(self.invalid_cursor_message)
+        if isinstance(value, str) and parse_datetime(value):
+            cursor["v"] = parse_datetime(value)
+        return cursor
+
+
+class KeysetOrPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination by default, with a keyset pagination mode which is
+    selected by passing `pagination=cursor` (and is kept on by the `cursor`
+    param of the next/previous links). Meant for infinite scrolling, where deep
+    pages would otherwise require a COUNT and an OFFSET scan.
+    """
+
+    mode_query_param = "pagination"
+    keyset_pagination_class = KeysetPagination
+
+    def _use_keyset(self, request) -> bool:
+        keyset_class = self.keyset_pagination_class
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self._use_keyset(request):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        keyset_parameters = self.keyset_pagination_class().get_schema_operation_parameters(view)
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to `cursor` for using keyset pagination.",
+                "schema": {"type": "string", "enum": ["page", "cursor"]},
+            },
+            *keyset_parameters,
+        ]
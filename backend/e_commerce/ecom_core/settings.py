@@ -67,6 +67,11 @@ LOGGING = {
             "level": "DEBUG",
             "propagate": False,
         },
+        "financeops": {
+            "handlers": ["file", "error_file", "console"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "development": {"handlers": ["console"], "level": "DEBUG", "propagate": False},
     },
 }
@@ -100,6 +105,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # custom apps
     "ecom_user",
     "ecom_user_profile",
@@ -107,6 +113,7 @@ INSTALLED_APPS = [
     "order",
     "financeops",
     "feedback",
+    "analytics",
     # 3rd party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -261,7 +268,7 @@ CORS_ALLOWED_ORIGINS = [
     "http://next_app:3000",
 ]
 
-CORS_EXPOSE_HEADERS = ["Retry-After", "X-Rate-Limit-Type"]
+CORS_EXPOSE_HEADERS = ["Retry-After", "X-Rate-Limit-Type", "X-Approximate-Count"]
 
 SMS_USERNAME = os.environ.get("SMS_USERNAME")
 SMS_PASSWORD = os.environ.get("SMS_PASSWORD")
@@ -322,9 +329,45 @@ CELERY_RESULT_BACKEND = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_BEAT_SCHEDULE = {
-    "check-ipg-status-every-10-minutes": {
-        "task": "financeops.tasks.check_and_cache_ipg_status",
-        "schedule": 600,
+    "check-ipg-status-every-minute": {
+        "task": "order.tasks.check_and_cache_ipg_status",
+        "schedule": 60,
+    },
+    "flush-product-view-counts-every-minute": {
+        "task": "product.tasks.flush_product_view_counts",
+        "schedule": 60,
+    },
+    "reconcile-hot-skus-every-minute": {
+        "task": "order.tasks.reconcile_hot_skus",
+        "schedule": 60,
+    },
+    "expire-unpaid-orders-every-minute": {
+        "task": "order.tasks.expire_unpaid_orders",
+        "schedule": 60,
+    },
+    "deliver-due-orders-every-10-minutes": {
+        "task": "order.tasks.deliver_due_orders",
+        "schedule": 60 * 10,
+    },
+    "reconcile-payments-every-5-minutes": {
+        "task": "order.tasks.reconcile_payments",
+        "schedule": 60 * 5,
+    },
+    "rollup-daily-settlements-every-5-minutes": {
+        "task": "financeops.tasks.rollup_daily_settlements",
+        "schedule": 60 * 5,
+    },
+    "rollup-seller-facts-every-5-minutes": {
+        "task": "analytics.tasks.rollup_seller_facts",
+        "schedule": 60 * 5,
+    },
+    "verify-wallet-ledger-every-day": {
+        "task": "financeops.tasks.verify_wallet_ledger",
+        "schedule": 60 * 60 * 24,
+    },
+    "rebuild-cart-index-every-hour": {
+        "task": "order.tasks.rebuild_cart_index",
+        "schedule": 60 * 60,
     },
 }
 
@@ -342,6 +385,10 @@ else:
 IPG_SERVICES_BASE_URL = {
     ipgs.ZIBAL: "https://gateway.zibal.ir/start/",
 }
+# base URLs of the IPGs' APIs, used by the clients of `order.payment`
+IPG_API_BASE_URLS = {
+    ipgs.ZIBAL: "https://gateway.zibal.ir/v1/",
+}
 
 ZIBAL_IPG_IP = ["185.143.233.79"]
 IPG_IPS = [ZIBAL_IPG_IP]
@@ -367,6 +414,7 @@ except ValueError:
 
 ORDER_TIMEOUT = 90  # in minutes
 ORDER_REQUIRED_DAYS_FOR_DELIVERED = 5  # in days
+WITHDRAWAL_MIN_AMOUNT = 100_000  # in Rials
 
 # IPGs
 ZIBAL = 1
@@ -1,3 +1,4 @@
+from analytics.urls import urlpatterns as analytics_urls
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import (
@@ -9,6 +10,7 @@ from ecom_admin.urls import urls as admin_urls
 from ecom_user.urls import router as user_router
 from ecom_user_profile.urls import urlpatterns as user_profile_urlpatterns
 from feedback.urls import urlpatterns as feedback_urls
+from financeops.urls import urlpatterns as financeops_urls
 from order.urls import urlpatterns as order_urls
 from product.urls import urlpatterns as product_urls
 from rest_framework_simplejwt.views import (
@@ -32,6 +34,8 @@ urlpatterns = [
     path("api/products/", include(product_urls)),
     path("api/order/", include(order_urls)),
     path("api/feedback/", include(feedback_urls)),
+    path("api/finance/", include(financeops_urls)),
+    path("api/seller/analytics/", include(analytics_urls)),
     # drf-spectacular, for OpenAPI schema generation
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
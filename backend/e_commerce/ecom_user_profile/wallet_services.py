@@ -9,7 +9,14 @@ from ecom_user_profile.models import (
     BankCard,
 )
 from ecom_user.models import EcomUser
-from financeops.models import Wallet, FinancialRecord, WithdrawalRequest
+from financeops.models import Wallet, FinancialRecord, LedgerPosting, WithdrawalRequest
+from financeops.services.ledger import (
+    Posting,
+    lock_wallet_balance,
+    post_transaction,
+    wallet_posting,
+)
+from order.services.delivery import get_seller_revenue
 
 
 def add_order_revenue_to_wallet(
@@ -22,18 +29,25 @@ def add_order_revenue_to_wallet(
     instance (The commission rate will be also applied to the amount charged).
     Will also create a `WalletTransaction` instance.
     """
-    commission_rate = settings.COMMISSION_RATE
     order_total_price = order.get_total_price()
+    revenue = get_seller_revenue(order_total_price)
     with transaction.atomic():
         wallet_transaction = FinancialRecord.objects.create(
             wallet=wallet,
-            amount=order_total_price,
+            amount=revenue,
             type=FinancialRecord.ORDER_REVENUE,
             order=order,
-            commission_rate=commission_rate,
+            commission_rate=settings.COMMISSION_RATE,
+        )
+        post_transaction(
+            [
+                Posting(LedgerPosting.ORDER_ESCROW, -order_total_price),
+                wallet_posting(wallet.id, revenue),
+                Posting(LedgerPosting.PLATFORM_COMMISSION, order_total_price - revenue),
+            ],
+            wallet_transaction,
         )
-        wallet.balance += order_total_price * (100 - commission_rate)
-        wallet.save()
+    wallet.refresh_from_db(fields=["balance"])
     return wallet_transaction
 
 
@@ -41,47 +55,55 @@ def request_withdrawal(selected_bank_card: BankCard, amount: int) -> WithdrawalR
     """
     Submit a request for withdrawl from the wallet, which result in
     creating a WithdrawalRequest instance.
+
+    The wallet (including its balance shards) is locked while checking its
+    balance, so the concurrent credits and debits can't skew the check.
     """
-    wallet = selected_bank_card.user.wallet
+    user = selected_bank_card.user
     withdrawal_min = settings.WITHDRAWAL_MIN_AMOUNT
-    if WithdrawalRequest.objects.filter(
-        bank_card__in=selected_bank_card.user.bank_cards,
-        status=WithdrawalRequest.PENDING,
-    ).exists():
-        raise serializers.ValidationError(
-            "A pending withdrawal already exists for this user."
-            " Please update the withdrawal request instead"
-        )
     if amount < withdrawal_min:
         raise serializers.ValidationError(
             "The minimum required balance for requesting a withdrawal"
             f" is {withdrawal_min} Rials."
         )
-    if wallet.balance < amount:
-        raise serializers.ValidationError(
-            "Not enough wallet currency for the requested action"
+    with transaction.atomic():
+        balance = lock_wallet_balance(user.wallet.id)
+        if WithdrawalRequest.objects.filter(
+            bank_card__user=user,
+            status=WithdrawalRequest.PENDING,
+        ).exists():
+            raise serializers.ValidationError(
+                "A pending withdrawal already exists for this user."
+                " Please update the withdrawal request instead"
+            )
+        if balance < amount:
+            raise serializers.ValidationError(
+                "Not enough wallet currency for the requested action"
+            )
+        return WithdrawalRequest.objects.create(
+            bank_card=selected_bank_card, amount=amount
         )
-    return WithdrawalRequest.objects.create(bank_card=selected_bank_card, amount=amount)
 
 
 def update_withdrawal_request(user: EcomUser, amount: int) -> WithdrawalRequest:
-    wallet = user.wallet
-    withdrawal = WithdrawalRequest.objects.filter(
-        bank_card__in=user.bank_cards, status=WithdrawalRequest.PENDING
-    ).first()
-    # validations
-    if not withdrawal:
-        raise serializers.ValidationError(
-            "Theres no pending withdrawal request."
-            " Please request a new withdrawal instead"
-        )
-    if wallet.balance < amount:
-        raise serializers.ValidationError(
-            "Not enough wallet currency for the requested action"
-        )
-    # process
-    withdrawal.balance = amount
-    withdrawal.save()
+    with transaction.atomic():
+        balance = lock_wallet_balance(user.wallet.id)
+        withdrawal = WithdrawalRequest.objects.filter(
+            bank_card__user=user, status=WithdrawalRequest.PENDING
+        ).first()
+        # validations
+        if not withdrawal:
+            raise serializers.ValidationError(
+                "Theres no pending withdrawal request."
+                " Please request a new withdrawal instead"
+            )
+        if balance < amount:
+            raise serializers.ValidationError(
+                "Not enough wallet currency for the requested action"
+            )
+        # process
+        withdrawal.amount = amount
+        withdrawal.save()
     return withdrawal
 
 
@@ -33,6 +33,11 @@ class ProductReview(models.Model):
             "product",
             "reviewed_by",
         )  # ensures only one review exists per product for each customer
+        indexes = [
+            models.Index(
+                fields=["product", "created_at", "id"], name="review_product_created_idx"
+            )
+        ]
 
     def __str__(self):
         return f"Review by {self.reviewed_by.full_name} on {self.product}"
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from product.services.detail_cache import invalidate_product_details_on_commit
+from product.services.listing import refresh_product_listings
+
+from .models import ProductReview
+
+
+@receiver([post_save, post_delete], sender=ProductReview)
+def refresh_listing_on_review_change(sender, instance, **kwargs):
+    refresh_product_listings([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=ProductReview)
+def invalidate_product_detail_on_review_change(sender, instance, **kwargs):
+    invalidate_product_details_on_commit([instance.product_id])
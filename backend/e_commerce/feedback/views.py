@@ -1,3 +1,4 @@
+from ecom_core.pagination import KeysetOrPageNumberPagination
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import (
     CreateAPIView,
@@ -25,10 +26,12 @@ class ProductReviewList(ListAPIView):
     """
     GET:
     Lists all the reviews for the provided product id (paginated).
+    Keyset pagination can be used via ?pagination=cursor.
     """
 
     queryset = ProductReview.objects.all()
     serializer_class = ProductReviewSerializer
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_queryset(self):
         if not self.kwargs["pk"]:
@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from financeops.models import DailySettlement
+
+
+@admin.register(DailySettlement)
+class DailySettlementAdmin(admin.ModelAdmin):
+    "The rollups are maintained by `financeops.services.settlement`, only for reading."
+
+    list_display = ("day", "user", "type", "count", "amount", "commission")
+    list_filter = ("type",)
+    search_fields = ("user__username", "user__phone")
+    date_hierarchy = "day"
+    list_select_related = ("user",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
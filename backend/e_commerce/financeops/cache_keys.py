@@ -0,0 +1,2 @@
+def wallet_balance_cache_key(wallet_id: int) -> str:
+    return f"wallet:{wallet_id}:balance"
@@ -0,0 +1,53 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from financeops.services.export import (
+    DATASETS,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    ExportFilters,
+    UnsupportedExportFilterError,
+    export_dataset,
+)
+
+
+class Command(BaseCommand):
+    help = "Export a financial dataset as CSV or JSON Lines"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("dataset", choices=list(DATASETS))
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv")
+        parser.add_argument(
+            "--output", help="File to write the export to, stdout if not given"
+        )
+        parser.add_argument("--wallet", type=int)
+        parser.add_argument("--seller", type=int)
+        parser.add_argument("--date_from", type=date.fromisoformat)
+        parser.add_argument("--date_to", type=date.fromisoformat)
+        parser.add_argument("--type")
+        parser.add_argument("--status")
+        parser.add_argument(
+            "--chunk_size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Number of rows to fetch from the database at a time",
+        )
+
+    def handle(self, *args, **kwargs):
+        filters = ExportFilters(
+            **{field: kwargs[field] for field in ExportFilters._fields}
+        )
+        try:
+            lines = export_dataset(
+                kwargs["dataset"], kwargs["format"], filters, kwargs["chunk_size"]
+            )
+        except UnsupportedExportFilterError as exc:
+            raise CommandError(str(exc))
+        if kwargs["output"] is None:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+        with open(kwargs["output"], "w", newline="") as file:
+            file.writelines(lines)
+        self.stdout.write(f"Exported the {kwargs['dataset']} to {kwargs['output']}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from financeops.models import Wallet
+from financeops.services.ledger import shard_wallet
+
+
+class Command(BaseCommand):
+    help = "Spread the credits of the users' wallets over balance shards"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("user_ids", nargs="+", type=int)
+        parser.add_argument(
+            "--shards",
+            type=int,
+            default=16,
+            help="Number of the balance shards, 0 to stop sharding the wallets",
+        )
+
+    def handle(self, *args, **kwargs):
+        wallet_ids = Wallet.objects.filter(user_id__in=kwargs["user_ids"]).values_list(
+            "id", flat=True
+        )
+        for wallet_id in wallet_ids:
+            shard_wallet(wallet_id, kwargs["shards"])
+        self.stdout.write(
+            f"Set {kwargs['shards']} balance shards for {len(wallet_ids)} wallets"
+        )
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeops', '0004_alter_payment_ipg_service'),
+        ('order', '0006_order_held_by_server'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RenameModel(
+            old_name='Transaction',
+            new_name='FinancialRecord',
+        ),
+        migrations.DeleteModel(
+            name='IPG',
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='details',
+            field=models.CharField(blank=True, help_text='More details of the status of the payment via using the status code received from the IPG response.', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='track_id_submitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='moneytransferrequest',
+            name='is_verified',
+            field=models.BooleanField(default=False, help_text='Indicating whether the money transfer request is valid or not,should be manually be set by support/administrator '),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='ipg_service',
+            field=models.IntegerField(choices=[(1, 'Zibal'), (2, 'Asan Pardakht'), (3, 'Zarin Pal')]),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('CC', 'Cancelled'), ('FD', 'Failed'), ('PY', 'Paying'), ('PD', 'Paid')], max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['status', 'track_id_submitted_at'], name='payment_status_submitted_idx'),
+        ),
+    ]
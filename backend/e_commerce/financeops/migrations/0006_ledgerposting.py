@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeops', '0005_payment_status_submitted_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_id', models.UUIDField(db_index=True)),
+                ('account', models.CharField(choices=[('WL', 'Wallet'), ('ES', 'Order Escrow'), ('PC', 'Platform Commission'), ('EX', 'External'), ('OB', 'Opening Balance')], max_length=2)),
+                ('amount', models.BigIntegerField(help_text='Positive for credits, negative for debits')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='postings', to='financeops.financialrecord')),
+                ('wallet', models.ForeignKey(blank=True, help_text='Only for the postings of the WALLET account', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='postings', to='financeops.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', 'id'], name='posting_wallet_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+import uuid
+
+from django.db import migrations
+
+WALLET = "WL"
+OPENING_BALANCE = "OB"
+
+
+def post_opening_balances(apps, schema_editor):
+    "Post the existing balances of the wallets, so the ledger matches them."
+    Wallet = apps.get_model("financeops", "Wallet")
+    LedgerPosting = apps.get_model("financeops", "LedgerPosting")
+    postings = []
+    for wallet_id, balance in (
+        Wallet.objects.filter(balance__gt=0).values_list("id", "balance").iterator()
+    ):
+        transaction_id = uuid.uuid4()
+        postings.append(
+            LedgerPosting(
+                transaction_id=transaction_id, account=OPENING_BALANCE, amount=-balance
+            )
+        )
+        postings.append(
+            LedgerPosting(
+                transaction_id=transaction_id,
+                account=WALLET,
+                wallet_id=wallet_id,
+                amount=balance,
+            )
+        )
+    LedgerPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("financeops", "0006_ledgerposting"),
+    ]
+
+    operations = [
+        migrations.RunPython(post_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financeops', '0008_walletbalanceshard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySettlement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(choices=[('PM', 'Deposit'), ('WD', 'Withdrawal'), ('OR', 'Order Revenue'), ('OP', 'Order Direct Payment'), ('WP', 'Order Wallet Payment'), ('CC', 'Cancellation')], max_length=2)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+                ('commission', models.BigIntegerField(default=0, help_text="The platform's commission of the records")),
+                ('user', models.ForeignKey(blank=True, help_text="The owner of the records' wallet, or the seller of their order", null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='daily_settlements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'day'], name='settlement_user_day_idx')],
+                'unique_together': {('day', 'user', 'type')},
+            },
+        ),
+    ]
@@ -10,12 +10,47 @@ from order.models import Order
 
 
 class Wallet(models.Model):
+    """
+    The balance of a wallet is materialized from its ledger postings (refer to
+    `LedgerPosting`).
+
+    Wallets receiving a high volume of credits (e.g. top sellers' order revenues)
+    can be sharded, in which case the credits are spread over `shard_count` rows
+    of `WalletBalanceShard` rather than contending for the lock of this row, and
+    the wallet's balance is `balance` plus the sum of its shards (refer to
+    `financeops.services.ledger`).
+    """
+
     user = models.OneToOneField(
         "ecom_user.EcomUser",
         on_delete=models.DO_NOTHING,
         related_name="wallet",
     )
     balance = models.PositiveBigIntegerField(default=0)
+    shard_count = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Number of the balance shards receiving the credits, 0 if not sharded.",
+    )
+
+    @property
+    def is_sharded(self) -> bool:
+        return self.shard_count > 0
+
+
+class WalletBalanceShard(models.Model):
+    """
+    A sub-balance of a sharded wallet, only credited by the ledger and folded
+    into `Wallet.balance` whenever the wallet is debited.
+    """
+
+    wallet = models.ForeignKey(
+        Wallet, on_delete=models.CASCADE, related_name="balance_shards"
+    )
+    index = models.PositiveSmallIntegerField()
+    balance = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("wallet", "index")
 
 
 class FinancialRecord(models.Model):
@@ -170,6 +205,15 @@ class Payment(models.Model):
         ),
     )
 
+    class Meta:
+        indexes = [
+            # for finding the stale PAYING payments (refer to `order.services.reconciliation`)
+            models.Index(
+                fields=["status", "track_id_submitted_at"],
+                name="payment_status_submitted_idx",
+            ),
+        ]
+
     @property
     def is_payment_link_expired(self) -> bool:
         expire_time = settings.PAYMENT_LINK_EXPIRY_TIME
@@ -184,6 +228,121 @@ class Payment(models.Model):
         return base_url + self.track_id
 
 
+class LedgerImmutableError(Exception):
+    "The postings of the ledger can't be changed or deleted, only reversed by new postings."
+
+
+class LedgerPostingQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise LedgerImmutableError()
+
+    def delete(self):
+        raise LedgerImmutableError()
+
+
+class LedgerPosting(models.Model):
+    """
+    An immutable posting of the double-entry ledger of the wallets, the postings
+    of each ledger transaction (sharing a `transaction_id`) sum up to zero.
+
+    The balance of a wallet is the sum of its postings, which is materialized in
+    `Wallet.balance` by the same transaction that posts them (refer to
+    `financeops.services.ledger`). The other side of the wallets' postings goes to
+    the platform's accounts, e.g. an order paid using the wallet moves the amount
+    from the customer's wallet to the orders' escrow, until it's either refunded
+    or delivered (split between the seller's wallet and the platform's commission).
+    """
+
+    WALLET = "WL"
+    ORDER_ESCROW = "ES"  # paid orders which aren't delivered or refunded yet
+    PLATFORM_COMMISSION = "PC"
+    EXTERNAL = "EX"  # money entering or leaving the platform (IPGs, bank transfers)
+    OPENING_BALANCE = "OB"  # wallet balances which existed before the ledger
+    ACCOUNTS = {
+        WALLET: "Wallet",
+        ORDER_ESCROW: "Order Escrow",
+        PLATFORM_COMMISSION: "Platform Commission",
+        EXTERNAL: "External",
+        OPENING_BALANCE: "Opening Balance",
+    }
+    transaction_id = models.UUIDField(db_index=True)
+    account = models.CharField(max_length=2, choices=ACCOUNTS)
+    wallet = models.ForeignKey(
+        Wallet,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="postings",
+        help_text="Only for the postings of the WALLET account",
+    )
+    amount = models.BigIntegerField(help_text="Positive for credits, negative for debits")
+    record = models.ForeignKey(
+        FinancialRecord,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="postings",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LedgerPostingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # for summing the postings per wallet (refer to `verify_wallet_balances`)
+            models.Index(fields=["wallet", "id"], name="posting_wallet_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise LedgerImmutableError()
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise LedgerImmutableError()
+
+
+class DailySettlement(models.Model):
+    """
+    The rollup of the financial records per day, user and type, used for the
+    financial reports instead of aggregating `FinancialRecord` on demand.
+
+    The rollups are maintained incrementally by a scheduled task, from the
+    high-water mark of the records rolled up so far (refer to
+    `financeops.services.settlement`).
+    """
+
+    day = models.DateField()
+    user = models.ForeignKey(
+        EcomUser,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True,
+        related_name="daily_settlements",
+        help_text="The owner of the records' wallet, or the seller of their order",
+    )
+    type = models.CharField(choices=FinancialRecord.TRANSACTION_TYPES, max_length=2)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.BigIntegerField(default=0)
+    commission = models.BigIntegerField(
+        default=0, help_text="The platform's commission of the records"
+    )
+
+    class Meta:
+        unique_together = ("day", "user", "type")
+        indexes = [
+            models.Index(fields=["user", "day"], name="settlement_user_day_idx"),
+        ]
+
+
+class RollupWatermark(models.Model):
+    "The high-water mark of a rollup, i.e. the id of the last row rolled up."
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
 class WithdrawalRequest(models.Model):
     """For requesting withdrawal from the wallet"""
 
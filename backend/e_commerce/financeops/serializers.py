@@ -0,0 +1,50 @@
+from rest_framework import serializers
+
+from financeops.models import FinancialRecord
+from financeops.services.export import EXPORT_FORMATS
+from financeops.services.settlement import DAY, REPORT_PERIODS
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    "Query parameters of the financial exports (refer to `financeops.services.export`)."
+
+    export_format = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default="csv")
+    wallet = serializers.IntegerField(required=False)
+    seller = serializers.IntegerField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    type = serializers.ChoiceField(
+        choices=list(FinancialRecord.TRANSACTION_TYPES), required=False
+    )
+    status = serializers.CharField(max_length=2, required=False)
+
+    def validate(self, attrs):
+        date_from, date_to = attrs.get("date_from"), attrs.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError("date_from should not be after date_to.")
+        return attrs
+
+
+class SettlementReportQuerySerializer(serializers.Serializer):
+    "Query parameters of the settlement reports (refer to `financeops.services.settlement`)."
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    period = serializers.ChoiceField(choices=list(REPORT_PERIODS), default=DAY)
+    type = serializers.ChoiceField(
+        choices=list(FinancialRecord.TRANSACTION_TYPES), required=False
+    )
+    user = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError("date_from should not be after date_to.")
+        return attrs
+
+
+class SettlementReportRowSerializer(serializers.Serializer):
+    period = serializers.DateField()
+    type = serializers.CharField()
+    count = serializers.IntegerField()
+    amount = serializers.IntegerField()
+    commission = serializers.IntegerField()
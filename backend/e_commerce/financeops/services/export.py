@@ -0,0 +1,214 @@
+"""
+Streaming exports of the financial history (financial records, payments,
+withdrawal and money transfer requests) as CSV or JSON Lines.
+
+The rows are read by a server-side cursor (`.iterator(chunk_size=...)`) as
+tuples of the exported fields and rendered one by one, so the memory usage is
+bounded by the chunk size regardless of the size of the history. The export
+is either streamed as a response (refer to `financeops.views`) or written to a
+file by the `export_financial_records` management command.
+"""
+
+import csv
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Iterator, NamedTuple, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from financeops.models import (
+    FinancialRecord,
+    MoneyTransferRequest,
+    Payment,
+    WithdrawalRequest,
+)
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV = "csv"
+JSONL = "jsonl"
+EXPORT_FORMATS = {
+    CSV: "text/csv",
+    JSONL: "application/jsonl",
+}
+
+
+class ExportFilters(NamedTuple):
+    wallet: Optional[int] = None
+    seller: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None  # inclusive
+    type: Optional[str] = None
+    status: Optional[str] = None
+
+
+class Dataset(NamedTuple):
+    queryset: Callable[[], QuerySet]
+    fields: tuple[str, ...]
+    # lookups of the filters supported by the dataset, the seller filter is a
+    # function of the seller's id as it might span more than one relation
+    wallet: Optional[str] = None
+    seller: Optional[Callable[[int], Q]] = None
+    type: Optional[str] = None
+    status: Optional[str] = None
+
+
+DATASETS = {
+    "financial_records": Dataset(
+        queryset=lambda: FinancialRecord.objects.all(),
+        fields=(
+            "id",
+            "created_at",
+            "type",
+            "amount",
+            "wallet_id",
+            "order_id",
+            "payment_id",
+            "commission_rate",
+            "description",
+        ),
+        wallet="wallet_id",
+        seller=lambda seller_id: Q(wallet__user_id=seller_id)
+        | Q(order__seller_id=seller_id),
+        type="type",
+    ),
+    "payments": Dataset(
+        queryset=lambda: Payment.objects.all(),
+        fields=(
+            "id",
+            "created_at",
+            "updated_at",
+            "status",
+            "amount",
+            "ipg_service",
+            "track_id",
+            "paid_by_id",
+            "order_id",
+            "wallet_id",
+            "is_used",
+            "details",
+        ),
+        wallet="wallet_id",
+        seller=lambda seller_id: Q(order__seller_id=seller_id),
+        status="status",
+    ),
+    "withdrawal_requests": Dataset(
+        queryset=lambda: WithdrawalRequest.objects.all(),
+        fields=(
+            "id",
+            "created_at",
+            "updated_at",
+            "status",
+            "amount",
+            "bank_card__user_id",
+            "bank_card__iban",
+            "refuse_reason",
+        ),
+        wallet="bank_card__user__wallet",
+        seller=lambda seller_id: Q(bank_card__user_id=seller_id),
+        status="status",
+    ),
+    "money_transfer_requests": Dataset(
+        queryset=lambda: MoneyTransferRequest.objects.all(),
+        fields=(
+            "id",
+            "created_at",
+            "amount",
+            "requested_by_id",
+            "verified_by_id",
+            "is_verified",
+            "is_paid",
+            "tracking_code",
+        ),
+        wallet="requested_by__wallet",
+        seller=lambda seller_id: Q(requested_by_id=seller_id),
+    ),
+}
+
+
+class UnsupportedExportFilterError(ValueError):
+    "The filter can't be applied to the exported dataset."
+
+
+def start_of_day(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_queryset(dataset_name: str, filters: ExportFilters) -> QuerySet:
+    """
+    Return the rows of the dataset (as tuples of its fields) matching the
+    filters, in the order of their ids.
+
+    Raises:
+        KeyError: The dataset doesn't exist.
+        UnsupportedExportFilterError: A given filter isn't supported by the dataset.
+    """
+    dataset = DATASETS[dataset_name]
+    queryset = dataset.queryset()
+    for name in ("wallet", "type", "status"):
+        value = getattr(filters, name)
+        if value is None:
+            continue
+        lookup = getattr(dataset, name)
+        if lookup is None:
+            raise UnsupportedExportFilterError(
+                f"The {dataset_name} can't be filtered by {name}."
+            )
+        queryset = queryset.filter(**{lookup: value})
+    if filters.seller is not None:
+        if dataset.seller is None:
+            raise UnsupportedExportFilterError(
+                f"The {dataset_name} can't be filtered by seller."
+            )
+        queryset = queryset.filter(dataset.seller(filters.seller))
+    # the date range is compared to the instants rather than the dates of
+    # `created_at`, so it can be looked up by an index
+    if filters.date_from is not None:
+        queryset = queryset.filter(created_at__gte=start_of_day(filters.date_from))
+    if filters.date_to is not None:
+        queryset = queryset.filter(
+            created_at__lt=start_of_day(filters.date_to + timedelta(days=1))
+        )
+    return queryset.order_by("id").values_list(*dataset.fields)
+
+
+class _Echo:
+    "A file-like object which returns what's written to it, for `csv.writer`."
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _render_csv(fields: tuple[str, ...], rows: Iterator[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _render_jsonl(fields: tuple[str, ...], rows: Iterator[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_dataset(
+    dataset_name: str,
+    export_format: str,
+    filters: ExportFilters = ExportFilters(),
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """
+    Return an iterator of the lines of the dataset's export in the given format,
+    the rows are fetched lazily, `chunk_size` rows at a time.
+
+    Raises:
+        KeyError: The dataset doesn't exist.
+        UnsupportedExportFilterError: A given filter isn't supported by the dataset.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    queryset = get_export_queryset(dataset_name, filters)
+    render = _render_csv if export_format == CSV else _render_jsonl
+    return render(DATASETS[dataset_name].fields, queryset.iterator(chunk_size=chunk_size))
@@ -0,0 +1,311 @@
+"""
+The double-entry ledger of the wallets (refer to `LedgerPosting`).
+
+Every change of a wallet's balance goes through `post_transactions`, which writes
+the immutable postings and applies their sum per wallet to `Wallet.balance` by
+atomic `F()` increments, within one transaction. The wallets are locked in the
+order of their ids, so concurrent postings can't deadlock each other, and a batch
+of transactions costs a constant number of queries regardless of its size.
+
+The credits of the sharded wallets (refer to `Wallet`) don't lock the wallet,
+they're added to one of its balance shards chosen at random, so concurrent
+credits of the same wallet contend for `shard_count` rows rather than one. As
+the shard count is read without a lock, a credit whose shard was removed
+meanwhile (refer to `shard_wallet`) is added to `Wallet.balance` instead. The
+debits lock the wallet along with all of its shards and fold the shards into
+`Wallet.balance`, which gives them a consistent view of the balance.
+
+`verify_wallet_balances` recomputes the balances from the postings to detect
+any drift of the materialized balances.
+"""
+
+import random
+import uuid
+from collections import defaultdict
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.fields import BigIntegerField
+from django.db.models.functions import Coalesce
+from order.exceptions.errors import WalletNotEnoughCurrencyError
+
+from financeops.cache_keys import wallet_balance_cache_key
+from financeops.models import FinancialRecord, LedgerPosting, Wallet, WalletBalanceShard
+
+VERIFY_CHUNK_SIZE = 2000
+# the cached balances of the sharded wallets are only dropped on their debits,
+# so they can lag behind the credits by this much, but are never overstated.
+WALLET_BALANCE_CACHE_TTL = 5  # in seconds
+
+
+class UnbalancedTransactionError(ValueError):
+    "The postings of a ledger transaction don't sum up to zero."
+
+
+class Posting(NamedTuple):
+    account: str
+    amount: int
+    wallet_id: Optional[int] = None
+
+
+class LedgerTransaction(NamedTuple):
+    postings: Sequence[Posting]
+    record: Optional[FinancialRecord] = None
+
+
+class WalletDrift(NamedTuple):
+    wallet_id: int
+    balance: int
+    ledger_balance: int
+
+
+def wallet_posting(wallet_id: int, amount: int) -> Posting:
+    return Posting(LedgerPosting.WALLET, amount, wallet_id)
+
+
+def _lock_shard_balances(wallet_ids: Sequence[int]) -> dict[int, int]:
+    "Lock the balance shards of the given wallets and return their sums per wallet."
+    balances = defaultdict(int)
+    if not wallet_ids:
+        return balances
+    shards = (
+        WalletBalanceShard.objects.select_for_update()
+        .filter(wallet_id__in=wallet_ids)
+        .order_by("wallet_id", "index")
+        .values_list("wallet_id", "balance")
+    )
+    for wallet_id, balance in shards:
+        balances[wallet_id] += balance
+    return balances
+
+
+def _invalidate_wallet_balances(wallet_ids: Sequence[int]) -> None:
+    # dropped again after the commit, in case it's cached meanwhile
+    keys = [wallet_balance_cache_key(wallet_id) for wallet_id in wallet_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _apply_wallet_deltas(deltas: dict[int, int]) -> None:
+    wallet_ids = sorted(wallet_id for wallet_id, delta in deltas.items() if delta)
+    if not wallet_ids:
+        return
+    shard_counts = dict(
+        Wallet.objects.filter(id__in=wallet_ids, shard_count__gt=0).values_list(
+            "id", "shard_count"
+        )
+    )
+    sharded_credits = [
+        wallet_id
+        for wallet_id in wallet_ids
+        if wallet_id in shard_counts and deltas[wallet_id] > 0
+    ]
+    locked_ids = [wallet_id for wallet_id in wallet_ids if wallet_id not in sharded_credits]
+    if locked_ids:
+        balances = dict(
+            Wallet.objects.select_for_update()
+            .filter(id__in=locked_ids)
+            .order_by("id")
+            .values_list("id", "balance")
+        )
+        debited_sharded_ids = [
+            wallet_id for wallet_id in locked_ids if wallet_id in shard_counts
+        ]
+        shard_balances = _lock_shard_balances(debited_sharded_ids)
+        for wallet_id in locked_ids:
+            balance = balances.get(wallet_id, 0) + shard_balances[wallet_id]
+            if balance + deltas[wallet_id] < 0:
+                raise WalletNotEnoughCurrencyError()
+        if debited_sharded_ids:
+            WalletBalanceShard.objects.filter(wallet_id__in=debited_sharded_ids).update(
+                balance=0
+            )
+            _invalidate_wallet_balances(debited_sharded_ids)
+        Wallet.objects.filter(id__in=locked_ids).update(
+            balance=F("balance")
+            + Case(
+                *[
+                    When(
+                        id=wallet_id,
+                        then=Value(deltas[wallet_id] + shard_balances[wallet_id]),
+                    )
+                    for wallet_id in locked_ids
+                ],
+                default=Value(0),
+                output_field=BigIntegerField(),
+            )
+        )
+    for wallet_id in sharded_credits:
+        credited = WalletBalanceShard.objects.filter(
+            wallet_id=wallet_id, index=random.randrange(shard_counts[wallet_id])
+        ).update(balance=F("balance") + deltas[wallet_id])
+        if not credited:
+            # the wallet's shards were reduced or removed since the shard count
+            # was read, the update waits for the lock of the wallet
+            Wallet.objects.filter(id=wallet_id).update(
+                balance=F("balance") + deltas[wallet_id]
+            )
+
+
+def post_transactions(transactions: Iterable[LedgerTransaction]) -> list[uuid.UUID]:
+    """
+    Post the given ledger transactions, all or nothing, and update the balances of
+    the wallets involved. Returns the ids of the posted transactions.
+
+    Raises:
+        UnbalancedTransactionError: The postings of a transaction don't sum up to zero.
+        WalletNotEnoughCurrencyError: A wallet's balance would become negative.
+    """
+    postings, transaction_ids = [], []
+    deltas = defaultdict(int)
+    for ledger_transaction in transactions:
+        if sum(posting.amount for posting in ledger_transaction.postings) != 0:
+            raise UnbalancedTransactionError()
+        transaction_id = uuid.uuid4()
+        transaction_ids.append(transaction_id)
+        record = ledger_transaction.record
+        for posting in ledger_transaction.postings:
+            postings.append(
+                LedgerPosting(
+                    transaction_id=transaction_id,
+                    account=posting.account,
+                    wallet_id=posting.wallet_id,
+                    amount=posting.amount,
+                    record_id=record.pk if record is not None else None,
+                )
+            )
+            if posting.account == LedgerPosting.WALLET:
+                deltas[posting.wallet_id] += posting.amount
+    if not postings:
+        return []
+    with transaction.atomic():
+        LedgerPosting.objects.bulk_create(postings)
+        _apply_wallet_deltas(deltas)
+    return transaction_ids
+
+
+def post_transaction(
+    postings: Sequence[Posting], record: Optional[FinancialRecord] = None
+) -> uuid.UUID:
+    return post_transactions([LedgerTransaction(postings, record)])[0]
+
+
+def shard_wallet(wallet_id: int, shard_count: int) -> None:
+    """
+    Change the number of the balance shards of the wallet, 0 to stop sharding it.
+    The existing shards are folded into the wallet's balance.
+
+    The shards are changed in place, so the concurrent credits of the kept
+    shards wait for their locks and are applied to the folded shards, and the
+    credits of the removed shards fall back to the wallet's balance.
+    """
+    with transaction.atomic():
+        previous_count = (
+            Wallet.objects.select_for_update()
+            .filter(id=wallet_id)
+            .values_list("shard_count", flat=True)
+            .get()
+        )
+        shard_balance = _lock_shard_balances([wallet_id])[wallet_id]
+        shards = WalletBalanceShard.objects.filter(wallet_id=wallet_id)
+        shards.filter(index__gte=shard_count).delete()
+        shards.update(balance=0)
+        WalletBalanceShard.objects.bulk_create(
+            WalletBalanceShard(wallet_id=wallet_id, index=index)
+            for index in range(previous_count, shard_count)
+        )
+        Wallet.objects.filter(id=wallet_id).update(
+            balance=F("balance") + shard_balance, shard_count=shard_count
+        )
+        _invalidate_wallet_balances([wallet_id])
+
+
+def _shard_balances_subquery() -> Coalesce:
+    shard_balances = (
+        WalletBalanceShard.objects.filter(wallet_id=OuterRef("id"))
+        .values("wallet_id")
+        .annotate(total=Sum("balance"))
+        .values("total")
+    )
+    return Coalesce(Subquery(shard_balances), Value(0), output_field=BigIntegerField())
+
+
+def get_wallet_balance(wallet: Wallet) -> int:
+    """
+    Return the balance of the wallet. The balances of the sharded wallets are
+    summed up from their shards and cached briefly, which is only meant for
+    reading them (e.g. displaying or pre-validating), the debits check the
+    balance under the locks of the wallet (refer to `lock_wallet_balance`).
+    """
+    if not wallet.is_sharded:
+        return wallet.balance
+    key = wallet_balance_cache_key(wallet.id)
+    balance = cache.get(key)
+    if balance is None:
+        balance = (
+            Wallet.objects.filter(id=wallet.id)
+            .annotate(total=F("balance") + _shard_balances_subquery())
+            .values_list("total", flat=True)
+            .get()
+        )
+        cache.set(key, balance, WALLET_BALANCE_CACHE_TTL)
+    return balance
+
+
+def lock_wallet_balance(wallet_id: int) -> int:
+    """
+    Lock the wallet along with its balance shards until the end of the current
+    transaction and return its balance, which can't change meanwhile.
+    """
+    balance = (
+        Wallet.objects.select_for_update()
+        .filter(id=wallet_id)
+        .values_list("balance", flat=True)
+        .get()
+    )
+    return balance + _lock_shard_balances([wallet_id])[wallet_id]
+
+
+def verify_wallet_balances(chunk_size: int = VERIFY_CHUNK_SIZE) -> list[WalletDrift]:
+    """
+    Recompute the balances of the wallets from their postings and return the
+    wallets whose materialized balance has drifted.
+
+    The balances are compared to the postings' sums by a single query, so both
+    are read from the same snapshot even while the postings are being written,
+    and the drifted wallets are streamed by a server-side cursor.
+    """
+    # only the postings of the WALLET account are summed per wallet, the other
+    # accounts (escrow, commission, external and opening balance) have no wallet
+    ledger_balances = (
+        LedgerPosting.objects.filter(
+            account=LedgerPosting.WALLET, wallet_id=OuterRef("id")
+        )
+        .values("wallet_id")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    wallets = (
+        Wallet.objects.annotate(
+            total=F("balance") + _shard_balances_subquery(),
+            ledger_total=Coalesce(
+                Subquery(ledger_balances), Value(0), output_field=BigIntegerField()
+            ),
+        )
+        .exclude(total=F("ledger_total"))
+        .order_by("id")
+        .values_list("id", "total", "ledger_total")
+    )
+    return [WalletDrift(*row) for row in wallets.iterator(chunk_size=chunk_size)]
+
+
+def get_unbalanced_transactions() -> list[uuid.UUID]:
+    "Return the ids of the ledger transactions whose postings don't sum up to zero."
+    return list(
+        LedgerPosting.objects.values("transaction_id")
+        .annotate(total=Sum("amount"))
+        .exclude(total=0)
+        .values_list("transaction_id", flat=True)
+    )
@@ -0,0 +1,175 @@
+"""
+Daily settlement rollups of the financial records (refer to `DailySettlement`).
+
+`rollup_daily_settlements` adds the records past the rollup's high-water mark
+(the id of the last record rolled up) to the rollups of their day, user and
+type (refer to `financeops.services.watermark`).
+
+The reports (`get_settlement_report`) read the rollups, and only aggregate the
+raw records past the high-water mark, i.e. the tail of the current open day.
+"""
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, NamedTuple, Optional
+
+from django.db.models import F, OuterRef, Q, QuerySet, Subquery, Sum, Value
+from django.db.models.fields import BigIntegerField
+from django.db.models.functions import Coalesce, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from financeops.models import DailySettlement, FinancialRecord, LedgerPosting
+from financeops.services.export import start_of_day
+from financeops.services.watermark import get_watermark, roll_up_past_watermark
+
+SETTLEMENT_WATERMARK = "daily_settlement"
+SETTLEMENT_BATCH_SIZE = 5000
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+REPORT_PERIODS = {
+    DAY: None,
+    WEEK: TruncWeek,
+    MONTH: TruncMonth,
+}
+
+
+class SettlementKey(NamedTuple):
+    day: date
+    user_id: Optional[int]
+    type: str
+
+
+class SettlementReportRow(NamedTuple):
+    period: date
+    type: str
+    count: int
+    amount: int
+    commission: int
+
+
+def _get_record_rows(records: QuerySet) -> QuerySet:
+    "(id, created_at, user id, type, amount, commission) of the records."
+    commission = (
+        LedgerPosting.objects.filter(
+            record_id=OuterRef("id"), account=LedgerPosting.PLATFORM_COMMISSION
+        )
+        .values("record_id")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    return records.annotate(
+        owner_id=Coalesce("wallet__user_id", "order__seller_id"),
+        commission=Coalesce(Subquery(commission), Value(0), output_field=BigIntegerField()),
+    ).values_list("id", "created_at", "owner_id", "type", "amount", "commission")
+
+
+def _aggregate(rows: Iterable[tuple]) -> dict[SettlementKey, list[int]]:
+    totals = defaultdict(lambda: [0, 0, 0])
+    for _, created_at, user_id, type, amount, commission in rows:
+        key_totals = totals[SettlementKey(timezone.localdate(created_at), user_id, type)]
+        key_totals[0] += 1
+        key_totals[1] += amount
+        key_totals[2] += commission
+    return totals
+
+
+def _add_to_settlements(totals: dict[SettlementKey, list[int]]) -> None:
+    user_ids = {key.user_id for key in totals if key.user_id is not None}
+    settlements = {
+        SettlementKey(settlement.day, settlement.user_id, settlement.type): settlement
+        for settlement in DailySettlement.objects.select_for_update().filter(
+            Q(user_id__in=user_ids) | Q(user__isnull=True),
+            day__in={key.day for key in totals},
+        )
+    }
+    updated, created = [], []
+    for key, (count, amount, commission) in totals.items():
+        settlement = settlements.get(key)
+        if settlement is None:
+            created.append(DailySettlement(**key._asdict()))
+            settlement = created[-1]
+        else:
+            updated.append(settlement)
+        settlement.count += count
+        settlement.amount += amount
+        settlement.commission += commission
+    DailySettlement.objects.bulk_update(updated, ["count", "amount", "commission"])
+    DailySettlement.objects.bulk_create(created)
+
+
+def rollup_daily_settlements(batch_size: int = SETTLEMENT_BATCH_SIZE) -> int:
+    "Roll up the records past the high-water mark, returns the number of the records rolled up."
+    return roll_up_past_watermark(
+        SETTLEMENT_WATERMARK,
+        lambda last_id: _get_record_rows(
+            FinancialRecord.objects.filter(id__gt=last_id)
+        ).order_by("id"),
+        lambda rows: _add_to_settlements(_aggregate(rows)),
+        batch_size,
+    )
+
+
+def _truncate(day: date, period: str) -> date:
+    if period == WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def get_settlement_report(
+    date_from: date,
+    date_to: date,
+    user_id: Optional[int] = None,
+    type: Optional[str] = None,
+    period: str = DAY,
+) -> list[SettlementReportRow]:
+    """
+    Return the totals of the financial records per period (day, week or month)
+    and type within the date range (inclusive), of the given user or the whole
+    platform if not given, ordered by the period and type.
+    """
+    settlements = DailySettlement.objects.filter(day__range=(date_from, date_to))
+    records = FinancialRecord.objects.filter(
+        id__gt=get_watermark(SETTLEMENT_WATERMARK),
+        created_at__gte=start_of_day(date_from),
+        created_at__lt=start_of_day(date_to + timedelta(days=1)),
+    )
+    if type is not None:
+        settlements = settlements.filter(type=type)
+        records = records.filter(type=type)
+    records = _get_record_rows(records)
+    if user_id is not None:
+        settlements = settlements.filter(user_id=user_id)
+        records = records.filter(owner_id=user_id)
+
+    truncate = REPORT_PERIODS[period]
+    settlements = (
+        settlements.annotate(period=truncate("day") if truncate else F("day"))
+        .values("period", "type")
+        .annotate(
+            total_count=Sum("count"),
+            total_amount=Sum("amount"),
+            total_commission=Sum("commission"),
+        )
+        .values_list(
+            "period", "type", "total_count", "total_amount", "total_commission"
+        )
+    )
+    totals = defaultdict(lambda: [0, 0, 0])
+    for day, type, count, amount, commission in settlements:
+        period_totals = totals[(day, type)]
+        period_totals[0] += count
+        period_totals[1] += amount
+        period_totals[2] += commission
+    for key, (count, amount, commission) in _aggregate(records).items():
+        period_totals = totals[(_truncate(key.day, period), key.type)]
+        period_totals[0] += count
+        period_totals[1] += amount
+        period_totals[2] += commission
+    return [
+        SettlementReportRow(day, type, *totals[(day, type)])
+        for day, type in sorted(totals)
+    ]
@@ -0,0 +1,66 @@
+"""
+Incremental rollups from a high-water mark (refer to `RollupWatermark`).
+
+The rows past the mark are rolled up in batches, in the order of their ids, and
+the mark is advanced within the same transaction, so each row is rolled up
+exactly once. The rows created within the last `lag` aren't rolled up yet, as
+the transactions which were started before them (holding lower ids) might not
+be committed yet.
+"""
+
+from datetime import timedelta
+from typing import Callable
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from financeops.models import RollupWatermark
+
+ROLLUP_LAG = timedelta(minutes=5)
+
+
+def get_watermark(name: str) -> int:
+    "Return the id of the last row rolled up by the rollup."
+    return (
+        RollupWatermark.objects.filter(name=name).values_list("last_id", flat=True).first()
+        or 0
+    )
+
+
+def roll_up_past_watermark(
+    name: str,
+    get_rows: Callable[[int], QuerySet],
+    add_rows: Callable[[list[tuple]], None],
+    batch_size: int,
+    lag: timedelta = ROLLUP_LAG,
+) -> int:
+    """
+    Pass the rows past the rollup's mark to `add_rows` in batches, returns the
+    number of the rows rolled up. `get_rows` returns the rows past the given id
+    as tuples of (id, created_at, ...) ordered by their ids.
+    """
+    cutoff = timezone.now() - lag
+    rolled_up = 0
+    while True:
+        with transaction.atomic():
+            # the lock of the mark keeps the concurrent rollups from overlapping
+            watermark = RollupWatermark.objects.select_for_update().get_or_create(
+                name=name
+            )[0]
+            rows = list(get_rows(watermark.last_id)[:batch_size])
+            fetched = len(rows)
+            # the rows following a recent one are left for the next run as well,
+            # so the mark doesn't pass the rows of the in-flight transactions
+            for index, row in enumerate(rows):
+                if row[1] >= cutoff:
+                    rows = rows[:index]
+                    break
+            if not rows:
+                return rolled_up
+            add_rows(rows)
+            watermark.last_id = rows[-1][0]
+            watermark.save(update_fields=["last_id", "updated_at"])
+        rolled_up += len(rows)
+        if len(rows) < fetched or fetched < batch_size:
+            return rolled_up
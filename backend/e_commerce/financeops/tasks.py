@@ -0,0 +1,44 @@
+import logging
+
+from celery import shared_task
+
+from financeops.services.ledger import (
+    get_unbalanced_transactions,
+    verify_wallet_balances,
+)
+from financeops.services.settlement import (
+    rollup_daily_settlements as rollup_daily_settlements_in_batches,
+)
+
+logger = logging.getLogger("financeops")
+
+
+@shared_task
+def verify_wallet_ledger() -> int:
+    """
+    Recompute the wallets' balances from the ledger and log the drifted ones,
+    returns the number of the drifted wallets.
+
+    Should be executed as a scheduler
+    """
+    drifts = verify_wallet_balances()
+    for drift in drifts:
+        logger.error(
+            f"The balance of the wallet with id of {drift.wallet_id} has drifted from "
+            f"the ledger | balance: {drift.balance} | ledger balance: {drift.ledger_balance}"
+        )
+    unbalanced = get_unbalanced_transactions()
+    if unbalanced:
+        logger.error(f"Unbalanced ledger transactions: {unbalanced}")
+    return len(drifts)
+
+
+@shared_task
+def rollup_daily_settlements() -> int:
+    """
+    Roll up the new financial records into the daily settlements, returns the
+    number of the records rolled up.
+
+    Should be executed as a scheduler
+    """
+    return rollup_daily_settlements_in_batches()
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from ecom_user_profile.tests.profile_factory import CustomerFactory, SellerFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from financeops.models import FinancialRecord
+from financeops.services.export import (
+    ExportFilters,
+    UnsupportedExportFilterError,
+    export_dataset,
+)
+from financeops.views import FinancialExportView
+
+
+@pytest.fixture
+def records(db):
+    seller, customer = SellerFactory(), CustomerFactory()
+    revenue = FinancialRecord.objects.create(
+        wallet=seller.wallet, amount=900, type=FinancialRecord.ORDER_REVENUE
+    )
+    deposit = FinancialRecord.objects.create(
+        wallet=customer.wallet, amount=5000, type=FinancialRecord.DEPOSIT
+    )
+    old_deposit = FinancialRecord.objects.create(
+        wallet=customer.wallet, amount=700, type=FinancialRecord.DEPOSIT
+    )
+    FinancialRecord.objects.filter(id=old_deposit.id).update(
+        created_at=timezone.now() - timedelta(days=10)
+    )
+    return seller, customer, revenue, deposit, old_deposit
+
+
+def test_export_financial_records_as_csv(records):
+    seller, customer, revenue, deposit, old_deposit = records
+
+    rows = list(csv.DictReader(export_dataset("financial_records", "csv", chunk_size=1)))
+
+    assert [int(row["id"]) for row in rows] == [revenue.id, deposit.id, old_deposit.id]
+    assert rows[0]["type"] == FinancialRecord.ORDER_REVENUE
+    assert rows[1]["amount"] == "5000"
+
+
+def test_export_filters(records):
+    seller, customer, revenue, deposit, old_deposit = records
+    today = timezone.localdate()
+
+    lines = export_dataset(
+        "financial_records",
+        "jsonl",
+        ExportFilters(wallet=customer.wallet.id, date_from=today, date_to=today),
+    )
+    assert [json.loads(line)["id"] for line in lines] == [deposit.id]
+    lines = export_dataset("financial_records", "jsonl", ExportFilters(seller=seller.id))
+    assert [json.loads(line)["id"] for line in lines] == [revenue.id]
+    with pytest.raises(UnsupportedExportFilterError):
+        export_dataset("payments", "csv", ExportFilters(type=FinancialRecord.DEPOSIT))
+
+
+def test_export_view_is_limited_to_the_user(records):
+    seller, customer, revenue, deposit, old_deposit = records
+    request = APIRequestFactory().get("/", {"export_format": "jsonl"})
+    force_authenticate(request, user=seller)
+
+    response = FinancialExportView.as_view()(request, dataset="financial_records")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/jsonl"
+    body = b"".join(response.streaming_content).decode()
+    assert [json.loads(line)["id"] for line in body.splitlines()] == [revenue.id]
+
+
+def test_export_command(records, tmp_path):
+    seller, customer, revenue, deposit, old_deposit = records
+    output = tmp_path / "deposits.csv"
+
+    call_command(
+        "export_financial_records",
+        "financial_records",
+        "--type",
+        FinancialRecord.DEPOSIT,
+        "--output",
+        str(output),
+        stdout=io.StringIO(),
+    )
+
+    rows = list(csv.DictReader(output.open()))
+    assert [int(row["id"]) for row in rows] == [deposit.id, old_deposit.id]
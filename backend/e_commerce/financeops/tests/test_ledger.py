@@ -0,0 +1,77 @@
+import pytest
+from ecom_user_profile.tests.profile_factory import CustomerFactory
+from order.exceptions.errors import WalletNotEnoughCurrencyError
+
+from financeops.models import LedgerImmutableError, LedgerPosting, Wallet
+from financeops.services.ledger import (
+    LedgerTransaction,
+    Posting,
+    UnbalancedTransactionError,
+    get_unbalanced_transactions,
+    post_transaction,
+    post_transactions,
+    verify_wallet_balances,
+    wallet_posting,
+)
+
+
+def deposit(wallet: Wallet, amount: int) -> LedgerTransaction:
+    return LedgerTransaction(
+        [Posting(LedgerPosting.EXTERNAL, -amount), wallet_posting(wallet.id, amount)]
+    )
+
+
+@pytest.mark.django_db
+def test_post_transactions_updates_balances():
+    first, second = CustomerFactory().wallet, CustomerFactory().wallet
+
+    post_transactions([deposit(first, 1000), deposit(second, 500), deposit(first, 250)])
+    post_transaction(
+        [wallet_posting(first.id, -1250), Posting(LedgerPosting.ORDER_ESCROW, 1250)]
+    )
+
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert (first.balance, second.balance) == (0, 500)
+    assert verify_wallet_balances(chunk_size=1) == []
+    assert get_unbalanced_transactions() == []
+
+
+@pytest.mark.django_db
+def test_invalid_transactions_are_rejected():
+    wallet = CustomerFactory().wallet
+    post_transaction(deposit(wallet, 100).postings)
+
+    with pytest.raises(UnbalancedTransactionError):
+        post_transaction([wallet_posting(wallet.id, 100)])
+    with pytest.raises(WalletNotEnoughCurrencyError):
+        post_transactions(
+            [
+                deposit(wallet, 50),
+                LedgerTransaction(
+                    [wallet_posting(wallet.id, -200), Posting(LedgerPosting.EXTERNAL, 200)]
+                ),
+            ]
+        )
+
+    wallet.refresh_from_db()
+    assert wallet.balance == 100
+    assert LedgerPosting.objects.count() == 2
+    posting = LedgerPosting.objects.first()
+    with pytest.raises(LedgerImmutableError):
+        posting.save()
+    with pytest.raises(LedgerImmutableError):
+        LedgerPosting.objects.all().delete()
+
+
+@pytest.mark.django_db
+def test_verify_wallet_balances_detects_drift():
+    wallets = [CustomerFactory().wallet for _ in range(3)]
+    post_transactions([deposit(wallet, 300) for wallet in wallets])
+    Wallet.objects.filter(id=wallets[1].id).update(balance=1000)
+
+    drifts = verify_wallet_balances(chunk_size=2)
+
+    assert [(d.wallet_id, d.balance, d.ledger_balance) for d in drifts] == [
+        (wallets[1].id, 1000, 300)
+    ]
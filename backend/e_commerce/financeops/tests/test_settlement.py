@@ -0,0 +1,108 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from ecom_user_profile.tests.profile_factory import CustomerFactory, SellerFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from financeops.models import (
+    DailySettlement,
+    FinancialRecord,
+    LedgerPosting,
+    RollupWatermark,
+)
+from financeops.services.ledger import Posting, post_transaction, wallet_posting
+from financeops.services.settlement import (
+    MONTH,
+    SETTLEMENT_WATERMARK,
+    SettlementReportRow,
+    get_settlement_report,
+    rollup_daily_settlements,
+)
+from financeops.views import SettlementReportView
+
+
+def create_revenue(seller, total: int, revenue: int, days_ago: int = 0) -> FinancialRecord:
+    record = FinancialRecord.objects.create(
+        wallet=seller.wallet, amount=revenue, type=FinancialRecord.ORDER_REVENUE
+    )
+    post_transaction(
+        [
+            Posting(LedgerPosting.ORDER_ESCROW, -total),
+            wallet_posting(seller.wallet.id, revenue),
+            Posting(LedgerPosting.PLATFORM_COMMISSION, total - revenue),
+        ],
+        record,
+    )
+    FinancialRecord.objects.filter(id=record.id).update(
+        created_at=timezone.now() - timedelta(days=days_ago)
+    )
+    return record
+
+
+@pytest.mark.django_db
+def test_rollup_is_incremental():
+    seller, customer = SellerFactory(), CustomerFactory()
+    create_revenue(seller, 1000, 900, days_ago=2)
+    create_revenue(seller, 2000, 1800, days_ago=2)
+    yesterday_revenue = create_revenue(seller, 500, 450, days_ago=1)
+    FinancialRecord.objects.create(
+        wallet=customer.wallet, amount=300, type=FinancialRecord.DEPOSIT
+    )  # within the lag, left for the next run
+
+    assert rollup_daily_settlements(batch_size=2) == 3
+    assert rollup_daily_settlements() == 0
+
+    watermark = RollupWatermark.objects.get(name=SETTLEMENT_WATERMARK)
+    assert watermark.last_id == yesterday_revenue.id
+    settlement = DailySettlement.objects.get(
+        user=seller, day=timezone.localdate() - timedelta(days=2)
+    )
+    assert (settlement.count, settlement.amount, settlement.commission) == (2, 2700, 300)
+
+    create_revenue(seller, 1000, 900, days_ago=2)  # a late record of a rolled up day
+    FinancialRecord.objects.update(created_at=timezone.now() - timedelta(days=2))
+    assert rollup_daily_settlements() == 2
+    settlement.refresh_from_db()
+    assert (settlement.count, settlement.amount, settlement.commission) == (3, 3600, 400)
+    assert DailySettlement.objects.filter(user=customer).count() == 1
+
+
+@pytest.mark.django_db
+def test_report_reads_the_rollups_and_the_open_day():
+    seller = SellerFactory()
+    today = timezone.localdate()
+    create_revenue(seller, 1000, 900, days_ago=1)
+    rollup_daily_settlements()
+    create_revenue(seller, 2000, 1800)  # not rolled up yet
+
+    report = get_settlement_report(today - timedelta(days=1), today, user_id=seller.id)
+
+    assert report == [
+        SettlementReportRow(today - timedelta(days=1), FinancialRecord.ORDER_REVENUE, 1, 900, 100),
+        SettlementReportRow(today, FinancialRecord.ORDER_REVENUE, 1, 1800, 200),
+    ]
+    report = get_settlement_report(
+        today - timedelta(days=1), today, type=FinancialRecord.ORDER_REVENUE, period=MONTH
+    )
+    assert [(row.count, row.commission) for row in report] in (
+        [(2, 300)],
+        [(1, 100), (1, 200)],  # the month has just changed
+    )
+    assert get_settlement_report(today, today, user_id=SellerFactory().id) == []
+
+
+@pytest.mark.django_db
+def test_settlement_report_view_is_limited_to_the_user():
+    seller, other_seller = SellerFactory(), SellerFactory()
+    today = timezone.localdate()
+    create_revenue(seller, 1000, 900)
+    request = APIRequestFactory().get(
+        "/", {"date_from": today, "date_to": today, "user": seller.id}
+    )
+    force_authenticate(request, user=other_seller)
+
+    response = SettlementReportView.as_view()(request)
+
+    assert response.status_code == 200
+    assert response.data == []
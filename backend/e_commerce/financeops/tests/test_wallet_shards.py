@@ -0,0 +1,131 @@
+import pytest
+from ecom_user_profile.models import BankCard
+from ecom_user_profile.tests.profile_factory import SellerFactory
+from ecom_user_profile.wallet_services import request_withdrawal
+from order.exceptions.errors import WalletNotEnoughCurrencyError
+from rest_framework.serializers import ValidationError
+
+from financeops.models import LedgerPosting, Wallet, WalletBalanceShard
+from financeops.services.ledger import (
+    LedgerTransaction,
+    Posting,
+    get_wallet_balance,
+    lock_wallet_balance,
+    post_transaction,
+    post_transactions,
+    shard_wallet,
+    verify_wallet_balances,
+    wallet_posting,
+)
+
+
+def revenue(wallet: Wallet, amount: int) -> LedgerTransaction:
+    return LedgerTransaction(
+        [Posting(LedgerPosting.ORDER_ESCROW, -amount), wallet_posting(wallet.id, amount)]
+    )
+
+
+@pytest.mark.django_db
+def test_sharded_wallet_credits_go_to_shards():
+    wallet = SellerFactory().wallet
+    post_transaction(revenue(wallet, 1000).postings)
+    shard_wallet(wallet.id, 4)
+
+    post_transactions([revenue(wallet, 100) for _ in range(20)])
+    post_transaction(revenue(wallet, 1000).postings)
+
+    wallet.refresh_from_db()
+    assert wallet.balance == 1000
+    shards = WalletBalanceShard.objects.filter(wallet=wallet)
+    assert shards.count() == 4
+    assert sum(shard.balance for shard in shards) == 3000
+    assert get_wallet_balance(wallet) == 4000
+    assert verify_wallet_balances(chunk_size=1) == []
+
+
+@pytest.mark.django_db
+def test_sharded_wallet_debits_fold_the_shards():
+    wallet = SellerFactory().wallet
+    shard_wallet(wallet.id, 3)
+    post_transactions([revenue(wallet, 500) for _ in range(3)])
+    wallet.refresh_from_db()
+    assert get_wallet_balance(wallet) == 1500
+
+    with pytest.raises(WalletNotEnoughCurrencyError):
+        post_transaction(
+            [wallet_posting(wallet.id, -1600), Posting(LedgerPosting.EXTERNAL, 1600)]
+        )
+    post_transaction(
+        [wallet_posting(wallet.id, -1200), Posting(LedgerPosting.EXTERNAL, 1200)]
+    )
+
+    wallet.refresh_from_db()
+    assert wallet.balance == 300
+    assert not WalletBalanceShard.objects.filter(wallet=wallet, balance__gt=0).exists()
+    # the cached balance is dropped by the debit
+    assert get_wallet_balance(wallet) == 300
+    assert lock_wallet_balance(wallet.id) == 300
+
+    shard_wallet(wallet.id, 0)
+    wallet.refresh_from_db()
+    assert (wallet.balance, wallet.shard_count) == (300, 0)
+    assert not WalletBalanceShard.objects.filter(wallet=wallet).exists()
+    assert verify_wallet_balances() == []
+
+
+@pytest.mark.django_db
+def test_shard_wallet_changes_the_shards_in_place():
+    wallet = SellerFactory().wallet
+    shard_wallet(wallet.id, 4)
+    post_transactions([revenue(wallet, 100) for _ in range(8)])
+    kept_ids = set(
+        WalletBalanceShard.objects.filter(wallet=wallet, index__lt=2).values_list(
+            "id", flat=True
+        )
+    )
+
+    shard_wallet(wallet.id, 2)
+    shards = WalletBalanceShard.objects.filter(wallet=wallet)
+    assert set(shards.values_list("id", flat=True)) == kept_ids
+    assert not shards.filter(balance__gt=0).exists()
+    shard_wallet(wallet.id, 3)
+    assert sorted(shards.values_list("index", flat=True)) == [0, 1, 2]
+
+    wallet.refresh_from_db()
+    assert (wallet.balance, wallet.shard_count) == (800, 3)
+    assert verify_wallet_balances() == []
+
+
+@pytest.mark.django_db
+def test_sharded_wallet_credits_after_the_shards_shrink(mocker):
+    wallet = SellerFactory().wallet
+    shard_wallet(wallet.id, 4)
+    shard_wallet(wallet.id, 2)
+    # a credit which read the shard count before the shards shrunk
+    mocker.patch("financeops.services.ledger.random.randrange", return_value=3)
+
+    post_transaction(revenue(wallet, 700).postings)
+
+    wallet.refresh_from_db()
+    assert wallet.balance == 700
+    assert get_wallet_balance(wallet) == 700
+    assert verify_wallet_balances() == []
+
+
+@pytest.mark.django_db
+def test_request_withdrawal_reads_the_shards(settings):
+    settings.WITHDRAWAL_MIN_AMOUNT = 1000
+    seller = SellerFactory()
+    bank_card = BankCard.objects.create(
+        user=seller, card_number="6037991234567890", iban="IR" + "0" * 24
+    )
+    shard_wallet(seller.wallet.id, 2)
+    post_transactions([revenue(seller.wallet, 2000) for _ in range(2)])
+
+    with pytest.raises(ValidationError):
+        request_withdrawal(bank_card, 5000)
+    withdrawal = request_withdrawal(bank_card, 4000)
+
+    assert withdrawal.amount == 4000
+    with pytest.raises(ValidationError):
+        request_withdrawal(bank_card, 1000)  # a pending withdrawal already exists
@@ -0,0 +1,16 @@
+from django.urls import path
+
+from financeops import views
+
+urlpatterns = [
+    path(
+        "export/<str:dataset>/",
+        views.FinancialExportView.as_view(),
+        name="financial-export",
+    ),
+    path(
+        "settlements/",
+        views.SettlementReportView.as_view(),
+        name="settlement-report",
+    ),
+]
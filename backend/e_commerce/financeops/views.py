@@ -1,3 +1,82 @@
-from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from financeops.serializers import (
+    ExportQuerySerializer,
+    SettlementReportQuerySerializer,
+    SettlementReportRowSerializer,
+)
+from financeops.services.export import (
+    DATASETS,
+    EXPORT_FORMATS,
+    ExportFilters,
+    UnsupportedExportFilterError,
+    export_dataset,
+)
+from financeops.services.settlement import get_settlement_report
+
+
+class FinancialExportView(APIView):
+    """
+    Stream the export of a financial dataset as CSV or JSON Lines.
+
+    Admins can export the whole history, other users are limited to the rows
+    involving themselves (as the seller filter is forced to the current user).
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, dataset: str):
+        if dataset not in DATASETS:
+            return Response(
+                data="The requested dataset wasn't found.",
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+        export_format = params.pop("export_format")
+        if not request.user.is_admin:
+            params["seller"] = request.user.id
+        try:
+            lines = export_dataset(dataset, export_format, ExportFilters(**params))
+        except UnsupportedExportFilterError as exc:
+            return Response(data=str(exc), status=status.HTTP_400_BAD_REQUEST)
+        filename = f"{dataset}_{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+        return StreamingHttpResponse(
+            lines,
+            content_type=EXPORT_FORMATS[export_format],
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+
+class SettlementReportView(APIView):
+    """
+    The totals of the financial records per day, week or month and type within
+    a date range, read from the daily settlement rollups.
+
+    Admins can get the report of any user (or the whole platform if no user is
+    given), other users only get their own report.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = SettlementReportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        user_id = params.get("user") if request.user.is_admin else request.user.id
+        report = get_settlement_report(
+            params["date_from"],
+            params["date_to"],
+            user_id=user_id,
+            type=params.get("type"),
+            period=params["period"],
+        )
+        return Response(
+            SettlementReportRowSerializer([row._asdict() for row in report], many=True).data
+        )
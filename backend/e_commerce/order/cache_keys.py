@@ -0,0 +1,16 @@
+def cart_snapshot_cache_key(user_id: int) -> str:
+    return f"cart:{user_id}:snapshot"
+
+
+# the hash tag keeps all of the index's keys in one slot for the multi-key commands
+CART_VARIANT_INDEX_BUILT_KEY = "{cart_index}:built"
+CART_VARIANT_INDEX_KEY_PATTERN = "{cart_index}:variant:*"
+
+
+def cart_variant_index_key(variant_id: int) -> str:
+    return f"{{cart_index}}:variant:{variant_id}"
+
+
+PAYMENT_CALLBACK_STREAM_KEY = "payment_callbacks:stream"
+PAYMENT_CALLBACK_GROUP = "payment_callbacks"
+PAYMENT_CALLBACK_DEAD_LETTER_STREAM_KEY = "payment_callbacks:dead_letter"
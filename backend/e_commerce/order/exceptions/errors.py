@@ -7,6 +7,10 @@ from django.utils.translation import gettext_lazy as _
 class ResponseBaseError(Exception):
     """Abstract class used for other custom errors"""
 
+    message = None
+    code = None
+    http_status = 400
+
     def __init__(
         self,
         message: Optional[str] = None,
@@ -14,18 +18,17 @@ class ResponseBaseError(Exception):
         http_status: Optional[int] = None,
         *args,
     ):
-        if not self.message or not message:
+        if not (message or self.message):
             raise RuntimeError(
                 "A `message` arg should be provided either as a class attribute or as an argument passed to __init__"
             )
-        if not self.code or not code:
+        if not (code or self.code):
             raise RuntimeError(
                 "A `code` arg should be provided either as a class attribute or as an argument passed to __init__"
             )
         self.message = message or self.message
         self.code = code or self.code
-        if not http_status or self.http_status:
-            self.http_status = 400
+        self.http_status = http_status or self.http_status
         super().__init__(self.message)
 
     def as_dict(self):
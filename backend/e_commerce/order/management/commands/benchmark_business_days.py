@@ -0,0 +1,59 @@
+import random
+import time
+from datetime import date, timedelta
+
+import holidays
+from django.core.management.base import BaseCommand, CommandParser
+
+from order.services.business_calendar import THURSDAY, FRIDAY, add_business_days
+
+
+def walk_business_days(day: date, business_days: int) -> date:
+    "The previous implementation, walks day by day with a new holidays instance."
+    ir_holidays = holidays.IR()
+    added_days = 0
+    while added_days < business_days:
+        day += timedelta(days=1)
+        if day.weekday() not in (THURSDAY, FRIDAY) and day not in ir_holidays:
+            added_days += 1
+    return day
+
+
+class Command(BaseCommand):
+    help = "Benchmark the business-day calendar against walking the days one by one"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--calls", type=int, default=10000, help="Number of calls to benchmark"
+        )
+        parser.add_argument(
+            "--business_days",
+            type=int,
+            default=5,
+            help="Number of business days to add on each call",
+        )
+
+    def handle(self, *args, **kwargs):
+        calls, business_days = kwargs["calls"], kwargs["business_days"]
+        today = date.today()
+        days = [today + timedelta(days=random.randint(0, 365)) for _ in range(calls)]
+        add_business_days(today, business_days)  # warm up the calendar
+
+        start_time = time.perf_counter()
+        walked = [walk_business_days(day, business_days) for day in days]
+        walk_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        searched = [add_business_days(day, business_days) for day in days]
+        search_duration = time.perf_counter() - start_time
+
+        if walked != searched:
+            self.stderr.write(self.style.ERROR("The results of the methods differ."))
+            return
+        self.stdout.write(f"Day by day walk duration: {walk_duration:.4f} seconds")
+        self.stdout.write(f"Calendar search duration: {search_duration:.4f} seconds")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"The calendar is faster by {walk_duration / search_duration:.1f} times"
+            )
+        )
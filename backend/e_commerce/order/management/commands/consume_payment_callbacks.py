@@ -0,0 +1,54 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+from redis.exceptions import RedisError
+
+from order.services.callbacks import CALLBACK_BATCH_SIZE, consume_payment_callbacks
+
+
+class Command(BaseCommand):
+    help = "Handle the enqueued payment callbacks as a consumer of the callbacks' consumer group"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=CALLBACK_BATCH_SIZE,
+            help="Number of callbacks to handle per batch",
+        )
+        parser.add_argument(
+            "--block",
+            type=float,
+            default=5,
+            help="Seconds to wait for new callbacks when the stream is drained",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the stream once and exit"
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size, block = kwargs["batch_size"], kwargs["block"]
+        # the consumers of the group are told apart by their names
+        consumer = f"{socket.gethostname()}:{os.getpid()}"
+        while True:
+            try:
+                report = consume_payment_callbacks(
+                    consumer,
+                    batch_size,
+                    block=None if kwargs["once"] else int(block * 1000),
+                )
+            except RedisError as exc:
+                if kwargs["once"]:
+                    raise
+                self.stderr.write(f"Failed to consume the payment callbacks: {exc}")
+                time.sleep(block)
+                continue
+            handled = report.paid + report.failed + report.cancelled + report.unresolved
+            if handled:
+                self.stdout.write(
+                    f"Handled {handled} payment callbacks, {report.paid} paid"
+                )
+            if kwargs["once"]:
+                return
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from order.services.outbox import OUTBOX_BATCH_SIZE, relay_outbox_messages
+
+
+class Command(BaseCommand):
+    help = "Publish the celery tasks of the transactional outbox to the broker"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help="Number of messages to publish per batch",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait when the outbox is drained",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Drain the outbox once and exit"
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size, interval = kwargs["batch_size"], kwargs["interval"]
+        while True:
+            relayed = relay_outbox_messages(batch_size)
+            if relayed:
+                self.stdout.write(f"Published {relayed} outbox messages")
+            if kwargs["once"]:
+                return
+            time.sleep(interval)
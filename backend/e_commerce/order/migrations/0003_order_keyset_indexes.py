@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+import order.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecom_user_profile', '0007_alter_sellerprofile_store_name'),
+        ('order', '0002_alter_orderitem_product_variant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='expire_timestamp',
+            field=models.DateTimeField(default=order.models.get_order_expire_timestamp, help_text='Indicates that if the order is expired (timed out) if its not paid.'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='status',
+            field=models.CharField(choices=[('OH', 'Onhold'), ('UP', 'Unpaid'), ('PD', 'Paid'), ('PC', 'Processing'), ('SH', 'Shipped'), ('DL', 'Delivered'), ('CP', 'Completed'), ('CC', 'Cancelled'), ('RF', 'Refunded'), ('TO', 'Timed Out')], default='UP', max_length=2),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['seller', 'created_at', 'id'], name='order_seller_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='order_customer_created_idx'),
+        ),
+    ]
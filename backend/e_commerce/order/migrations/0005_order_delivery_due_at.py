@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecom_user_profile', '0007_alter_sellerprofile_store_name'),
+        ('order', '0004_order_status_expire_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivery_due_at',
+            field=models.DateTimeField(blank=True, help_text='Set upon shipment, the order is considered delivered after this time.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'delivery_due_at'], name='order_status_delivery_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0005_order_delivery_due_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='held_by_server',
+            field=models.BooleanField(default=False, help_text='The order is put ON_HOLD by the server due to all of the IPGs being down.'),
+        ),
+    ]
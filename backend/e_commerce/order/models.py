@@ -34,6 +34,10 @@ class OrderItem(models.Model):
         unique_together = ("order", "product_variant")
 
 
+def get_order_expire_timestamp():
+    return timezone.now() + timedelta(minutes=settings.ORDER_TIMEOUT)
+
+
 # Since the business model is a B2C multi vendor platform and the
 # web service is not responsible for centralizing the different
 # ordered products from different vendors, thus customers CANNOT add
@@ -177,15 +181,59 @@ class Order(models.Model):
     refund_reason = models.CharField(max_length=300, blank=True)  # set by customer
     tracking_code = models.CharField(blank=True, max_length=50)  # set by seller
     expire_timestamp = models.DateTimeField(
-        default=timezone.now() + timedelta(minutes=settings.ORDER_TIMEOUT),
+        default=get_order_expire_timestamp,
         help_text="Indicates that if the order is expired (timed out) if its not paid.",
     )
+    delivery_due_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Set upon shipment, the order is considered delivered after this time.",
+    )
+    held_by_server = models.BooleanField(
+        default=False,
+        help_text="The order is put ON_HOLD by the server due to all of the IPGs being down.",
+    )
 
     def get_total_price(self) -> int:
         results = self.items.aggregate(total=Sum(F("submitted_price") * F("quantity")))
         return results["total"]
 
+    class Meta:
+        # composite indexes for keyset pagination of the seller's and
+        # the customer's order listings (refer to `ecom_core.pagination`).
+        indexes = [
+            models.Index(
+                fields=["seller", "created_at", "id"], name="order_seller_created_idx"
+            ),
+            models.Index(
+                fields=["customer", "created_at", "id"],
+                name="order_customer_created_idx",
+            ),
+            # for finding the expired unpaid orders (refer to `order.services.expiry`)
+            models.Index(
+                fields=["status", "expire_timestamp"], name="order_status_expire_idx"
+            ),
+            # for finding the shipped orders which are due to be delivered
+            # (refer to `order.services.delivery`)
+            models.Index(
+                fields=["status", "delivery_due_at"], name="order_status_delivery_idx"
+            ),
+        ]
+
+
+class OutboxMessage(models.Model):
+    """
+    A celery task to be published after the transaction which enqueued it is
+    committed, written within the same transaction (transactional outbox), so the
+    task is neither published before the commit nor lost if the broker is down.
+    The messages are published and deleted by the relay (refer to
+    `order.services.outbox`).
+    """
 
+    task = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
 
 
 class Cart(models.Model):
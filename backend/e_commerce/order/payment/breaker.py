@@ -0,0 +1,184 @@
+"""
+Per-IPG circuit breakers, fed by the outcomes of the real requests to the IPGs
+(refer to `order.payment.http.GatewayTransport`).
+
+The outcomes are counted in a sliding window of buckets kept in Redis, so all of
+the workers share the same view of each IPG. A breaker opens when the error rate
+or the average latency of its window crosses the thresholds, which routes the
+new payments away from the IPG right away. After a cooldown, the breaker becomes
+half-open and lets a single probe request through at a time, a successful probe
+closes the breaker and a failed one opens it again.
+
+The transitions of the breakers drive the IPG outage policy of the orders
+(refer to `order.services.ipg_outage`).
+"""
+
+import functools
+import logging
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("order")
+
+BREAKER_BUCKET_SECONDS = 10
+BREAKER_WINDOW_BUCKETS = 6  # a window of a minute
+BREAKER_MIN_REQUESTS = 10  # the least number of requests in the window for opening
+BREAKER_ERROR_RATE_THRESHOLD = 50  # in percent
+BREAKER_LATENCY_THRESHOLD = 3000  # average latency in milliseconds
+BREAKER_COOLDOWN = 30  # in seconds, before an open breaker becomes half-open
+BREAKER_PROBE_TIMEOUT = 10  # in seconds, before another probe is let through
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Records an outcome in the bucket of the window and evaluates the breaker.
+# Returns the state of the breaker and whether it has changed (1 or 0).
+_RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ok = ARGV[2] == '1'
+local latency = tonumber(ARGV[3])
+local bucket_seconds = tonumber(ARGV[4])
+local window_buckets = tonumber(ARGV[5])
+local bucket = math.floor(now / bucket_seconds)
+
+redis.call('HINCRBY', KEYS[1], bucket .. ':n', 1)
+redis.call('HINCRBY', KEYS[1], bucket .. ':l', latency)
+if not ok then
+    redis.call('HINCRBY', KEYS[1], bucket .. ':e', 1)
+end
+redis.call('EXPIRE', KEYS[1], bucket_seconds * window_buckets * 2)
+
+local totals = {n = 0, e = 0, l = 0}
+local fields = redis.call('HGETALL', KEYS[1])
+for i = 1, #fields, 2 do
+    local field_bucket, kind = string.match(fields[i], '(%d+):(%a)')
+    if tonumber(field_bucket) <= bucket - window_buckets then
+        redis.call('HDEL', KEYS[1], fields[i])
+    else
+        totals[kind] = totals[kind] + tonumber(fields[i + 1])
+    end
+end
+
+local state = redis.call('HGET', KEYS[2], 'state') or 'closed'
+if state == 'open' and now - tonumber(redis.call('HGET', KEYS[2], 'opened_at')) >= tonumber(ARGV[9]) then
+    state = 'half_open'
+end
+if state == 'half_open' then
+    redis.call('DEL', KEYS[3])
+    if ok then
+        redis.call('DEL', KEYS[1], KEYS[2])
+        return {'closed', 1}
+    end
+    redis.call('HSET', KEYS[2], 'state', 'open', 'opened_at', now)
+    return {'open', 0}
+end
+if state == 'closed' and totals.n >= tonumber(ARGV[6]) and
+        (totals.e * 100 >= totals.n * tonumber(ARGV[7]) or totals.l / totals.n >= tonumber(ARGV[8])) then
+    redis.call('HSET', KEYS[2], 'state', 'open', 'opened_at', now)
+    return {'open', 1}
+end
+return {state, 0}
+"""
+
+
+@functools.cache
+def _record_script():
+    # registered once per process, the calls pass the current client of the cache
+    return cache.client.get_client().register_script(_RECORD_SCRIPT)
+
+
+def _keys(service_name: str) -> list[str]:
+    # the hash tag keeps the keys of a breaker in one slot for the scripts
+    prefix = f"{{ipg_breaker:{service_name}}}"
+    return [f"{prefix}:window", f"{prefix}:state", f"{prefix}:probe"]
+
+
+class CircuitBreaker:
+    def __init__(self, service_name: str):
+        self.service_name = service_name
+        self.window_key, self.state_key, self.probe_key = _keys(service_name)
+
+    @property
+    def state(self) -> str:
+        try:
+            state = cache.client.get_client().hgetall(self.state_key)
+        except RedisError as exc:
+            logger.warning(f"The circuit breaker of {self.service_name} is unavailable: {exc}")
+            return CLOSED
+        if not state:
+            return CLOSED
+        if time.time() - float(state[b"opened_at"]) >= BREAKER_COOLDOWN:
+            return HALF_OPEN
+        return OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request to the IPG should be made, a half-open breaker only lets
+        a single probe through at a time. Requests are allowed if Redis is unavailable.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        try:
+            return bool(
+                cache.client.get_client().set(
+                    self.probe_key, 1, nx=True, ex=BREAKER_PROBE_TIMEOUT
+                )
+            )
+        except RedisError:
+            return True
+
+    def record(self, ok: bool, latency: float) -> str:
+        """
+        Record the outcome of a request, with its latency in seconds. Returns the
+        state of the breaker after the outcome.
+        """
+        try:
+            state, changed = _record_script()(
+                keys=[self.window_key, self.state_key, self.probe_key],
+                args=[
+                    time.time(),
+                    int(ok),
+                    int(latency * 1000),
+                    BREAKER_BUCKET_SECONDS,
+                    BREAKER_WINDOW_BUCKETS,
+                    BREAKER_MIN_REQUESTS,
+                    BREAKER_ERROR_RATE_THRESHOLD,
+                    BREAKER_LATENCY_THRESHOLD,
+                    BREAKER_COOLDOWN,
+                ],
+                client=cache.client.get_client(),
+            )
+        except RedisError as exc:
+            logger.warning(f"Failed to record the outcome of {self.service_name}: {exc}")
+            return CLOSED
+        state = state.decode() if isinstance(state, bytes) else state
+        if changed:
+            logger.warning(f"The circuit breaker of {self.service_name} is {state}.")
+            _on_transition()
+        return state
+
+    def reset(self) -> None:
+        cache.client.get_client().delete(self.window_key, self.state_key, self.probe_key)
+
+
+def _on_transition() -> None:
+    # imported here, as the tasks module depends on the payment clients
+    from order.tasks import apply_ipg_outage_policy
+
+    apply_ipg_outage_policy.delay()
+
+
+def get_open_services(service_names: Iterable[str]) -> set[str]:
+    "Return the names of the given services whose breakers are open (not half-open)."
+    return {
+        service_name
+        for service_name in service_names
+        if CircuitBreaker(service_name).state == OPEN
+    }
@@ -1,21 +1,26 @@
 import logging
 from abc import ABC, abstractmethod
+from typing import Optional
+
+from pydantic import ValidationError
+from zibal.configs import PAYMENT_BASE_URL
+from zibal.models.schemas import (
+    TransactionInquiryRequest,
+    TransactionInquiryResponse,
+    TransactionRequireRequest,
+    TransactionRequireResponse,
+    TransactionVerifyRequest,
+    TransactionVerifyResponse,
+)
+from zibal.response_codes import RESULT_CODES
 
-from django.conf import settings
-from django.urls import reverse
-from financeops.models import Payment
+from order.payment.exceptions import PaymentResponseError
+from order.payment.http import GatewayTransport
 from order.payment.schemas import PaymentRequestResponse, PaymentStatusResponse
-from payment.exceptions import (
-    PaymentGatewayNotFoundError,
-    PaymentNotImplementedError,
-    PaymentRequestError,
-    PaymentResponseError,
-)
-from zibal.client import ZibalIPGClient as ZibalClient
-from zibal.exceptions import RequestError, ResultError
 
 
-# An interface for implementing payment clients
+# An interface for implementing payment clients, the `a` prefixed methods are
+# the asyncio variants of the methods.
 class PaymentGatewayClient(ABC):
     def __init__(self, service_name: str, logger=None, *args, **kwargs):
         self.service_name = service_name
@@ -23,7 +28,13 @@ class PaymentGatewayClient(ABC):
 
     @abstractmethod
     def request_transaction(
-        self, amount: int, callback_url: str
+        self, amount: int, callback_url: str, idempotency_key: Optional[str] = None
+    ) -> PaymentRequestResponse:
+        pass
+
+    @abstractmethod
+    async def arequest_transaction(
+        self, amount: int, callback_url: str, idempotency_key: Optional[str] = None
     ) -> PaymentRequestResponse:
         pass
 
@@ -31,10 +42,18 @@ class PaymentGatewayClient(ABC):
     def verify_transaction(self, track_id: int) -> PaymentStatusResponse:
         pass
 
+    @abstractmethod
+    async def averify_transaction(self, track_id: int) -> PaymentStatusResponse:
+        pass
+
     @abstractmethod
     def inquiry_transaction(self, track_id: int) -> PaymentStatusResponse:
         pass
 
+    @abstractmethod
+    async def ainquiry_transaction(self, track_id: int) -> PaymentStatusResponse:
+        pass
+
     @abstractmethod
     def get_payment_link(self, track_id: int) -> str:
         pass
@@ -45,76 +64,139 @@ class PaymentGatewayClient(ABC):
 
 
 class ZibalIPGClient(PaymentGatewayClient):
-    def __init__(self, merchant_id: str, logger=None, client=None):
-        self.zibal_client = client or ZibalClient(
-            merchant_id, raise_on_invalid_result=True, request_timeout=4
-        )
-        super().__init__(logger)
+    """
+    Zibal's IPG client over a pooled `GatewayTransport`, the requests and the
+    responses are (de)serialized by the schemas of the `zibal-client` library.
 
-    def _handle_error(self, e: Exception) -> None:
-        if isinstance(e, ResultError):
+    Verifications are idempotent per track id, so verifying a transaction more
+    than once (e.g. by a retried task) returns the first successful verification
+    instead of Zibal's "already verified" result.
+    """
+
+    SUCCESS_RESULT = 100
+
+    def __init__(self, merchant_id: str, transport: GatewayTransport, logger=None):
+        super().__init__("zibal", logger)
+        self.merchant_id = merchant_id
+        self.transport = transport
+
+    def _is_successful(self, body: dict) -> bool:
+        return body.get("result") == self.SUCCESS_RESULT
+
+    def _validate_result(self, body: dict) -> None:
+        if not self._is_successful(body):
+            result = body.get("result")
             self.logger.error(
-                f"Bad response received from ZibalIPG for transaction request: {str(e)}"
+                "Bad response received from ZibalIPG: "
+                f"{RESULT_CODES.get(result, 'Unknown result code')} ({result})"
             )
             raise PaymentResponseError()
-        else:
-            self.logger.error(
-                f"Error in ZibalIPG transaction request HTTP request: {str(e)}"
-            )
-            raise PaymentRequestError()
 
-    def request_transaction(self, amount, callback_url) -> PaymentRequestResponse:
+    def _parse(self, schema, body: dict):
+        self._validate_result(body)
         try:
-            response = self.zibal_client.request_transaction(
-                amount, callback_url=callback_url
-            )
-        except Exception as e:
-            self._handle_error(e)
+            return schema.from_camel_case(body)
+        except ValidationError as e:
+            self.logger.error(f"Unexpected response body received from ZibalIPG: {e}")
+            raise PaymentResponseError()
+
+    def _request_transaction_data(self, amount: int, callback_url: str) -> dict:
+        return TransactionRequireRequest(
+            merchant=self.merchant_id, amount=amount, callback_url=callback_url
+        ).model_dump_to_camel(exclude_none=True, mode="json")
 
+    def _track_data(self, schema, track_id: int) -> dict:
+        return schema(merchant=self.merchant_id, track_id=track_id).model_dump_to_camel(
+            exclude_none=True
+        )
+
+    def _to_request_response(self, body: dict) -> PaymentRequestResponse:
+        response = self._parse(TransactionRequireResponse, body)
         return PaymentRequestResponse(
             result_code=response.result,
-            result_meaning=response.result_meaning,
+            result_meaning=response.message,
             track_id=response.track_id,
         )
 
-    def verify_transaction(self, track_id) -> PaymentStatusResponse:
-        try:
-            response = self.zibal_client.verify_transaction(track_id)
-        except Exception as e:
-            self._handle_error(e)
-
+    def _to_status_response(self, schema, body: dict) -> PaymentStatusResponse:
+        response = self._parse(schema, body)
         return PaymentStatusResponse(
             status=response.status,
             paid_at=response.paid_at,
             status_meaning=response.status_meaning,
             amount=response.amount,
-            ref_number=response.ref_number,
+            ref_number=(
+                str(response.ref_number) if response.ref_number is not None else None
+            ),
             description=response.description,
             order_id=response.order_id,
         )
 
-    def inquiry_transaction(self, track_id):
-        try:
-            response = self.zibal_client.inquiry_transaction(track_id)
-        except Exception as e:
-            self._handle_error(e)
+    def _verify_idempotency_key(self, track_id: int) -> str:
+        return f"verify:{track_id}"
 
-        return PaymentStatusResponse(
-            status=response.status,
-            paid_at=response.paid_at,
-            status_meaning=response.status_meaning,
-            amount=response.amount,
-            ref_number=response.ref_number,
-            description=response.description,
-            order_id=response.order_id,
+    def request_transaction(
+        self, amount, callback_url, idempotency_key=None
+    ) -> PaymentRequestResponse:
+        body = self.transport.post(
+            "request",
+            self._request_transaction_data(amount, callback_url),
+            idempotency_key=idempotency_key,
+            should_store=self._is_successful,
         )
+        return self._to_request_response(body)
 
-    def get_payment_link(self, track_id) -> str:
-        return self.zibal_client.create_payment_link(track_id)
+    async def arequest_transaction(
+        self, amount, callback_url, idempotency_key=None
+    ) -> PaymentRequestResponse:
+        body = await self.transport.apost(
+            "request",
+            self._request_transaction_data(amount, callback_url),
+            idempotency_key=idempotency_key,
+            should_store=self._is_successful,
+        )
+        return self._to_request_response(body)
+
+    def verify_transaction(self, track_id) -> PaymentStatusResponse:
+        body = self.transport.post(
+            "verify",
+            self._track_data(TransactionVerifyRequest, track_id),
+            idempotency_key=self._verify_idempotency_key(track_id),
+            should_store=self._is_successful,
+        )
+        return self._to_status_response(TransactionVerifyResponse, body)
+
+    async def averify_transaction(self, track_id) -> PaymentStatusResponse:
+        body = await self.transport.apost(
+            "verify",
+            self._track_data(TransactionVerifyRequest, track_id),
+            idempotency_key=self._verify_idempotency_key(track_id),
+            should_store=self._is_successful,
+        )
+        return self._to_status_response(TransactionVerifyResponse, body)
+
+    def inquiry_transaction(self, track_id) -> PaymentStatusResponse:
+        body = self.transport.post(
+            "inquiry",
+            self._track_data(TransactionInquiryRequest, track_id),
+            idempotent=True,
+        )
+        return self._to_status_response(TransactionInquiryResponse, body)
 
+    async def ainquiry_transaction(self, track_id) -> PaymentStatusResponse:
+        body = await self.transport.apost(
+            "inquiry",
+            self._track_data(TransactionInquiryRequest, track_id),
+            idempotent=True,
+        )
+        return self._to_status_response(TransactionInquiryResponse, body)
+
+    def get_payment_link(self, track_id) -> str:
+        return PAYMENT_BASE_URL + str(track_id)
 
     def check_health(self) -> bool:
-        return self.zibal_client.check_service_status()
+        response = self.transport.head()
+        return response is not None and response.status_code == 200
 
 
 class ZarinPalIPGClient(PaymentGatewayClient):
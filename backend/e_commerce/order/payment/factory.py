@@ -1,30 +1,96 @@
+import asyncio
+import threading
+
 from django.conf import settings
-from financeops.models import Payment
-from order.payment.clients import ZibalIPGClient
+from ecom_core import ipgs
+
+from order.payment.breaker import OPEN, CircuitBreaker
+from order.payment.clients import PaymentGatewayClient, ZibalIPGClient
 from order.payment.exceptions import (
     PaymentGatewayNotFoundError,
     PaymentNotImplementedError,
 )
+from order.payment.http import GatewayTransport
 
 
 class PaymentGatewayFactory:
-    "For creating a IPG payment client"
+    """
+    For creating a IPG payment client, a single client is kept per IPG in the
+    process, so its connection pool is reused by all of the requests.
+    """
 
-    @staticmethod
-    def get_client(selected_ipg: int):
+    _clients: dict[int, PaymentGatewayClient] = {}
+    _lock = threading.Lock()
+    # names of the implemented IPGs, used by their transports and breakers
+    SERVICE_NAMES = {ipgs.ZIBAL: "zibal"}
+
+    @classmethod
+    def get_client(cls, selected_ipg: int) -> PaymentGatewayClient:
         """
-        Creates and returns an instance of the given IPG.
+        Returns the client of the given IPG.
 
         Raises:
             PaymentNotImplementedError: Given IPG is recognized but the client is not implemented yet.
             PaymentGatewayNotFoundError: Given IPG is not recognized.
         """
-        ipgs = settings.IPG_CHOICES
+        client = cls._clients.get(selected_ipg)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(selected_ipg)
+                if client is None:
+                    client = cls._create_client(selected_ipg)
+                    cls._clients[selected_ipg] = client
+        return client
+
+    @classmethod
+    def get_available_ipgs(cls) -> list[int]:
+        """
+        Return the implemented IPGs which new payments can be routed to, i.e. the
+        ones whose circuit breakers aren't open.
+        """
+        return [
+            ipg
+            for ipg, service_name in cls.SERVICE_NAMES.items()
+            if CircuitBreaker(service_name).state != OPEN
+        ]
+
+    @classmethod
+    def probe_ipgs(cls) -> dict[int, bool]:
+        "Check whether the implemented IPGs are up, all of them concurrently."
+
+        async def probe_all():
+            clients = {ipg: cls.get_client(ipg) for ipg in cls.SERVICE_NAMES}
+            try:
+                results = await asyncio.gather(
+                    *[client.transport.aprobe() for client in clients.values()]
+                )
+            finally:
+                # the event loop is closed after the probes
+                for client in clients.values():
+                    await client.transport.aclose()
+            return dict(zip(clients, results))
+
+        return asyncio.run(probe_all())
+
+    @classmethod
+    def clear(cls) -> None:
+        "Close and drop the clients, e.g. when the IPG settings are changed."
+        with cls._lock:
+            for client in cls._clients.values():
+                transport = getattr(client, "transport", None)
+                if transport is not None:
+                    transport.close()
+            cls._clients.clear()
+
+    @staticmethod
+    def _create_client(selected_ipg: int) -> PaymentGatewayClient:
         if selected_ipg == ipgs.ZIBAL:
-            return ZibalIPGClient(settings.ZIBAL_MERCHANT_ID)
-        elif selected_ipg == ipgs.ASAN_PARDAKHT:
-            raise PaymentNotImplementedError()
-        elif selected_ipg == ipgs.ZARIN_PAL:
+            transport = GatewayTransport(
+                PaymentGatewayFactory.SERVICE_NAMES[ipgs.ZIBAL],
+                settings.IPG_API_BASE_URLS[ipgs.ZIBAL],
+            )
+            return ZibalIPGClient(settings.ZIBAL_MERCHANT, transport)
+        elif selected_ipg in (ipgs.ASAN_PARDAKHT, ipgs.ZARIN_PAL):
             raise PaymentNotImplementedError()
         else:
             raise PaymentGatewayNotFoundError()
@@ -0,0 +1,270 @@
+"""
+Pooled HTTP transport of the payment gateway clients.
+
+Each IPG has a single transport per process, which keeps a pool of persistent
+connections (for both the sync and the asyncio clients), so the requests don't
+go through the TCP/TLS setup every time. Failed requests are retried with
+jittered exponential backoff, the requests which might have reached the IPG
+are only retried if they're idempotent.
+
+The outcomes of the requests are recorded by the IPG's circuit breaker, and the
+requests are rejected right away while the breaker is open (refer to
+`order.payment.breaker`).
+
+An idempotency key can be given for the requests which shouldn't be repeated
+(e.g. verifying a transaction by its track id). The key is sent along with the
+request, and the response is stored under the key, so repeating the request
+(e.g. by a retried task) returns the stored response without reaching the IPG.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import weakref
+from typing import Callable, Optional
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from order.payment.breaker import CircuitBreaker
+from order.payment.exceptions import (
+    PaymentRequestError,
+    PaymentResponseError,
+    PaymentServiceUnavailableError,
+    PaymentTimeoutError,
+)
+
+IPG_REQUEST_TIMEOUT = httpx.Timeout(4.0, connect=2.0)
+IPG_MAX_CONNECTIONS = 20
+IPG_MAX_RETRIES = 3
+IPG_BACKOFF_BASE = 0.2  # in seconds
+IPG_BACKOFF_MAX = 2.0  # in seconds
+IDEMPOTENT_RESPONSE_TTL = 60 * 60 * 24  # 1 day
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int) -> float:
+    "Full jitter backoff, so the retries of concurrent requests don't line up."
+    return random.uniform(0, min(IPG_BACKOFF_MAX, IPG_BACKOFF_BASE * 2**attempt))
+
+
+def idempotent_response_cache_key(service_name: str, idempotency_key: str) -> str:
+    return f"ipg:{service_name}:idempotent:{idempotency_key}"
+
+
+class _RetryableStatusError(Exception):
+    pass
+
+
+class GatewayTransport:
+    def __init__(
+        self,
+        service_name: str,
+        base_url: str,
+        timeout: httpx.Timeout = IPG_REQUEST_TIMEOUT,
+        max_connections: int = IPG_MAX_CONNECTIONS,
+        max_retries: int = IPG_MAX_RETRIES,
+        breaker: Optional[CircuitBreaker] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.service_name = service_name
+        self.breaker = breaker or CircuitBreaker(service_name)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self.max_retries = max_retries
+        self.logger = logger or logging.getLogger(f"payment.{service_name}")
+        self._client: Optional[httpx.Client] = None
+        # the async clients are bound to their event loops
+        self._async_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits
+            )
+            self._async_clients[loop] = client
+        return client
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        "Close the async client of the running event loop."
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def _headers(self, idempotency_key: Optional[str]) -> dict:
+        return {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+
+    def _should_retry(self, exc: Exception, attempt: int, idempotent: bool) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True  # the request hasn't reached the IPG
+        return idempotent
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow_request():
+            self.logger.warning(
+                f"The request to {self.service_name} is rejected as its breaker is open."
+            )
+            raise PaymentServiceUnavailableError()
+
+    def _handle_response(self, response: httpx.Response) -> dict:
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise _RetryableStatusError(
+                f"status code: {response.status_code} content: {response.text}"
+            )
+        if response.status_code != 200:
+            self.logger.error(
+                f"Unexpected response status code from {self.service_name}: "
+                f"{response.status_code} content: {response.text}"
+            )
+            raise PaymentRequestError()
+        try:
+            return response.json()
+        except ValueError:
+            # e.g. the maintenance page of a proxy in front of the IPG
+            self.logger.error(
+                f"Invalid JSON response from {self.service_name}: {response.text}"
+            )
+            raise PaymentResponseError()
+
+    def _raise_error(self, exc: Exception, path: str):
+        self.logger.error(f"Request to {self.service_name} at {path} has failed: {exc}")
+        if isinstance(exc, httpx.TimeoutException):
+            raise PaymentTimeoutError()
+        raise PaymentRequestError()
+
+    def post(
+        self,
+        path: str,
+        data: dict,
+        idempotency_key: Optional[str] = None,
+        idempotent: bool = False,
+        should_store: Optional[Callable[[dict], bool]] = None,
+    ) -> dict:
+        """
+        POST the data to the IPG and return the response's JSON body, the request
+        is retried on failures if it's `idempotent` or has an idempotency key.
+        With an idempotency key, the response is stored if `should_store` accepts
+        it (e.g. only the successful responses), or always if it isn't given.
+
+        Raises:
+            PaymentTimeoutError: The IPG didn't respond in time.
+            PaymentRequestError: The request has failed (network errors, bad status codes).
+            PaymentResponseError: The response's body isn't JSON.
+        """
+        if idempotency_key:
+            cache_key = idempotent_response_cache_key(self.service_name, idempotency_key)
+            stored = cache.get(cache_key)
+            if stored is not None:
+                return stored
+        attempt = 0
+        while True:
+            self._check_breaker()
+            started_at = time.monotonic()
+            try:
+                response = self.client.post(
+                    path, json=data, headers=self._headers(idempotency_key)
+                )
+                self.breaker.record(
+                    response.status_code not in RETRYABLE_STATUS_CODES,
+                    time.monotonic() - started_at,
+                )
+                body = self._handle_response(response)
+                break
+            except (httpx.HTTPError, _RetryableStatusError) as exc:
+                if isinstance(exc, httpx.HTTPError):
+                    self.breaker.record(False, time.monotonic() - started_at)
+                if not self._should_retry(exc, attempt, idempotent or bool(idempotency_key)):
+                    self._raise_error(exc, path)
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+        if idempotency_key and (should_store is None or should_store(body)):
+            cache.set(cache_key, body, IDEMPOTENT_RESPONSE_TTL)
+        return body
+
+    async def apost(
+        self,
+        path: str,
+        data: dict,
+        idempotency_key: Optional[str] = None,
+        idempotent: bool = False,
+        should_store: Optional[Callable[[dict], bool]] = None,
+    ) -> dict:
+        "The asyncio variant of `post`."
+        if idempotency_key:
+            cache_key = idempotent_response_cache_key(self.service_name, idempotency_key)
+            stored = await cache.aget(cache_key)
+            if stored is not None:
+                return stored
+        attempt = 0
+        while True:
+            await sync_to_async(self._check_breaker)()
+            started_at = time.monotonic()
+            try:
+                response = await self.async_client.post(
+                    path, json=data, headers=self._headers(idempotency_key)
+                )
+                await sync_to_async(self.breaker.record)(
+                    response.status_code not in RETRYABLE_STATUS_CODES,
+                    time.monotonic() - started_at,
+                )
+                body = self._handle_response(response)
+                break
+            except (httpx.HTTPError, _RetryableStatusError) as exc:
+                if isinstance(exc, httpx.HTTPError):
+                    await sync_to_async(self.breaker.record)(
+                        False, time.monotonic() - started_at
+                    )
+                if not self._should_retry(exc, attempt, idempotent or bool(idempotency_key)):
+                    self._raise_error(exc, path)
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+        if idempotency_key and (should_store is None or should_store(body)):
+            await cache.aset(cache_key, body, IDEMPOTENT_RESPONSE_TTL)
+        return body
+
+    def head(self, path: str = "") -> Optional[httpx.Response]:
+        try:
+            return self.client.head(path)
+        except httpx.HTTPError as exc:
+            self.logger.warning(f"{self.service_name} service check has failed: {exc}")
+            return None
+
+    async def aprobe(self, path: str = "") -> bool:
+        """
+        Check whether the IPG is up by a HEAD request, the outcome is recorded by
+        the breaker (bypassing it), so a half-open breaker is closed by a successful probe.
+        """
+        started_at = time.monotonic()
+        try:
+            response = await self.async_client.head(path)
+            ok = response.status_code < 500
+        except httpx.HTTPError as exc:
+            self.logger.warning(f"{self.service_name} service check has failed: {exc}")
+            ok = False
+        await sync_to_async(self.breaker.record)(ok, time.monotonic() - started_at)
+        return ok
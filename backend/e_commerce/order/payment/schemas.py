@@ -15,8 +15,8 @@ class PaymentStatusResponse(BaseModel):
     status_meaning: str
     amount: int
     ref_number: Optional[str] = None
-    description: str
-    order_id: str
+    description: Optional[str] = None
+    order_id: Optional[str] = None
 
 
 PAYMENT_STATUS_CODES = {
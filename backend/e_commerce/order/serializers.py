@@ -2,7 +2,6 @@ import logging
 from typing import Union
 
 from django.conf import settings
-from django.core.cache import cache
 from ecom_user.models import EcomUser
 from ecom_user_profile.models import CustomerAddress
 from financeops.models import IPG, Payment, FinancialRecord
@@ -12,6 +11,7 @@ from zibal.client import ZibalIPGClient
 from zibal.response_codes import STATUS_CODES
 
 from order.models import Cart, CartItem, Order, OrderItem
+from order.payment.factory import PaymentGatewayFactory
 from order.services.order import (
     pay_order_using_wallet,
     process_order_creation,
@@ -19,13 +19,7 @@ from order.services.order import (
     update_order_to_shipped,
 )
 from order.services.payment import initiate_order_payment
-from order.tasks import cancel_unpaid_order
-from order.variant_validators import (
-    is_available,
-    is_product_enabled,
-    is_quantity_valid,
-    is_seller_active,
-)
+from order.services.validators import get_cart_errors
 
 logger = logging.getLogger("order")
 
@@ -40,9 +34,9 @@ class CartItemSerializer(serializers.ModelSerializer):
     """
 
     price = serializers.IntegerField(source="product_variant.price", read_only=True)
-    name = serializers.IntegerField(source="product_variant.name", read_only=True)
+    name = serializers.CharField(source="product_variant.name", read_only=True)
     image = serializers.ImageField(source="product_variant.image", read_only=True)
-    is_available = serializers.IntegerField(
+    is_available = serializers.BooleanField(
         source="product_variant.is_available", read_only=True
     )
 
@@ -53,10 +47,10 @@ class CartItemSerializer(serializers.ModelSerializer):
             "cart",
             "product_variant",
             "quantity",
-            "variant_price",
-            "variant_name",
-            "variant_image",
-            "available_stock",
+            "price",
+            "name",
+            "image",
+            "is_available",
         ]
         extra_kwargs = {
             "cart": {"read_only": True},
@@ -135,39 +129,38 @@ class CartSerializerForCustomer(serializers.ModelSerializer):
 
     items = CartItemSerializer(many=True, read_only=True)
     seller = serializers.SerializerMethodField()
+    total_price = serializers.SerializerMethodField()
     cart_errors = serializers.SerializerMethodField()
 
     class Meta:
         model = Cart
-        fields = ["id", "user", "items"]
+        fields = ["id", "user", "items", "seller", "total_price", "cart_errors"]
         extra_kwargs = {
             "user": {"read_only": True},
         }
 
     def get_seller(self, cart: Cart) -> Union[int, None]:
-        seller = cart.get_seller()
-        if not seller:
-            return None
-        return seller.id
+        for item in cart.items.all():
+            if item.product_variant:
+                return item.product_variant.product.owner_id
+        return None
+
+    def get_total_price(self, cart: Cart) -> int:
+        return sum(
+            item.product_variant.price * item.quantity
+            for item in cart.items.all()
+            if item.product_variant
+        )
 
     def get_cart_errors(self, cart: Cart) -> dict:
         """
         Validation factors that might change over time, such as product getting
-        unavailable, or the seller getting inactive.
+        unavailable, or the seller getting inactive, mapped by the cart item ids.
+
+        The cart's items should be prefetched along with the relations used by
+        the validations (refer to `get_carts_with_items`).
         """
-        errors = {}
-        for item in cart.items.all():
-            item_errors = []
-            if not is_available(item.variant):
-                item_errors.append("Item doesn't have available stocks.")
-            if not is_seller_active(item.variant):
-                item_errors.append("The seller is inactive.")
-            if not is_product_enabled(item.variant):
-                item_errors.append("The variant or the main product is disabled.")
-            if not is_quantity_valid(item.variant, item.quantity):
-                item_errors.append("The selected quantity is not valid.")
-            errors[item.variant.name] = item_errors
-        return errors
+        return get_cart_errors(cart, cart.items.all())
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -266,8 +259,7 @@ class OrderSerializerForCustomer(serializers.ModelSerializer):
     def create(self, validated_data):
         order = process_order_creation(validated_data)
         # initiate_order_payment(order)
-        # cancel the order if it isn't paid after 1 hour
-        cancel_unpaid_order.apply_async(args=(order.id), countdown=60 * 60)
+        # the order is timed out by `expire_unpaid_orders` if it isn't paid in time
         # Check the order's status and verify the payment on the IPG server if it is not so.
         # process_payment.apply_async(
         #     args=(order.payment_track_id, order.id), countdown=60 * 20
@@ -344,7 +336,7 @@ class OrderPaymentSerializer(serializers.Serializer):
             transaction = pay_order_using_wallet(order.customer.wallet, order)
             return transaction
         elif validated_data["ipg_choice"]:
-            ipgs = cache.get("available_ipgs")
+            ipgs = PaymentGatewayFactory.get_available_ipgs()
             if validated_data["ipg_id"] not in ipgs:
                 raise serializers.ValidationError(
                     "The selected IPG service is either not recognized or its disabled"
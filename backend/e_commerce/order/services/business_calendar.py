@@ -0,0 +1,112 @@
+"""
+Business-day calendar of the orders (Thursday and Friday weekends, plus the
+Iranian holidays).
+
+The business days of a multi-year window are precomputed once per process into a
+sorted array of date ordinals, so the queries are answered by binary search
+instead of walking day by day and building the holidays on every call. The
+window is anchored on the year of the queried date (and extended on demand), so
+it rolls over as the years pass.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import holidays
+
+THURSDAY, FRIDAY = 3, 4  # weekends
+
+# years covered by the calendar before and after the year of the queried date
+CALENDAR_YEARS_BEFORE = 1
+CALENDAR_YEARS_AFTER = 5
+
+# a lower bound of the number of business days in a year, used for extending
+# the window when a query doesn't fit in it
+MIN_BUSINESS_DAYS_PER_YEAR = 200
+
+
+class BusinessCalendar:
+    "Sorted business days of the years `first_year` to `last_year` (inclusive)."
+
+    def __init__(self, first_year: int, last_year: int):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.start = date(first_year, 1, 1)
+        self.end = date(last_year, 12, 31)
+        ir_holidays = holidays.IR(years=range(first_year, last_year + 1))
+        self.days = array(
+            "l",
+            (
+                ordinal
+                for ordinal in range(self.start.toordinal(), self.end.toordinal() + 1)
+                if date.fromordinal(ordinal).weekday() not in (THURSDAY, FRIDAY)
+                and date.fromordinal(ordinal) not in ir_holidays
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def covers(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def is_business_day(self, day: date) -> bool:
+        index = bisect_left(self.days, day.toordinal())
+        return index < len(self.days) and self.days[index] == day.toordinal()
+
+    def add_business_days(self, day: date, business_days: int) -> date | None:
+        """
+        Return the date which is the given number of business days after the day,
+        or None if it is beyond the calendar.
+        """
+        if business_days <= 0:
+            return day
+        index = bisect_right(self.days, day.toordinal()) + business_days - 1
+        if index >= len(self.days):
+            return None
+        return date.fromordinal(self.days[index])
+
+    def business_days_between(self, start: date, end: date) -> int:
+        "Number of the business days after `start` up to and including `end`."
+        if end <= start:
+            return 0
+        return bisect_right(self.days, end.toordinal()) - bisect_right(
+            self.days, start.toordinal()
+        )
+
+
+@lru_cache(maxsize=8)
+def get_business_calendar(anchor_year: int, years_after: int = CALENDAR_YEARS_AFTER):
+    "Return the (process-wide) calendar around the given year."
+    return BusinessCalendar(anchor_year - CALENDAR_YEARS_BEFORE, anchor_year + years_after)
+
+
+def _calendar_for(day: date, business_days: int = 0) -> BusinessCalendar:
+    years_after = max(
+        CALENDAR_YEARS_AFTER, business_days // MIN_BUSINESS_DAYS_PER_YEAR + 1
+    )
+    return get_business_calendar(day.year, years_after)
+
+
+def add_business_days(when: date | datetime, business_days: int) -> date | datetime:
+    """
+    Add business days to a `date` or `datetime` object by excluding weekends and
+    holidays, the time of a `datetime` is kept as is.
+    """
+    day = when.date() if isinstance(when, datetime) else when
+    target = _calendar_for(day, business_days).add_business_days(day, business_days)
+    return when + timedelta(days=(target - day).days)
+
+
+def business_days_between(start: date | datetime, end: date | datetime) -> int:
+    "Number of the business days after `start` up to and including `end`."
+    start = start.date() if isinstance(start, datetime) else start
+    end = end.date() if isinstance(end, datetime) else end
+    if end <= start:
+        return 0
+    calendar = get_business_calendar(
+        start.year, max(CALENDAR_YEARS_AFTER, end.year - start.year)
+    )
+    return calendar.business_days_between(start, end)
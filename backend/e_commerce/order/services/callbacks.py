@@ -0,0 +1,221 @@
+"""
+Asynchronous ingestion of the IPGs' payment callbacks.
+
+The callback endpoints only validate the callback and append it to a Redis stream,
+so they return right away and don't compete with the storefront traffic during
+payment spikes. The callbacks are consumed in batches by the consumers of the
+`payment_callbacks` consumer group (refer to the `consume_payment_callbacks`
+management command), which block on the stream while it's drained, deduplicate them by their track ids, verify the transactions with the IPGs
+concurrently and transition the payments and their orders in bulk (refer to
+`order.services.reconciliation`). A payment is only transitioned while it's
+PAYING and locked, so it's transitioned exactly once regardless of duplicate
+callbacks, concurrent workers or the periodic reconciliation.
+
+A callback is acknowledged after its batch is handled, the callbacks of a consumer
+which died (or failed to handle them) meanwhile are claimed by the other consumers
+once they've been pending for `CALLBACK_CLAIM_IDLE_TIME`. The callbacks which were
+delivered `CALLBACK_MAX_DELIVERIES` times are moved to a dead-letter stream rather
+than claimed again, so a callback which always fails can't block the stream. If
+Redis is unavailable, the callback is handled within the request instead.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.utils import timezone
+from financeops.models import Payment
+from redis.exceptions import RedisError, ResponseError
+
+from order.cache_keys import (
+    PAYMENT_CALLBACK_DEAD_LETTER_STREAM_KEY,
+    PAYMENT_CALLBACK_GROUP,
+    PAYMENT_CALLBACK_STREAM_KEY,
+)
+from order.services.reconciliation import (
+    apply_payment_transitions,
+    get_payment_status,
+    inquire_payments,
+)
+from order.services.schemas import ReconciliationReport
+
+logger = logging.getLogger("order")
+
+CALLBACK_BATCH_SIZE = 200
+CALLBACK_STREAM_MAX_LENGTH = 100_000
+CALLBACK_CLAIM_IDLE_TIME = 60 * 1000  # in milliseconds
+CALLBACK_MAX_DELIVERIES = 5
+
+
+def enqueue_payment_callback(ipg_service: int, track_id: str, success: bool) -> None:
+    "Append the callback to the stream, or handle it right away if Redis is unavailable."
+    callback = {"ipg_service": ipg_service, "track_id": str(track_id), "success": int(success)}
+    try:
+        cache.client.get_client().xadd(
+            PAYMENT_CALLBACK_STREAM_KEY,
+            callback,
+            maxlen=CALLBACK_STREAM_MAX_LENGTH,
+            approximate=True,
+        )
+    except RedisError as exc:
+        logger.warning(f"Failed to enqueue the payment callback, handling it inline: {exc}")
+        handle_payment_callbacks([callback])
+
+
+def handle_payment_callbacks(callbacks: list[dict]) -> ReconciliationReport:
+    """
+    Verify the transactions of the given callbacks with their IPGs and transition
+    their payments (and the orders of the paid ones) in bulk. The IPGs are the
+    source of truth, the callbacks only tell which payments to check.
+    """
+    report = ReconciliationReport()
+    track_ids = {str(callback["track_id"]) for callback in callbacks}
+    payments = {
+        payment["id"]: payment
+        for payment in Payment.objects.filter(
+            track_id__in=track_ids, status=Payment.PAYING
+        ).values(
+            "id",
+            "track_id",
+            "ipg_service",
+            "amount",
+            "order_id",
+            "wallet_id",
+            "track_id_submitted_at",
+        )
+    }
+    if len(payments) < len(track_ids):
+        known = {payment["track_id"] for payment in payments.values()}
+        logger.info(
+            f"Skipped the callbacks of unknown or already resolved payments: "
+            f"{sorted(track_ids - known)}"
+        )
+    if not payments:
+        return report
+
+    now = timezone.now()
+    responses = inquire_payments(list(payments.values()))
+    transitions = {}
+    for payment_id, response in responses.items():
+        new_status = get_payment_status(payments[payment_id], response, now)
+        if new_status:
+            transitions[payment_id] = new_status
+    report.unresolved += len(payments) - len(transitions)
+    if transitions:
+        apply_payment_transitions(payments, transitions, responses, report)
+    for mismatch in report.mismatches:
+        logger.warning(f"Payment callback mismatch: {mismatch.model_dump()}")
+    return report
+
+
+def _decode(fields: dict) -> dict:
+    return {key.decode(): value.decode() for key, value in fields.items()}
+
+
+def _ensure_group(client) -> None:
+    try:
+        client.xgroup_create(
+            PAYMENT_CALLBACK_STREAM_KEY, PAYMENT_CALLBACK_GROUP, id="0", mkstream=True
+        )
+    except ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+def _dead_letter_callbacks(client, consumer: str, batch_size: int) -> None:
+    "Move the pending callbacks delivered too many times to the dead-letter stream."
+    pending = client.xpending_range(
+        PAYMENT_CALLBACK_STREAM_KEY,
+        PAYMENT_CALLBACK_GROUP,
+        min="-",
+        max="+",
+        count=batch_size,
+        idle=CALLBACK_CLAIM_IDLE_TIME,
+    )
+    entry_ids = [
+        entry["message_id"]
+        for entry in pending
+        if entry["times_delivered"] >= CALLBACK_MAX_DELIVERIES
+    ]
+    if not entry_ids:
+        return
+    # claimed first, so only one of the consumers moves them
+    entries = client.xclaim(
+        PAYMENT_CALLBACK_STREAM_KEY,
+        PAYMENT_CALLBACK_GROUP,
+        consumer,
+        min_idle_time=CALLBACK_CLAIM_IDLE_TIME,
+        message_ids=entry_ids,
+    )
+    entries = [(entry_id, fields) for entry_id, fields in entries if fields]
+    if not entries:
+        return
+    for entry_id, fields in entries:
+        client.xadd(
+            PAYMENT_CALLBACK_DEAD_LETTER_STREAM_KEY,
+            {**fields, "entry_id": entry_id},
+            maxlen=CALLBACK_STREAM_MAX_LENGTH,
+            approximate=True,
+        )
+    entry_ids = [entry_id for entry_id, _ in entries]
+    client.xack(PAYMENT_CALLBACK_STREAM_KEY, PAYMENT_CALLBACK_GROUP, *entry_ids)
+    client.xdel(PAYMENT_CALLBACK_STREAM_KEY, *entry_ids)
+    logger.error(
+        f"Moved the payment callbacks delivered {CALLBACK_MAX_DELIVERIES} times to "
+        f"the dead-letter stream: {[_decode(fields) for _, fields in entries]}"
+    )
+
+
+def _read_callbacks(
+    client, consumer: str, batch_size: int, block: int | None
+) -> list[tuple]:
+    _dead_letter_callbacks(client, consumer, batch_size)
+    # the callbacks left pending by the dead consumers are claimed first
+    _, entries, *_ = client.xautoclaim(
+        PAYMENT_CALLBACK_STREAM_KEY,
+        PAYMENT_CALLBACK_GROUP,
+        consumer,
+        min_idle_time=CALLBACK_CLAIM_IDLE_TIME,
+        start_id="0-0",
+        count=batch_size,
+    )
+    if entries:
+        return entries
+    streams = client.xreadgroup(
+        PAYMENT_CALLBACK_GROUP,
+        consumer,
+        {PAYMENT_CALLBACK_STREAM_KEY: ">"},
+        count=batch_size,
+        block=block,
+    )
+    return streams[0][1] if streams else []
+
+
+def consume_payment_callbacks(
+    consumer: str, batch_size: int = CALLBACK_BATCH_SIZE, block: int | None = None
+) -> ReconciliationReport:
+    """
+    Handle the callbacks of the stream in batches as the given consumer of the
+    group, until the stream is drained. Returns the report of the handled callbacks.
+
+    If `block` is given, a drained stream is waited on for up to `block`
+    milliseconds for new callbacks.
+    """
+    report = ReconciliationReport()
+    client = cache.client.get_client()
+    _ensure_group(client)
+    while True:
+        entries = _read_callbacks(client, consumer, batch_size, block)
+        if not entries:
+            break
+        callbacks = [_decode(fields) for _, fields in entries if fields]
+        batch_report = handle_payment_callbacks(callbacks)
+        entry_ids = [entry_id for entry_id, _ in entries]
+        client.xack(PAYMENT_CALLBACK_STREAM_KEY, PAYMENT_CALLBACK_GROUP, *entry_ids)
+        client.xdel(PAYMENT_CALLBACK_STREAM_KEY, *entry_ids)
+
+        for field in ("paid", "failed", "cancelled", "unresolved", "paid_orders"):
+            setattr(report, field, getattr(report, field) + getattr(batch_report, field))
+        report.mismatches.extend(batch_report.mismatches)
+        if len(entries) < batch_size:
+            break
+    return report
@@ -2,13 +2,10 @@
 from ecom_user.models import EcomUser
 from product.models import ProductVariant
 
-from order.exceptions.errors import (
-    ResponseBaseError,
-)
 from order.models import Cart, CartItem
 from order.services.validators import (
+    get_cart_errors,
     run_cart_item_creation_validations,
-    run_cart_validations,
 )
 
 
@@ -25,13 +22,6 @@ class CartService:
         )
 
     @staticmethod
-    def get_user_cart_errors(user: EcomUser) -> dict[int, str]:
-        errors = {}
-        for item in user.cart.items.all():
-            item_errors = []
-            try:
-                run_cart_validations(item.product_variant)
-            except ResponseBaseError as exc:
-                item_errors.append(exc.message)
-            errors[item.variant.id] = item_errors
-        return errors
+    def get_user_cart_errors(user: EcomUser) -> dict[int, list[dict]]:
+        "Errors of the user's cart items mapped by the item ids (refer to `get_cart_errors`)."
+        return get_cart_errors(user.cart)
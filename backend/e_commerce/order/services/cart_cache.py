@@ -0,0 +1,84 @@
+"""
+Per-user snapshots of the carts (the serialized cart, including its items, total
+price, seller and validation errors) cached in Redis, served by `CartDetail`.
+
+The snapshots are written through on the changes of the cart items, and dropped
+when a change of the variants, products or sellers in a cart might change its
+prices or validation errors (refer to `order.signals`), including the stock
+movements of `order.services.inventory`. The carts of a variant are found by
+the reverse index of `order.services.cart_index`.
+"""
+
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from order.cache_keys import cart_snapshot_cache_key
+from order.models import Cart, CartItem
+from order.services.cart_index import get_variant_cart_user_ids
+from order.services.validators import CART_ITEM_VALIDATION_RELATIONS
+
+CART_SNAPSHOT_TTL = 10 * 60  # 10 mins
+
+
+def get_carts_with_items():
+    "Carts along with their items, loaded once for both their representation and validation."
+    return Cart.objects.prefetch_related(
+        Prefetch(
+            "items",
+            queryset=CartItem.objects.select_related(
+                CART_ITEM_VALIDATION_RELATIONS
+            ).order_by("id"),
+        )
+    )
+
+
+def _serialize(cart: Cart) -> dict:
+    from order.serializers import CartSerializerForCustomer
+
+    return CartSerializerForCustomer(cart).data
+
+
+def get_cart_snapshot(user_id: int) -> dict:
+    "Return the snapshot of the user's cart, the cart is created if it doesn't exist."
+    key = cart_snapshot_cache_key(user_id)
+    snapshot = cache.get(key)
+    if snapshot is None:
+        cart = get_carts_with_items().filter(user_id=user_id).first()
+        if cart is None:
+            cart = Cart.objects.create(user_id=user_id)
+        snapshot = _serialize(cart)
+        cache.set(key, snapshot, CART_SNAPSHOT_TTL)
+    return snapshot
+
+
+def refresh_cart_snapshot(cart_id: int) -> Optional[dict]:
+    "Rebuild and cache the snapshot of the given cart."
+    cart = get_carts_with_items().filter(id=cart_id).first()
+    if cart is None or cart.user_id is None:
+        return None
+    snapshot = _serialize(cart)
+    cache.set(cart_snapshot_cache_key(cart.user_id), snapshot, CART_SNAPSHOT_TTL)
+    return snapshot
+
+
+def invalidate_cart_snapshots(user_ids: Iterable[int]) -> None:
+    cache.delete_many([cart_snapshot_cache_key(user_id) for user_id in user_ids])
+
+
+def invalidate_variant_cart_snapshots(variant_ids: Iterable[int]) -> None:
+    "Drop the snapshots of the carts which contain any of the given variants."
+    invalidate_cart_snapshots(get_variant_cart_user_ids(variant_ids))
+
+
+def invalidate_seller_cart_snapshots(seller_id: int) -> None:
+    "Drop the snapshots of the carts which contain any of the seller's variants."
+    user_ids = (
+        CartItem.objects.filter(
+            product_variant__product__owner_id=seller_id, cart__user__isnull=False
+        )
+        .values_list("cart__user_id", flat=True)
+        .distinct()
+    )
+    invalidate_cart_snapshots(list(user_ids))
@@ -0,0 +1,101 @@
+"""
+Reverse index of the carts in Redis, the ids of the users whose carts contain a
+variant are kept in a set per variant. It's maintained on the writes of the cart
+items (refer to `order.signals`), so the carts affected by a change of a variant
+(e.g. its price or stock) are found without querying the cart items.
+
+Removals of the items which weren't seen by the signals (e.g. a variant being
+replaced in an item) leave stale members, which only cost a redundant cache
+invalidation and are cleaned by the periodic rebuild of the index. Until the
+index is built (or if Redis loses it), the lookups fall back to the database.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+from order.cache_keys import (
+    CART_VARIANT_INDEX_BUILT_KEY,
+    CART_VARIANT_INDEX_KEY_PATTERN,
+    cart_variant_index_key,
+)
+from order.models import CartItem
+
+logger = logging.getLogger("order")
+
+
+def add_cart_variant(user_id: int, variant_id: int) -> None:
+    try:
+        cache.client.get_client().sadd(cart_variant_index_key(variant_id), user_id)
+    except RedisError as exc:
+        # the index is corrected by the next rebuild
+        logger.warning(f"Failed to add the cart of the user {user_id} to the index: {exc}")
+
+
+def remove_cart_variant(user_id: int, variant_id: int) -> None:
+    try:
+        cache.client.get_client().srem(cart_variant_index_key(variant_id), user_id)
+    except RedisError as exc:
+        logger.warning(
+            f"Failed to remove the cart of the user {user_id} from the index: {exc}"
+        )
+
+
+def _get_indexed_user_ids(variant_ids: list[int]) -> set[int] | None:
+    redis_client = cache.client.get_client()
+    pipeline = redis_client.pipeline(transaction=False)
+    pipeline.exists(CART_VARIANT_INDEX_BUILT_KEY)
+    pipeline.sunion([cart_variant_index_key(variant_id) for variant_id in variant_ids])
+    built, members = pipeline.execute()
+    if not built:
+        return None
+    return {int(member) for member in members}
+
+
+def get_variant_cart_user_ids(variant_ids: Iterable[int]) -> set[int]:
+    "Return the ids of the users whose carts contain any of the given variants."
+    variant_ids = list(variant_ids)
+    if not variant_ids:
+        return set()
+    try:
+        user_ids = _get_indexed_user_ids(variant_ids)
+    except RedisError as exc:
+        logger.warning(f"The cart index is unavailable, using the database: {exc}")
+        user_ids = None
+    if user_ids is None:
+        user_ids = set(
+            CartItem.objects.filter(
+                product_variant_id__in=variant_ids, cart__user__isnull=False
+            ).values_list("cart__user_id", flat=True)
+        )
+    return user_ids
+
+
+def rebuild_cart_variant_index() -> int:
+    """
+    Rebuild the index from the cart items in the database, the old index is
+    replaced atomically. Returns the number of indexed variants.
+
+    An item written while the index is being rebuilt might be left out until the
+    next rebuild, the cart's snapshot still expires by its TTL meanwhile.
+    """
+    carts = defaultdict(set)
+    items = CartItem.objects.filter(
+        product_variant__isnull=False, cart__user__isnull=False
+    ).values_list("product_variant_id", "cart__user_id")
+    for variant_id, user_id in items.iterator():
+        carts[variant_id].add(user_id)
+
+    redis_client = cache.client.get_client()
+    old_keys = list(redis_client.scan_iter(match=CART_VARIANT_INDEX_KEY_PATTERN))
+    pipeline = redis_client.pipeline(transaction=True)
+    if old_keys:
+        pipeline.delete(*old_keys)
+    for variant_id, user_ids in carts.items():
+        pipeline.sadd(cart_variant_index_key(variant_id), *user_ids)
+    pipeline.set(CART_VARIANT_INDEX_BUILT_KEY, 1)
+    pipeline.execute()
+    return len(carts)
@@ -0,0 +1,127 @@
+import logging
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+from financeops.models import FinancialRecord, LedgerPosting, Wallet
+from financeops.services.ledger import (
+    LedgerTransaction,
+    Posting,
+    post_transactions,
+    wallet_posting,
+)
+
+from order.models import Order, OrderItem
+
+logger = logging.getLogger("order")
+
+DELIVERY_BATCH_SIZE = 500
+
+
+def _get_orders_totals(order_ids: Iterable[int]) -> dict[int, int]:
+    "Return the total price of each order mapped by the order ids."
+    totals = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .values("order_id")
+        .annotate(total=Sum(F("submitted_price") * F("quantity")))
+        .values_list("order_id", "total")
+    )
+    return dict(totals)
+
+
+def get_seller_revenue(total_price: int) -> int:
+    "The seller's revenue of an order (after the commission)."
+    return int(total_price * settings.COMMISSION_RATE)
+
+
+def deliver_orders(order_ids: Iterable[int]) -> int:
+    """
+    Update the given orders to DELIVERED and credit their revenues to the
+    sellers' wallets, should be called within a transaction which holds the
+    locks of the orders. Only the orders which are still SHIPPED are updated.
+
+    Regardless of the number of the orders, a constant number of queries are
+    executed: the revenue records are created by a single bulk INSERT, and each
+    order's total is moved from the escrow to the seller's wallet and the
+    platform's commission by a batch of ledger transactions (refer to
+    `financeops.services.ledger`). Returns the number of delivered orders.
+    """
+    orders = list(
+        Order.objects.filter(id__in=order_ids, status=Order.SHIPPED).values_list(
+            "id", "seller_id"
+        )
+    )
+    if not orders:
+        return 0
+    totals = _get_orders_totals(order_id for order_id, _ in orders)
+    wallet_ids = dict(
+        Wallet.objects.filter(
+            user_id__in={seller_id for _, seller_id in orders}
+        ).values_list("user_id", "id")
+    )
+
+    records, ledger_transactions = [], []
+    for order_id, seller_id in orders:
+        wallet_id = wallet_ids.get(seller_id)
+        total = totals.get(order_id, 0)
+        revenue = get_seller_revenue(total)
+        record = FinancialRecord(
+            type=FinancialRecord.ORDER_REVENUE,
+            commission_rate=settings.COMMISSION_RATE,
+            order_id=order_id,
+            wallet_id=wallet_id,
+            amount=revenue,
+        )
+        records.append(record)
+        if wallet_id:
+            ledger_transactions.append(
+                LedgerTransaction(
+                    [
+                        Posting(LedgerPosting.ORDER_ESCROW, -total),
+                        wallet_posting(wallet_id, revenue),
+                        Posting(LedgerPosting.PLATFORM_COMMISSION, total - revenue),
+                    ],
+                    record,
+                )
+            )
+        else:
+            logger.error(
+                f"The seller of the order with id of {order_id} doesn't have a wallet, "
+                "its revenue is recorded without being credited."
+            )
+
+    with transaction.atomic():
+        FinancialRecord.objects.bulk_create(records)
+        post_transactions(ledger_transactions)
+        Order.objects.filter(id__in=[order_id for order_id, _ in orders]).update(
+            status=Order.DELIVERED, updated_at=timezone.now()
+        )
+    return len(orders)
+
+
+def deliver_due_orders(batch_size: int = DELIVERY_BATCH_SIZE) -> int:
+    """
+    Update the SHIPPED orders which are past their `delivery_due_at` to DELIVERED
+    in batches. Each batch is locked (skipping the orders locked by a concurrent
+    update, such as a refund) and delivered in its own transaction.
+    Returns the number of delivered orders.
+    """
+    delivered = 0
+    while True:
+        with transaction.atomic():
+            order_ids = list(
+                Order.objects.select_for_update(skip_locked=True)
+                .filter(status=Order.SHIPPED, delivery_due_at__lte=timezone.now())
+                .order_by("delivery_due_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not order_ids:
+                break
+            delivered += deliver_orders(order_ids)
+        if len(order_ids) < batch_size:
+            break
+    if delivered:
+        logger.info(f"{delivered} shipped orders are updated to delivered.")
+    return delivered
@@ -0,0 +1,54 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from product.models import ProductVariant
+from product.services.listing import refresh_product_listings
+
+from order.models import Order
+from order.services.inventory import get_orders_quantities, release_stock_in_bulk
+
+logger = logging.getLogger("order")
+
+EXPIRY_BATCH_SIZE = 500
+
+
+def expire_unpaid_orders(batch_size: int = EXPIRY_BATCH_SIZE) -> int:
+    """
+    Transition the UNPAID orders which are past their `expire_timestamp` to
+    TIMED_OUT in batches, and release their reserved stocks.
+
+    Each batch is handled in a transaction with a constant number of queries:
+    the expired orders are found through the `(status, expire_timestamp)` index
+    and locked (skipping the ones locked by a concurrent payment or sweeper),
+    the stocks of all of their items are released by a single UPDATE, and the
+    orders are updated by another. Returns the number of expired orders.
+    """
+    expired = 0
+    while True:
+        now = timezone.now()
+        with transaction.atomic():
+            order_ids = list(
+                Order.objects.select_for_update(skip_locked=True)
+                .filter(status=Order.UNPAID, expire_timestamp__lte=now)
+                .order_by("expire_timestamp")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not order_ids:
+                break
+            quantities = get_orders_quantities(order_ids)
+            release_stock_in_bulk(quantities)
+            Order.objects.filter(id__in=order_ids).update(
+                status=Order.TIMED_OUT, updated_at=now
+            )
+        refresh_product_listings(
+            ProductVariant.objects.filter(id__in=quantities).values_list(
+                "product_id", flat=True
+            )
+        )
+        expired += len(order_ids)
+        if len(order_ids) < batch_size:
+            break
+    if expired:
+        logger.info(f"{expired} unpaid orders are timed out and their stocks are released.")
+    return expired
@@ -0,0 +1,137 @@
+"""
+Redis counters of the available stock of hot SKUs (variants with `is_hot_sku`).
+
+During flash sales, reservations of the hot variants are admitted by atomically
+decrementing their Redis counters first, so the requests which would fail due to
+the variant being sold out are rejected without touching the variant's row. The
+database stays the source of truth, as the admitted reservations still go through
+the conditional UPDATEs of `order.services.inventory`.
+
+The counters are (re)loaded from `available_stock` by `reconcile_hot_sku_stocks`,
+which runs periodically and corrects any drift (e.g. from stock edits by the
+seller, or rolled back orders). A variant without a counter is handled by the
+database path only, which is also the case for all variants when Redis is
+unavailable.
+"""
+
+import functools
+import logging
+from typing import Mapping
+
+from django.core.cache import cache
+from product.models import ProductVariant
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("order")
+
+# the counters expire if they aren't reconciled, e.g. when a variant is no longer hot.
+HOT_SKU_STOCK_TTL = 5 * 60
+
+# Decrements the counters of the given keys if all of the existing counters have
+# enough stock, the keys without a counter are skipped. Returns -1 if a counter
+# doesn't have enough stock, otherwise the (1-based) indexes of the decremented keys.
+_RESERVE_SCRIPT = """
+local stocks = redis.call('MGET', unpack(KEYS))
+for i, stock in ipairs(stocks) do
+    if stock and tonumber(stock) < tonumber(ARGV[i]) then
+        return -1
+    end
+end
+local reserved = {}
+for i, stock in ipairs(stocks) do
+    if stock then
+        redis.call('DECRBY', KEYS[i], ARGV[i])
+        table.insert(reserved, i)
+    end
+end
+return reserved
+"""
+
+# Increments the existing counters of the given keys.
+_RELEASE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('INCRBY', key, ARGV[i])
+    end
+end
+return 1
+"""
+
+
+@functools.cache
+def _script(script: str):
+    # registered once per process, the calls pass the current client of the cache
+    return cache.client.get_client().register_script(script)
+
+
+class HotSkuSoldOutError(Exception):
+    "A hot variant doesn't have enough stock according to its Redis counter."
+
+
+def hot_sku_stock_key(variant_id: int) -> str:
+    # the hash tag keeps all the counters in one slot for the multi-key scripts
+    return f"{{hot_sku}}:variant:{variant_id}:available"
+
+
+def reserve_hot_stock(quantities: Mapping[int, int]) -> dict[int, int]:
+    """
+    Decrement the counters of the hot variants among the given quantities, all or
+    nothing. Returns the decremented quantities, which should be restored by
+    `release_hot_stock` if the reservation isn't completed in the database.
+    Raises `HotSkuSoldOutError` if a hot variant doesn't have enough stock.
+    """
+    variant_ids = sorted(quantities)
+    if not variant_ids:
+        return {}
+    try:
+        result = _script(_RESERVE_SCRIPT)(
+            keys=[hot_sku_stock_key(variant_id) for variant_id in variant_ids],
+            args=[quantities[variant_id] for variant_id in variant_ids],
+            client=cache.client.get_client(),
+        )
+    except RedisError as exc:
+        logger.warning(f"Hot SKU counters are unavailable, using the database: {exc}")
+        return {}
+    if result == -1:
+        raise HotSkuSoldOutError()
+    return {variant_ids[i - 1]: quantities[variant_ids[i - 1]] for i in result}
+
+
+def release_hot_stock(quantities: Mapping[int, int]) -> None:
+    "Increment the counters of the hot variants among the given quantities."
+    variant_ids = sorted(quantities)
+    if not variant_ids:
+        return
+    try:
+        _script(_RELEASE_SCRIPT)(
+            keys=[hot_sku_stock_key(variant_id) for variant_id in variant_ids],
+            args=[quantities[variant_id] for variant_id in variant_ids],
+            client=cache.client.get_client(),
+        )
+    except RedisError as exc:
+        # the counters are corrected by the next reconciliation.
+        logger.warning(f"Failed to release the hot SKU counters: {exc}")
+
+
+def reconcile_hot_sku_stocks() -> int:
+    """
+    Set the counters of the hot variants to their available stock in the database,
+    returns the number of reconciled variants (0 if Redis is unavailable).
+    """
+    stocks = ProductVariant.objects.filter(is_hot_sku=True).values_list(
+        "id", "available_stock"
+    )
+    count = 0
+    try:
+        pipeline = cache.client.get_client().pipeline(transaction=False)
+        for variant_id, available_stock in stocks.iterator():
+            pipeline.set(
+                hot_sku_stock_key(variant_id), available_stock, ex=HOT_SKU_STOCK_TTL
+            )
+            count += 1
+        pipeline.execute()
+    except RedisError as exc:
+        # the counters expire meanwhile, so the database path is used
+        logger.warning(f"Failed to reconcile the hot SKU counters: {exc}")
+        return 0
+    return count
@@ -0,0 +1,179 @@
+"""
+Stock reservation of product variants.
+
+Each stock movement is a single conditional UPDATE per variant, which both checks
+and modifies the stock on the database side (no read-modify-write), the affected
+row count tells whether the condition was met. The variants are always updated
+in the order of their ids, so concurrent transactions acquire the row locks in
+the same order and can't deadlock each other.
+
+The functions should be called within the transaction which also changes the
+state of the order, as the stock movements of a call are rolled back together
+if any of them fails.
+
+Stock movements:
+- reserve: `reserved_stock` += qty, if `available_stock` >= qty.
+- release: `reserved_stock` -= qty, if `reserved_stock` >= qty.
+- commit: `reserved_stock`, `on_hand_stock` -= qty and `number_sold` += qty,
+  if `reserved_stock` >= qty (the reserved items have left the warehouse).
+
+Reservations and releases of hot variants also go through their Redis counters
+(refer to `order.services.hot_sku`), and the cached snapshots of the carts which
+contain the moved variants are dropped once the transaction is committed.
+"""
+
+import logging
+from collections import Counter
+from functools import partial
+from typing import Iterable, Mapping
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.db.models.functions import Greatest
+from product.models import ProductVariant
+
+from order.exceptions.errors import CartQuantityExceedError, InvalidOrderError
+from order.models import Order, OrderItem
+from order.services.cart_cache import invalidate_variant_cart_snapshots
+from order.services.hot_sku import (
+    HotSkuSoldOutError,
+    release_hot_stock,
+    reserve_hot_stock,
+)
+
+logger = logging.getLogger("order")
+
+
+def get_order_quantities(order: Order) -> dict[int, int]:
+    "Return the quantities of the order's items mapped by their variant ids."
+    quantities = Counter()
+    for variant_id, quantity in order.items.values_list("product_variant_id", "quantity"):
+        quantities[variant_id] += quantity
+    return dict(quantities)
+
+
+def get_orders_quantities(order_ids: Iterable[int]) -> dict[int, int]:
+    "Return the total quantities of the orders' items mapped by their variant ids."
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids, product_variant__isnull=False)
+        .values("product_variant_id")
+        .annotate(quantity=Sum("quantity"))
+        .values_list("product_variant_id", "quantity")
+    )
+    return dict(rows)
+
+
+def _on_stock_change(variant_ids: Iterable[int]) -> None:
+    transaction.on_commit(partial(invalidate_variant_cart_snapshots, list(variant_ids)))
+
+
+def _apply(
+    quantities: Mapping[int, int], conditions: Iterable[str], **updates
+) -> list[int]:
+    """
+    Apply the updates to the variants if their condition fields are at least the
+    quantity, returns the id of the variant which didn't meet the condition
+    (within a list), in which case none of the updates are applied.
+    """
+    failed = []
+    with transaction.atomic():
+        for variant_id in sorted(quantities):
+            quantity = quantities[variant_id]
+            if quantity <= 0:
+                continue
+            updated = (
+                ProductVariant.objects.filter(id=variant_id)
+                .filter(**{f"{field}__gte": quantity for field in conditions})
+                .update(
+                    **{
+                        field: F(field) + sign * quantity
+                        for field, sign in updates.items()
+                    }
+                )
+            )
+            if not updated:
+                failed.append(variant_id)
+                break
+        if failed:
+            transaction.set_rollback(True)
+    return failed
+
+
+def reserve_stock(quantities: Mapping[int, int]) -> None:
+    """
+    Reserve the quantities of the given variants, all or nothing.
+    Raises `CartQuantityExceedError` if any of the variants doesn't have enough
+    available stock.
+    """
+    try:
+        hot_reserved = reserve_hot_stock(quantities)
+    except HotSkuSoldOutError:
+        raise CartQuantityExceedError()
+    failed = _apply(quantities, ["available_stock"], reserved_stock=1)
+    if failed:
+        release_hot_stock(hot_reserved)
+        logger.info(f"Not enough available stock for reserving the variants {failed}")
+        raise CartQuantityExceedError()
+    _on_stock_change(quantities)
+
+
+def release_stock(quantities: Mapping[int, int]) -> None:
+    """
+    Release the reserved quantities of the given variants, used when an order
+    is cancelled before being shipped.
+    """
+    failed = _apply(quantities, ["reserved_stock"], reserved_stock=-1)
+    if failed:
+        logger.error(f"Releasing more than the reserved stock of the variants {failed}")
+        raise InvalidOrderError()
+    transaction.on_commit(lambda: release_hot_stock(quantities))
+    _on_stock_change(quantities)
+
+
+def commit_stock(quantities: Mapping[int, int]) -> None:
+    """
+    Deduct the reserved quantities of the given variants from their on hand stock,
+    used when an order is shipped.
+    """
+    failed = _apply(
+        quantities,
+        ["reserved_stock", "on_hand_stock"],
+        reserved_stock=-1,
+        on_hand_stock=-1,
+        number_sold=1,
+    )
+    if failed:
+        logger.error(f"Committing more than the reserved stock of the variants {failed}")
+        raise InvalidOrderError()
+    _on_stock_change(quantities)
+
+
+def release_stock_in_bulk(quantities: Mapping[int, int]) -> None:
+    """
+    Release the reserved quantities of many variants by a single UPDATE, used for
+    releasing the stocks of a batch of orders at once.
+
+    The variants are locked in the order of their ids beforehand, as the locking
+    order of a multi-row UPDATE isn't defined. Unlike `release_stock`, the
+    reserved stocks are clamped at zero instead of failing the whole batch.
+    """
+    variant_ids = sorted(variant_id for variant_id, quantity in quantities.items() if quantity > 0)
+    if not variant_ids:
+        return
+    delta = Case(
+        *[When(id=variant_id, then=Value(quantities[variant_id])) for variant_id in variant_ids],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    with transaction.atomic():
+        list(
+            ProductVariant.objects.select_for_update()
+            .filter(id__in=variant_ids)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+        ProductVariant.objects.filter(id__in=variant_ids).update(
+            reserved_stock=Greatest(F("reserved_stock") - delta, Value(0))
+        )
+    transaction.on_commit(lambda: release_hot_stock(quantities))
+    _on_stock_change(variant_ids)
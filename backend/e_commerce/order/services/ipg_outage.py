@@ -0,0 +1,62 @@
+"""
+The IPG outage policy of the orders (refer to the 6th rule of the `Order` model's
+business rules): while all of the IPGs are down, the UNPAID orders are put
+ON_HOLD so they aren't timed out, and the creation of new orders is disabled.
+Once an IPG is back up, the held orders are set back to UNPAID with a new
+payment timer.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from order.models import Order
+from order.payment.factory import PaymentGatewayFactory
+
+logger = logging.getLogger("order")
+
+
+def all_ipgs_down() -> bool:
+    return not PaymentGatewayFactory.get_available_ipgs()
+
+
+def hold_unpaid_orders() -> int:
+    "Put the unexpired UNPAID orders ON_HOLD, returns the number of held orders."
+    now = timezone.now()
+    held = Order.objects.filter(status=Order.UNPAID, expire_timestamp__gt=now).update(
+        status=Order.ON_HOLD, held_by_server=True, updated_at=now
+    )
+    if held:
+        logger.warning(f"All of the IPGs are down, {held} unpaid orders are put on hold.")
+    return held
+
+
+def release_held_orders() -> int:
+    """
+    Set the orders held by the server back to UNPAID with a new payment timer,
+    returns the number of released orders.
+    """
+    now = timezone.now()
+    released = Order.objects.filter(status=Order.ON_HOLD, held_by_server=True).update(
+        status=Order.UNPAID,
+        held_by_server=False,
+        expire_timestamp=now + timedelta(minutes=settings.ORDER_TIMEOUT),
+        updated_at=now,
+    )
+    if released:
+        logger.info(f"An IPG is up again, {released} held orders are set back to unpaid.")
+    return released
+
+
+def apply_ipg_outage_policy() -> int:
+    """
+    Hold or release the orders based on the current state of the IPGs' circuit
+    breakers, returns the number of the orders which were changed.
+    """
+    with transaction.atomic():
+        if all_ipgs_down():
+            return hold_unpaid_orders()
+        return release_held_orders()
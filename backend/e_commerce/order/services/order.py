@@ -1,31 +1,48 @@
-from datetime import datetime
+from collections import Counter
 
 from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from ecom_core import settings
 from ecom_user.models import EcomUser
 from financeops.models import (
     FinancialRecord,
+    LedgerPosting,
     MoneyTransferRequest,
     Wallet,
 )
-from product.models import ProductVariant
+from financeops.services.ledger import Posting, post_transaction, wallet_posting
+from product.tasks import refresh_listings
 
 from order.exceptions.errors import (
     ImproperOrderUpdateError,
     InvalidOrderError,
 )
 from order.models import Order, OrderItem
+from order.services.inventory import (
+    commit_stock,
+    get_order_quantities,
+    release_stock,
+    reserve_stock,
+)
+from order.services.outbox import enqueue_task
 from order.services.validators import (
+    get_cart_item_errors,
+    get_cart_items_for_validation,
     run_order_creation_validations,
-    validate_cart_item_quantity,
-    validate_product_is_available,
     validate_wallet_enough_currency,
 )
-from order.tasks import cancel_unpaid_order, update_order_to_delivered
 from order.utils import add_business_days
 
 
+def get_order_product_ids(order: Order) -> list[int]:
+    return list(
+        order.items.filter(product_variant__isnull=False)
+        .values_list("product_variant__product_id", flat=True)
+        .distinct()
+    )
+
+
 class OrderService:
     @staticmethod
     def create_order(
@@ -36,15 +53,17 @@ class OrderService:
         the following steps will be executed in order when calling this method:
 
         1. Create an unsaved instance of `Order`.
-        2. Using the `Cart` object from passed in `data`, validate each `CartItem` instance.
-        3. For each `CartItem`, create an unsaved `OrderItem` instance using the `Order`
+        2. Using the `Cart` object from passed in `data`, validate the `CartItem` instances
+        (refer to `get_cart_item_errors`).
+        3. For each `CartItem`, create an `OrderItem` instance using the `Order`
         instance created in step 1.
-        4. For each `CartItem`, update its associated `ProductVariant` object fields `reserved_stocks` and
-        `on_hand_stock`.
+        4. Reserve the stocks of the items' variants (refer to `order.services.inventory`),
+        which fails the whole order if any of the variants runs out of stock meanwhile.
         5. Delete user's current cart items.
+        6. Enqueue the refresh of the products' listings (refer to `order.services.outbox`).
 
-        Will also create a new instance of the task `cancel_unpaid_order` for cancelling the order using
-        value `ORDER_TIMEOUT` in conf.settings.
+        The order is timed out by the periodic task `expire_unpaid_orders` if it isn't
+        paid within `ORDER_TIMEOUT` minutes (refer to `Order.expire_timestamp`).
         """
         run_order_creation_validations(user, customer_address_id)
         order = Order(
@@ -54,52 +73,36 @@ class OrderService:
             customer_notes=order_notes,
         )
 
-        # For the order-related transaction to be executed effectively,
-        # prefetch variants to avoid N+1 problem, and create a
-        # dict of variant ids mapped to variant objects which are locked for db update.
-        cart_items = user.cart.items.select_related("product_variant").all()
-        variant_ids = [item.product_variant.id for item in cart_items]
-        variants = {
-            pv.id: pv
-            for pv in ProductVariant.objects.select_for_update().filter(
-                id__in=variant_ids
-            )
-        }
-
-        product_variants = []
+        # The variants are validated without locking them, the reservation
+        # is what guarantees the stocks, and only locks the variants' rows
+        # for the duration of the transaction.
+        cart_items = get_cart_items_for_validation(user.cart)
         order_items = []
-        with transaction.atomic():
-            for item in cart_items:
-                product_variant = variants[item.product_variant.id]
-                validate_product_is_available(product_variant)
-                validate_cart_item_quantity(item)
-
-                # create order python instances and update the stocks
-                order_item = OrderItem(
+        quantities = Counter()
+        for item in cart_items:
+            item_errors = get_cart_item_errors(item, user.id)
+            if item_errors:
+                raise item_errors[0]
+            product_variant = item.product_variant
+            order_items.append(
+                OrderItem(
                     order=order,
                     product_variant=product_variant,
                     submitted_price=product_variant.price,
                     quantity=item.quantity,
                 )
-                product_variant.reserved_stock += item.quantity
-                product_variant.on_hand_stock -= item.quantity
-
-                order_items.append(order_item)
-                product_variants.append(product_variant)
+            )
+            quantities[product_variant.id] += item.quantity
 
-            # db operations
+        with transaction.atomic():
             order.save()
-            ProductVariant.objects.bulk_update(product_variants, ["reserved_stock"])
             OrderItem.objects.bulk_create(order_items)
+            reserve_stock(quantities)
             user.cart.items.all().delete()
-
-        cancel_unpaid_order.apply_async(
-            args=[
-                order.id,
-            ],
-            countdown=settings.ORDER_TIMEOUT * 60,
-        )
-
+            enqueue_task(
+                refresh_listings,
+                list({item.product_variant.product_id for item in cart_items}),
+            )
         return order
 
     @staticmethod
@@ -113,15 +116,21 @@ class OrderService:
 
         with transaction.atomic():
             order.status = Order.PAID
-            wallet.balance -= order_total_price
             record = FinancialRecord.objects.create(
                 wallet=wallet,
                 type=FinancialRecord.WALLET_PAYMENT,
-                amount=order.get_total_price(),
+                amount=order_total_price,
                 order=order,
             )
+            post_transaction(
+                [
+                    wallet_posting(wallet.id, -order_total_price),
+                    Posting(LedgerPosting.ORDER_ESCROW, order_total_price),
+                ],
+                record,
+            )
             order.save()
-            wallet.save()
+        wallet.refresh_from_db(fields=["balance"])
 
         return record
 
@@ -136,9 +145,9 @@ class OrderService:
         If the order's status is already SHIPPED, only the order's
         tracking code will be updated.
 
-        Will create an instance of the task `update_order_to_delivered` for updating
-        the order to delivered in x business days using the value in conf.settings
-        `ORDER_REQUIRED_DAYS_FOR_DELIVERED`.
+        The order's `delivery_due_at` is set to x business days later using the value
+        in conf.settings `ORDER_REQUIRED_DAYS_FOR_DELIVERED`, after which the order is
+        updated to delivered by the periodic task `deliver_due_orders`.
         """
         if order.status not in (Order.PAID, Order.SHIPPED, Order.PROCESSING):
             raise ImproperOrderUpdateError(
@@ -163,31 +172,15 @@ class OrderService:
             order.save()
             return order
 
-        order_items = (
-            order.items.select_related("product_variant")
-            .select_for_update(of=("product_variant",))
-            .all()
-        )
         with transaction.atomic():
-            for item in order_items:
-                item.product_variant.reserved_stock -= item.quantity
-                item.product_variant.on_hand_stock -= item.quantity
+            commit_stock(get_order_quantities(order))
             order.status = Order.SHIPPED
             order.tracking_code = tracking_code
-            ProductVariant.objects.bulk_update(
-                [item.variant for item in order_items],
-                ["reserved_stock", "on_hand_stock"],
+            order.delivery_due_at = add_business_days(
+                timezone.now(), settings.ORDER_REQUIRED_DAYS_FOR_DELIVERED
             )
             order.save()
-
-        update_order_to_delivered.apply_async(
-            args=[
-                order.id,
-            ],
-            eta=add_business_days(
-                datetime.now(), settings.ORDER_REQUIRED_DAYS_FOR_DELIVERED
-            ),
-        )
+            enqueue_task(refresh_listings, get_order_product_ids(order))
         return order
 
     @staticmethod
@@ -221,14 +214,6 @@ class OrderService:
                 _("Order cannot be cancelled if it is not in PAID or PROCESSING state.")
             )
 
-        order_items = (
-            order.items.select_related("product_variant")
-            .select_for_update(of=("product_variant",))
-            .all()
-        )
-        for item in order_items:
-            item.product_variant.reserved_stock -= item.quantity
-            item.product_variant.on_hand_stock += item.quantity
         order.status = Order.CANCELLED
         order.cancel_reason = cancel_reason
         order.cancelled_by = Order.SELLER
@@ -245,27 +230,40 @@ class OrderService:
                 )
             )
 
+        order_total_price = order.get_total_price()
         with transaction.atomic():
+            release_stock(get_order_quantities(order))
             if record.type == FinancialRecord.WALLET_PAYMENT:
-                customer_wallet = order.customer.wallet
-                order_total_price = order.get_total_price()
-                customer_wallet.balance += order_total_price
                 refund_record = FinancialRecord.objects.create(
                     type=FinancialRecord.WALLET_REFUND,
                     amount=order_total_price,
                     wallet=record.wallet,
                     order=record.order,
                 )
+                post_transaction(
+                    [
+                        Posting(LedgerPosting.ORDER_ESCROW, -order_total_price),
+                        wallet_posting(record.wallet_id, order_total_price),
+                    ],
+                    refund_record,
+                )
             elif record.type == FinancialRecord.DIRECT_PAYMENT:
                 MoneyTransferRequest.objects.create(
                     requested_by=order.customer,
-                    amount=order.amount,
+                    amount=order_total_price,
                 )
                 refund_record = FinancialRecord.objects.create(
                     type=FinancialRecord.DIRECT_REFUND,
                     amount=order_total_price,
                     order=record.order,
                 )
+                post_transaction(
+                    [
+                        Posting(LedgerPosting.ORDER_ESCROW, -order_total_price),
+                        Posting(LedgerPosting.EXTERNAL, order_total_price),
+                    ],
+                    refund_record,
+                )
             else:
                 raise InvalidOrderError(
                     _(
@@ -273,10 +271,6 @@ class OrderService:
                         "Please open a support ticket with order ID included."
                     )
                 )
-            ProductVariant.objects.bulk_update(
-                [item.product_variant for item in order_items],
-                ["reserved_stock", "on_hand_stock"],
-            )
             order.save()
-            customer_wallet.save()
+            enqueue_task(refresh_listings, get_order_product_ids(order))
         return refund_record
@@ -0,0 +1,80 @@
+"""
+Transactional outbox for dispatching the celery tasks.
+
+Instead of calling `apply_async` around a business transaction (where the task can
+run before the commit, or be lost if the broker is down), the task is enqueued by
+`enqueue_task` as an `OutboxMessage` row within the same transaction, so the
+transaction and its follow-up tasks are committed or rolled back together, and
+the request doesn't do a round trip to the broker.
+
+The relay (the `relay_outbox` management command) publishes the committed
+messages in batches over a single broker connection and deletes them. Concurrent
+relays skip each other's locked messages. A message is published at least once,
+so the tasks dispatched through the outbox should be idempotent.
+"""
+
+import logging
+
+from celery import Task, current_app
+from django.db import transaction
+
+from order.models import OutboxMessage
+
+logger = logging.getLogger("order")
+
+OUTBOX_BATCH_SIZE = 500
+
+
+def enqueue_task(task: Task | str, *args, **kwargs) -> OutboxMessage:
+    """
+    Enqueue the task (or the task's name) with the given JSON serializable arguments,
+    should be called within the transaction which the task follows up on.
+    """
+    task_name = task if isinstance(task, str) else task.name
+    return OutboxMessage.objects.create(task=task_name, args=list(args), kwargs=kwargs)
+
+
+def _producer():
+    return current_app.producer_or_acquire()
+
+
+def _send_task(message: OutboxMessage, producer) -> None:
+    current_app.send_task(
+        message.task, args=message.args, kwargs=message.kwargs, producer=producer
+    )
+
+
+def publish_outbox_messages(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Publish a batch of the outbox messages in the order they were enqueued, and
+    delete the published ones. Returns the number of published messages.
+    """
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).order_by("id")[
+                :batch_size
+            ]
+        )
+        if not messages:
+            return 0
+        published = []
+        try:
+            with _producer() as producer:
+                for message in messages:
+                    _send_task(message, producer)
+                    published.append(message.id)
+        except Exception as exc:
+            # the rest of the batch is published by the next round
+            logger.error(f"Failed to publish the outbox messages: {exc!r}")
+        OutboxMessage.objects.filter(id__in=published).delete()
+    return len(published)
+
+
+def relay_outbox_messages(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    "Publish the outbox messages until the outbox is drained or the broker fails."
+    relayed = 0
+    while True:
+        published = publish_outbox_messages(batch_size)
+        relayed += published
+        if published < batch_size:
+            return relayed
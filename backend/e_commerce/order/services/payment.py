@@ -6,10 +6,14 @@ from financeops.models import (
 
 from order.models import Order
 from order.payment.factory import PaymentGatewayFactory
-from order.tasks import cancel_payment
 
 
 class PaymentService:
+    """
+    The payments which aren't resolved by their callbacks are reconciled with
+    their IPGs by the periodic task `reconcile_payments`.
+    """
+
     @staticmethod
     def create_payment_for_order(order: Order, selected_ipg: int) -> str:
         """
@@ -36,8 +40,6 @@ class PaymentService:
         payment.ipg_service = selected_ipg
         payment.save()
 
-        cancel_payment.apply_async(payment.id, countdown=60 * 15)
-
         return client.get_payment_link()
 
     @staticmethod
@@ -58,7 +60,7 @@ class PaymentService:
         callback_url = client.get_callback_url()
         response = client.request_transaction(charge_amount, callback_url)
 
-        payment = Payment.objects.create(
+        Payment.objects.create(
             wallet=wallet,
             amount=charge_amount,
             track_id=response.track_id,
@@ -67,6 +69,4 @@ class PaymentService:
             ipg_service=selected_ipg,
         )
 
-        cancel_payment.apply_async(payment.id, countdown=60 * 15)
-
         return client.get_payment_link()
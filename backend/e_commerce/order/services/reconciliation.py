@@ -0,0 +1,347 @@
+"""
+Batched reconciliation of the stale PAYING payments with their IPGs.
+
+Payments whose callbacks never arrived (or failed) are left in PAYING. Instead of
+inquiring each of them by its own task, `reconcile_payments` periodically selects
+the stale ones through the `(status, track_id_submitted_at)` index, inquires them
+concurrently (bounded per IPG, over the async clients of `order.payment`), and
+applies the resulting transitions of a batch in bulk:
+
+- Paid (verified, or verified by the reconciliation): PAID, and the paid orders
+  are updated to PAID if the paid amount matches the order's total price.
+- Waiting for payment: CANCELLED once the payment's link is expired, otherwise
+  left for the next run.
+- Cancelled by the user: CANCELLED, any other status: FAILED.
+
+Amount mismatches and payments of orders which can no longer be paid (e.g. timed
+out) are reported and logged, these need to be resolved by the support.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+from financeops.models import FinancialRecord, LedgerPosting, Payment
+from financeops.services.ledger import (
+    LedgerTransaction,
+    Posting,
+    post_transactions,
+    wallet_posting,
+)
+
+from order.models import Order, OrderItem
+from order.payment.exceptions import (
+    PaymentGatewayNotFoundError,
+    PaymentNotImplementedError,
+    PaymentRequestError,
+    PaymentResponseError,
+    PaymentServiceUnavailableError,
+    PaymentTimeoutError,
+)
+from order.payment.factory import PaymentGatewayFactory
+from order.payment.schemas import PAYMENT_STATUS_CODES, PaymentStatusResponse
+from order.services.schemas import PaymentMismatch, ReconciliationReport
+
+logger = logging.getLogger("order")
+
+RECONCILIATION_BATCH_SIZE = 200
+RECONCILIATION_CONCURRENCY = 8  # concurrent inquiries per IPG
+# payments are left to their callbacks for this long before being reconciled
+RECONCILIATION_STALE_AFTER = timedelta(minutes=5)
+# waiting payments are cancelled after this long, as their links are expired
+PAYMENT_TIMEOUT = timedelta(minutes=15)
+
+# the statuses of the IPG's inquiry/verify responses (refer to `PAYMENT_STATUS_CODES`)
+WAITING_FOR_PAYMENT = -1
+INTERNAL_ERROR = -2
+PAID_AND_VERIFIED = 1
+PAID_AND_UNVERIFIED = 2
+CANCELLED_BY_USER = 3
+
+PAYMENT_ERRORS = (
+    PaymentGatewayNotFoundError,
+    PaymentNotImplementedError,
+    PaymentRequestError,
+    PaymentResponseError,
+    PaymentServiceUnavailableError,
+    PaymentTimeoutError,
+)
+
+
+async def _inquire(client, track_id: int) -> Optional[PaymentStatusResponse]:
+    try:
+        response = await client.ainquiry_transaction(track_id)
+        if response.status == PAID_AND_UNVERIFIED:
+            response = await client.averify_transaction(track_id)
+        return response
+    except PAYMENT_ERRORS as exc:
+        logger.warning(f"Failed to inquire the transaction {track_id}: {exc!r}")
+        return None
+
+
+async def _inquire_all(payments: list[dict], concurrency: int) -> dict[int, PaymentStatusResponse]:
+    semaphores = {}
+
+    async def inquire(payment):
+        try:
+            client = PaymentGatewayFactory.get_client(payment["ipg_service"])
+        except PAYMENT_ERRORS as exc:
+            logger.error(f"No client for reconciling the payment {payment['id']}: {exc!r}")
+            return payment["id"], None
+        semaphore = semaphores.setdefault(
+            payment["ipg_service"], asyncio.Semaphore(concurrency)
+        )
+        async with semaphore:
+            return payment["id"], await _inquire(client, int(payment["track_id"]))
+
+    try:
+        results = await asyncio.gather(*[inquire(payment) for payment in payments])
+    finally:
+        # the async clients are bound to this event loop
+        for ipg in semaphores:
+            await PaymentGatewayFactory.get_client(ipg).transport.aclose()
+    return {payment_id: response for payment_id, response in results if response}
+
+
+def inquire_payments(
+    payments: list[dict], concurrency: int = RECONCILIATION_CONCURRENCY
+) -> dict[int, PaymentStatusResponse]:
+    """
+    Inquire the transactions of the given payments (dicts of `id`, `track_id` and
+    `ipg_service`) concurrently, at most `concurrency` at a time for each IPG.
+    The paid and unverified transactions are also verified.
+    Returns the responses mapped by the payments' ids, the payments which failed
+    to be inquired are left out.
+    """
+    if not payments:
+        return {}
+    return asyncio.run(_inquire_all(payments, concurrency))
+
+
+def get_payment_status(payment: dict, response: PaymentStatusResponse, now) -> Optional[str]:
+    "Return the new status of the payment, or None if it should be left PAYING."
+    if response.status in (PAID_AND_VERIFIED, PAID_AND_UNVERIFIED):
+        return Payment.PAID
+    if response.status == WAITING_FOR_PAYMENT:
+        if payment["track_id_submitted_at"] <= now - PAYMENT_TIMEOUT:
+            return Payment.CANCELLED
+        return None
+    if response.status == INTERNAL_ERROR:
+        # the IPG couldn't tell the transaction's status, it's inquired again later
+        return None
+    if response.status == CANCELLED_BY_USER:
+        return Payment.CANCELLED
+    return Payment.FAILED
+
+
+def get_orders_total_prices(order_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Return the total prices of the orders mapped by their ids, the batched
+    equivalent of `Order.get_total_price`.
+    """
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .values("order_id")
+        .annotate(total=Sum(F("submitted_price") * F("quantity")))
+        .values_list("order_id", "total")
+    )
+    return dict(rows)
+
+
+def _case(values: dict[int, str]) -> Case:
+    return Case(
+        *[When(id=payment_id, then=Value(value)) for payment_id, value in values.items()]
+    )
+
+
+def settle_paid_payments(
+    payments: list[dict], paid_amounts: dict[int, int]
+) -> tuple[list[int], list[PaymentMismatch]]:
+    """
+    Update the orders of the given paid payments (dicts of `id`, `amount`,
+    `order_id` and `wallet_id`) to PAID, if the paid amount matches the order's
+    total price and the order is still payable (UNPAID or ON_HOLD), and credit
+    the wallets of the paid deposits. The settled payments are recorded and
+    posted to the ledger (refer to `financeops.services.ledger`). Should be called
+    within the transaction which updates the payments to PAID.
+
+    Returns the ids of the paid orders and the mismatches of the other payments.
+    """
+    order_ids = [payment["order_id"] for payment in payments if payment["order_id"]]
+    totals = get_orders_total_prices(order_ids)
+    payable_order_ids = set(
+        Order.objects.select_for_update()
+        .filter(id__in=order_ids, status__in=(Order.UNPAID, Order.ON_HOLD))
+        .values_list("id", flat=True)
+    )
+    paid_order_ids, settled, mismatches = [], [], []
+    for payment in payments:
+        order_id = payment["order_id"]
+        paid_amount = paid_amounts[payment["id"]]
+        expected_amount = totals.get(order_id) if order_id else payment["amount"]
+        if paid_amount != expected_amount:
+            reason = "amount_mismatch"
+        elif order_id and order_id not in payable_order_ids:
+            reason = "order_not_payable"
+        elif not order_id and not payment["wallet_id"]:
+            reason = "no_order_or_wallet"
+        else:
+            if order_id:
+                paid_order_ids.append(order_id)
+            settled.append((payment, paid_amount))
+            continue
+        mismatches.append(
+            PaymentMismatch(
+                payment_id=payment["id"],
+                order_id=order_id,
+                expected_amount=expected_amount,
+                paid_amount=paid_amount,
+                reason=reason,
+            )
+        )
+    if paid_order_ids:
+        Order.objects.filter(id__in=paid_order_ids).update(
+            status=Order.PAID, held_by_server=False, updated_at=timezone.now()
+        )
+    if settled:
+        _post_settled_payments(settled)
+    return paid_order_ids, mismatches
+
+
+def _post_settled_payments(settled: list[tuple[dict, int]]) -> None:
+    records, ledger_transactions = [], []
+    for payment, paid_amount in settled:
+        if payment["order_id"]:
+            record = FinancialRecord(
+                type=FinancialRecord.DIRECT_PAYMENT,
+                order_id=payment["order_id"],
+                payment_id=payment["id"],
+                amount=paid_amount,
+            )
+            credit = Posting(LedgerPosting.ORDER_ESCROW, paid_amount)
+        else:
+            record = FinancialRecord(
+                type=FinancialRecord.DEPOSIT,
+                wallet_id=payment["wallet_id"],
+                payment_id=payment["id"],
+                amount=paid_amount,
+            )
+            credit = wallet_posting(payment["wallet_id"], paid_amount)
+        records.append(record)
+        ledger_transactions.append(
+            LedgerTransaction(
+                [Posting(LedgerPosting.EXTERNAL, -paid_amount), credit], record
+            )
+        )
+    FinancialRecord.objects.bulk_create(records)
+    post_transactions(ledger_transactions)
+    Payment.objects.filter(id__in=[payment["id"] for payment, _ in settled]).update(
+        is_used=True
+    )
+
+
+def apply_payment_transitions(
+    payments: dict[int, dict],
+    transitions: dict[int, str],
+    responses: dict[int, PaymentStatusResponse],
+    report: ReconciliationReport,
+) -> None:
+    """
+    Apply the transitions of the payments by a single UPDATE, and settle the paid
+    ones. The payments which were meanwhile locked or transitioned by others (e.g.
+    by their callbacks) are skipped.
+    """
+    with transaction.atomic():
+        payment_ids = list(
+            Payment.objects.select_for_update(skip_locked=True)
+            .filter(id__in=transitions, status=Payment.PAYING)
+            .values_list("id", flat=True)
+        )
+        if not payment_ids:
+            return
+        statuses = {payment_id: transitions[payment_id] for payment_id in payment_ids}
+        details = {
+            payment_id: PAYMENT_STATUS_CODES.get(responses[payment_id].status, "")[:50]
+            for payment_id in payment_ids
+        }
+        Payment.objects.filter(id__in=payment_ids).update(
+            status=_case(statuses), details=_case(details), updated_at=timezone.now()
+        )
+        paid_ids = [
+            payment_id for payment_id, status in statuses.items() if status == Payment.PAID
+        ]
+        paid_order_ids, mismatches = settle_paid_payments(
+            [payments[payment_id] for payment_id in paid_ids],
+            {payment_id: responses[payment_id].amount for payment_id in paid_ids},
+        )
+
+    report.paid += len(paid_ids)
+    report.failed += sum(1 for status in statuses.values() if status == Payment.FAILED)
+    report.cancelled += sum(
+        1 for status in statuses.values() if status == Payment.CANCELLED
+    )
+    report.paid_orders += len(paid_order_ids)
+    report.mismatches.extend(mismatches)
+
+
+def reconcile_payments(
+    batch_size: int = RECONCILIATION_BATCH_SIZE,
+    concurrency: int = RECONCILIATION_CONCURRENCY,
+) -> ReconciliationReport:
+    """
+    Reconcile the stale PAYING payments with their IPGs in batches, refer to the
+    module's docstring. Returns the report of the reconciliation.
+    """
+    report = ReconciliationReport()
+    now = timezone.now()
+    last_submitted_at, last_id = None, 0
+    while True:
+        queryset = Payment.objects.filter(
+            status=Payment.PAYING,
+            track_id_submitted_at__lte=now - RECONCILIATION_STALE_AFTER,
+        )
+        if last_submitted_at is not None:
+            # keyset pagination, as the unresolved payments stay PAYING
+            queryset = queryset.filter(track_id_submitted_at__gte=last_submitted_at).exclude(
+                track_id_submitted_at=last_submitted_at, id__lte=last_id
+            )
+        batch = list(
+            queryset.order_by("track_id_submitted_at", "id").values(
+                "id",
+                "track_id",
+                "ipg_service",
+                "amount",
+                "order_id",
+                "wallet_id",
+                "track_id_submitted_at",
+            )[:batch_size]
+        )
+        if not batch:
+            break
+        last_submitted_at, last_id = batch[-1]["track_id_submitted_at"], batch[-1]["id"]
+
+        payments = {payment["id"]: payment for payment in batch}
+        responses = inquire_payments(batch, concurrency)
+        transitions = {}
+        for payment_id, response in responses.items():
+            new_status = get_payment_status(payments[payment_id], response, now)
+            if new_status:
+                transitions[payment_id] = new_status
+        report.unresolved += len(batch) - len(transitions)
+        if transitions:
+            apply_payment_transitions(payments, transitions, responses, report)
+        if len(batch) < batch_size:
+            break
+
+    for mismatch in report.mismatches:
+        logger.warning(f"Payment reconciliation mismatch: {mismatch.model_dump()}")
+    if report.paid or report.failed or report.cancelled:
+        logger.info(
+            f"Reconciled payments: {report.paid} paid, {report.failed} failed, "
+            f"{report.cancelled} cancelled, {report.unresolved} unresolved."
+        )
+    return report
@@ -1,11 +1,30 @@
 from typing import Optional
 
 from ecom_user.models import EcomUser
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class OrderCreationSchema(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     user: EcomUser
     customer_address: int
     notes: Optional[str] = None
 
+
+
+class PaymentMismatch(BaseModel):
+    payment_id: int
+    order_id: Optional[int] = None
+    expected_amount: Optional[int] = None
+    paid_amount: int
+    reason: str
+
+
+class ReconciliationReport(BaseModel):
+    paid: int = 0
+    failed: int = 0
+    cancelled: int = 0
+    unresolved: int = 0  # still waiting for payment, or the IPG didn't respond
+    paid_orders: int = 0
+    mismatches: list[PaymentMismatch] = []
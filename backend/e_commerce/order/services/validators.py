@@ -1,7 +1,11 @@
+from typing import Iterable
+
 from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
 from ecom_user.models import EcomUser
 from ecom_user_profile.models import CustomerAddress
 from financeops.models import Wallet
+from financeops.services.ledger import get_wallet_balance
 from product.models import ProductVariant
 
 from order.exceptions.errors import (
@@ -15,10 +19,20 @@ from order.exceptions.errors import (
     OrderOngoingExistsError,
     ProductDisabledError,
     ProductUnavailableError,
+    ResponseBaseError,
     SellerInactiveError,
     WalletNotEnoughCurrencyError,
 )
 from order.models import Cart, CartItem, Order
+from order.payment.exceptions import PaymentServiceUnavailableError
+from order.payment.factory import PaymentGatewayFactory
+
+
+def _is_seller_verified(variant: ProductVariant) -> bool:
+    try:
+        return variant.product.owner.seller_profile.is_verified
+    except ObjectDoesNotExist:
+        return False
 
 
 def validate_user_owns_address(user: EcomUser, address_id: int) -> None:
@@ -81,14 +95,14 @@ def validate_cart_item_quantity(
 
 
 def validate_seller_is_active(selected_variant: ProductVariant) -> None:
-    if not selected_variant.owner.is_verified:
+    if not _is_seller_verified(selected_variant):
         raise SellerInactiveError()
 
 
 def validate_seller_is_not_current_user(
     selected_variant: ProductVariant, current_user: EcomUser
 ) -> None:
-    if selected_variant.owner != current_user:
+    if selected_variant.owner == current_user:
         raise CartSameSellerError()
 
 
@@ -98,11 +112,17 @@ def validate_order_is_not_finished(order: Order) -> None:
 
 
 def validate_wallet_enough_currency(wallet: Wallet, total_amount: int) -> None:
-    if wallet.balance < total_amount:
+    if get_wallet_balance(wallet) < total_amount:
         raise WalletNotEnoughCurrencyError()
 
 
+def validate_an_ipg_is_available() -> None:
+    if not PaymentGatewayFactory.get_available_ipgs():
+        raise PaymentServiceUnavailableError()
+
+
 def run_order_creation_validations(user: EcomUser, customer_address: int) -> None:
+    validate_an_ipg_is_available()
     validate_cart_not_empty(user.cart)
     validate_user_owns_address(user, customer_address)
     validate_no_on_going_orders(user)
@@ -120,11 +140,63 @@ def run_cart_item_creation_validations(
     validate_seller_is_not_current_user(variant, user)
 
 
-def run_cart_validations(user: EcomUser, item: CartItem) -> None:
-    "Just before an order is going to be created, this validation should be called"
+# relations of a cart item which are used by the cart validations, the cart items
+# should be loaded along with them (refer to `get_cart_items_for_validation`).
+CART_ITEM_VALIDATION_RELATIONS = "product_variant__product__owner__seller_profile"
+
+
+def get_cart_items_for_validation(cart: Cart) -> list[CartItem]:
+    "Load the cart's items with everything required for validating them in one query."
+    return list(
+        cart.items.select_related(CART_ITEM_VALIDATION_RELATIONS).order_by("id")
+    )
+
+
+def get_cart_item_errors(item: CartItem, user_id: int) -> list[ResponseBaseError]:
+    """
+    Evaluate the validations of a cart item in memory, assuming the item is
+    loaded along with `CART_ITEM_VALIDATION_RELATIONS`.
+    """
     variant = item.product_variant
-    validate_product_is_available(variant)
-    validate_cart_item_quantity(variant, item.quantity)
-    validate_seller_is_active(variant)
-    validate_product_is_enabled(variant)
-    validate_seller_is_not_current_user(variant, user)
+    if variant is None:
+        return [ProductUnavailableError()]
+    errors = []
+    if not variant.is_available:
+        errors.append(ProductUnavailableError())
+    elif item.quantity > variant.available_stock:
+        errors.append(CartQuantityExceedError())
+    if not _is_seller_verified(variant):
+        errors.append(SellerInactiveError())
+    if not variant.is_enabled or not variant.product.is_enabled:
+        errors.append(ProductDisabledError())
+    if variant.product.owner_id == user_id:
+        errors.append(CartSameSellerError())
+    return errors
+
+
+def get_cart_errors(
+    cart: Cart, items: Iterable[CartItem] | None = None
+) -> dict[int, list[dict]]:
+    """
+    Validate all of the cart's items at once, returns the errors of each invalid
+    item mapped by the item's id.
+
+    The items are loaded by `get_cart_items_for_validation` if they're not given,
+    so validating a cart takes a single query regardless of its size.
+    """
+    if items is None:
+        items = get_cart_items_for_validation(cart)
+    errors = {}
+    for item in items:
+        item_errors = get_cart_item_errors(item, cart.user_id)
+        if item_errors:
+            errors[item.id] = [error.as_dict() for error in item_errors]
+    return errors
+
+
+def run_cart_validations(cart: Cart) -> None:
+    "Just before an order is going to be created, this validation should be called"
+    for item in get_cart_items_for_validation(cart):
+        item_errors = get_cart_item_errors(item, cart.user_id)
+        if item_errors:
+            raise item_errors[0]
@@ -0,0 +1,90 @@
+from functools import partial
+
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from ecom_user_profile.models import SellerProfile
+from product.models import Product, ProductVariant
+
+from .models import CartItem
+from .payment.factory import PaymentGatewayFactory
+from .services.cart_cache import (
+    invalidate_cart_snapshots,
+    invalidate_seller_cart_snapshots,
+    invalidate_variant_cart_snapshots,
+    refresh_cart_snapshot,
+)
+from .services.cart_index import (
+    add_cart_variant,
+    get_variant_cart_user_ids,
+    remove_cart_variant,
+)
+
+# The following receivers keep the carts' reverse index (refer to
+# `order.services.cart_index`) and the cart snapshots in sync, the snapshots are
+# changed after the transaction is committed so that they can't be rebuilt from
+# uncommitted data (refer to `order.services.cart_cache`).
+
+
+@receiver(post_save, sender=CartItem)
+def index_cart_item_on_save(sender, instance, **kwargs):
+    if instance.product_variant_id and instance.cart.user_id:
+        transaction.on_commit(
+            partial(add_cart_variant, instance.cart.user_id, instance.product_variant_id)
+        )
+
+
+@receiver(post_delete, sender=CartItem)
+def unindex_cart_item_on_delete(sender, instance, **kwargs):
+    if instance.product_variant_id and instance.cart.user_id:
+        transaction.on_commit(
+            partial(
+                remove_cart_variant, instance.cart.user_id, instance.product_variant_id
+            )
+        )
+
+
+@receiver(post_save, sender=CartItem)
+def refresh_cart_snapshot_on_item_save(sender, instance, **kwargs):
+    transaction.on_commit(partial(refresh_cart_snapshot, instance.cart_id))
+
+
+@receiver(post_delete, sender=CartItem)
+def invalidate_cart_snapshot_on_item_delete(sender, instance, **kwargs):
+    # the snapshot is dropped rather than rebuilt, so clearing a cart (e.g. on
+    # order creation) doesn't rebuild it once per item.
+    if instance.cart.user_id:
+        transaction.on_commit(partial(invalidate_cart_snapshots, [instance.cart.user_id]))
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(pre_delete, sender=ProductVariant)
+def invalidate_cart_snapshots_on_variant_change(sender, instance, **kwargs):
+    # the carts are resolved beforehand, as the items' variants are nulled on deletion.
+    user_ids = get_variant_cart_user_ids([instance.id])
+    if user_ids:
+        transaction.on_commit(partial(invalidate_cart_snapshots, user_ids))
+
+
+@receiver(post_save, sender=Product)
+def invalidate_cart_snapshots_on_product_save(sender, instance, created, **kwargs):
+    if not created:
+        variant_ids = list(instance.variants.values_list("id", flat=True))
+        transaction.on_commit(partial(invalidate_variant_cart_snapshots, variant_ids))
+
+
+@receiver(post_save, sender=SellerProfile)
+def invalidate_cart_snapshots_on_seller_profile_save(
+    sender, instance, created, **kwargs
+):
+    if not created:
+        transaction.on_commit(
+            partial(invalidate_seller_cart_snapshots, instance.user_id)
+        )
+
+
+@receiver(setting_changed)
+def clear_payment_clients_on_ipg_settings_change(sender, setting, **kwargs):
+    if setting in ("IPG_API_BASE_URLS", "ZIBAL_MERCHANT"):
+        PaymentGatewayFactory.clear()
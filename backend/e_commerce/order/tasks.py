@@ -1,24 +1,27 @@
 from datetime import timedelta, timezone
 import logging
 
-import requests
 from celery import shared_task
-from django.conf import settings
-from django.core.cache import cache
 from django.db import transaction
-from financeops.models import IPG, FinancialRecord, Payment
+from financeops.models import Payment
 from order.utils import format_time
-from product.models import ProductVariant
-from requests.exceptions import RequestException
+from product.services.listing import refresh_product_listings
 
 from order.models import Order
 from order.payment.exceptions import (
-    PaymentNotImplementedError,
     PaymentRequestError,
     PaymentResponseError,
 )
 from order.payment.factory import PaymentGatewayFactory
 from order.payment.schemas import PAYMENT_STATUS_CODES
+from order.services.cart_index import rebuild_cart_variant_index
+from order.services.delivery import deliver_due_orders as deliver_due_orders_in_batches
+from order.services.delivery import deliver_orders
+from order.services.expiry import expire_unpaid_orders as expire_unpaid_orders_in_batches
+from order.services.hot_sku import reconcile_hot_sku_stocks
+from order.services.inventory import get_order_quantities, release_stock
+from order.services.ipg_outage import apply_ipg_outage_policy as apply_outage_policy
+from order.services.reconciliation import reconcile_payments as reconcile_payments_in_batches
 
 logger = logging.getLogger("order")
 
@@ -124,11 +127,25 @@ def handle_payment(self, track_id: int, payment_id: int) -> None:
         )
 
 
+@shared_task
+def reconcile_payments() -> dict:
+    """
+    Reconcile the stale PAYING payments with their IPGs in batches, returns the
+    reconciliation report (refer to `order.services.reconciliation`).
+
+    Should be executed as a scheduler
+    """
+    return reconcile_payments_in_batches().model_dump()
+
+
 @shared_task
 def cancel_payment(payment_id: int):
     """
     Cancel the given payment object which are still in PAYING status by updating
     its state to CANCELLED.
+
+    Stale payments are resolved by `reconcile_payments` in batches, this task
+    is kept for cancelling a single payment on demand.
     """
     try:
         payment = Payment.objects.get(id=payment_id)
@@ -152,6 +169,9 @@ def cancel_unpaid_order(self, order_id):
     """
     For cancelling orders which haven't been paid and are considered timed oiut,
     which will also release the reserved stocks occupied by the order.
+
+    Expired orders are timed out by `expire_unpaid_orders` in batches, this task
+    is kept for cancelling a single order on demand.
     """
     try:
         order = Order.objects.get(id=order_id)
@@ -166,17 +186,12 @@ def cancel_unpaid_order(self, order_id):
     # if order is expired, release the stocks and update the order
     if timezone.now() > order.expire_timestamp:
         with transaction.atomic():
-            product_variants = []
-            for order_item in order.items.all():
-                product_variant = order_item.product_variant
-                product_variant.reserved_stock -= order_item.quantity
-                product_variant.on_hand_stock += order_item.quantity
-                product_variants.append(product_variant)
+            release_stock(get_order_quantities(order))
             order.status = Order.TIMED_OUT
-            ProductVariant.objects.bulk_update(
-                product_variants, ["reserved_stock", "on_hand_stock"]
-            )
             order.save()
+        refresh_product_listings(
+            order.items.values_list("product_variant__product_id", flat=True)
+        )
         logger.info(
             f"The order with id of {order.id} is timed out and the reserved stocks are released."
         )
@@ -199,19 +214,14 @@ def cancel_unpaid_order(self, order_id):
         raise self.retry(countdown=remaining_payment_time)  # retry in 20 minutes
     if order.status == Order.UNPAID:
         with transaction.atomic():
-            product_variants = []
-            for order_item in order.items.all():
-                product_variant = order_item.product_variant
-                product_variant.reserved_stock -= order_item.quantity
-                product_variant.on_hand_stock += order_item.quantity
-                product_variants.append(product_variant)
+            release_stock(get_order_quantities(order))
             order.status = Order.CANCELLED
             order.cancelled_by = Order.SERVER
             order.cancel_reason = "Cancelled by server due to order not getting paid."
-            ProductVariant.objects.bulk_update(
-                product_variants, ["reserved_stock", "on_hand_stock"]
-            )
             order.save()
+        refresh_product_listings(
+            order.items.values_list("product_variant__product_id", flat=True)
+        )
 
 
 @shared_task(bind=True)
@@ -219,59 +229,85 @@ def update_order_to_delivered(self, order_id: int):
     """
     After a period of 5 business days of shipment, if no complaints have been
     received from the customer, the order's status is updated to DELIVERED.
-    """
-    try:
-        order = Order.objects.get(id=order_id)
-    except Order.DoesNotExist:
-        logger.error(
-            f"Failed to resolve given order object using order_id: {order_id} "
-            f"from the database in the following task: \n"
-            f"task ID: {self.task.id} | task name: {self.request.task}"
-        )
-        return
 
+    Shipped orders are delivered by `deliver_due_orders` in batches, this task
+    is kept for delivering a single order on demand.
+    """
     # the following actions should be reversible since
     # there might be a chance that the order gets refunded
     # or it still hasn't been received by the customer.
-    commission_rate = settings.COMMISSION_RATE
-    seller_wallet = order.seller.wallet
     with transaction.atomic():
-        FinancialRecord.objects.create(
-            type=FinancialRecord.ORDER_REVENUE,
-            commission_rate=commission_rate,
-            order=order,
-            amount=order.total_price * commission_rate,
+        order_ids = list(
+            Order.objects.select_for_update()
+            .filter(id=order_id)
+            .values_list("id", flat=True)
         )
-        seller_wallet += order.total_price * commission_rate
-        seller_wallet.save()
-        order.status = Order.DELIVERED
-        order.save()
+        if not order_ids:
+            logger.error(
+                f"Failed to resolve given order object using order_id: {order_id} "
+                f"from the database in the following task: \n"
+                f"task ID: {self.request.id} | task name: {self.request.task}"
+            )
+            return
+        deliver_orders(order_ids)
 
 
 @shared_task
 def check_and_cache_ipg_status():
     """
-    Cache the available IPGs with a get request to assert whether the IPG
-    service is running or not.
+    Probe the IPGs concurrently, the outcomes are recorded by their circuit
+    breakers (refer to `order.payment.breaker`), which lets the half-open
+    breakers be closed even if no payments are routed to the IPGs. Also applies
+    the IPG outage policy of the orders.
 
     Should be executed as a scheduler
     """
-    ipgs = settings.IPG_OPTIONS
-    available_ipgs = []
-    for ipg_choice in ipgs.keys():
-        try:
-            client = PaymentGatewayFactory.get_client(ipg_choice)
-        except PaymentNotImplementedError():
-            logger.debug(
-                f"IPG {ipgs[ipg_choice]} is not implemented and thus checking its status will not be executed."
-            )
-            return
-        except Exception as e:
-            logger.error(
-                "An error has occurred when retrieving the payment client for checking the uptime; "
-                f"IPG: {ipgs[ipg_choice]} "
-                f"error: {str(e)}"
-            )
-        if client.check_health():
-            available_ipgs.append(ipg_choice)
-    cache.set("available_ipgs", available_ipgs)
+    statuses = PaymentGatewayFactory.probe_ipgs()
+    logger.debug(f"IPG statuses: {statuses}")
+    apply_outage_policy()
+
+
+@shared_task
+def apply_ipg_outage_policy() -> int:
+    """
+    Hold the unpaid orders if all of the IPGs are down, or release the held orders
+    otherwise, called upon the transitions of the IPGs' circuit breakers.
+    """
+    return apply_outage_policy()
+
+
+@shared_task
+def reconcile_hot_skus() -> int:
+    """
+    Reload the Redis stock counters of the hot SKUs from the database, should be
+    executed as a scheduler.
+    """
+    return reconcile_hot_sku_stocks()
+
+
+@shared_task
+def expire_unpaid_orders() -> int:
+    """
+    Time out the unpaid orders which are past their expiry and release their
+    stocks, should be executed as a scheduler.
+    """
+    return expire_unpaid_orders_in_batches()
+
+
+@shared_task
+def deliver_due_orders() -> int:
+    """
+    Update the shipped orders which are past their delivery due time to DELIVERED
+    and credit the sellers' revenues, should be executed as a scheduler.
+    """
+    return deliver_due_orders_in_batches()
+
+
+@shared_task
+def rebuild_cart_index() -> int:
+    """
+    Rebuild the reverse index of the carts from the database (refer to
+    `order.services.cart_index`), should be executed as a scheduler.
+    """
+    return rebuild_cart_variant_index()
+
@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 
 from product.models import (
     Category,
@@ -11,6 +12,9 @@ from product.models import (
 )
 from ecom_user.models import EcomUser
 from ecom_user_profile.models import CustomerAddress
+from ecom_core import ipgs
+
+from order.tests.fake_ipg import FakeZibalServer
 
 
 # @pytest.fixture
@@ -36,6 +40,13 @@ from ecom_user_profile.models import CustomerAddress
 #     return create_user
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def customer_and_seller(db):
     seller = EcomUser.objects.create_user(phone="09377964142", username="Seller")
@@ -166,3 +177,12 @@ def sample_product_instance_factory(
         return product_obj
 
     return create_product_instance
+
+
+@pytest.fixture
+def fake_ipg(settings):
+    "Points the Zibal client to a local fake IPG server."
+    server = FakeZibalServer().start()
+    settings.IPG_API_BASE_URLS = {ipgs.ZIBAL: server.url}
+    yield server
+    server.stop()
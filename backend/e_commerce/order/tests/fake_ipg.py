@@ -0,0 +1,152 @@
+"""
+A local fake of Zibal's IPG API for the tests, served over HTTP on a random
+port of the loopback interface (refer to the `fake_ipg` fixture).
+"""
+
+import itertools
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeZibalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keeps the connections alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(self.server.fake.probe())
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        server: "FakeZibalServer" = self.server.fake
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        endpoint = self.path.rsplit("/", 1)[-1]
+        status_code, body = server.handle(
+            endpoint, data, self.headers.get("Idempotency-Key"), self.client_address
+        )
+        if isinstance(body, str):
+            content, content_type = body.encode(), "text/html"
+        else:
+            content, content_type = json.dumps(body).encode(), "application/json"
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FakeZibalServer:
+    """
+    Keeps the transactions in memory, `pay` simulates the customer paying a
+    transaction, `fail_next` makes the next requests fail with the given
+    status code and `serve_html_next` makes them return an HTML page with 200.
+    """
+
+    def __init__(self):
+        self.transactions: dict[int, dict] = {}
+        self.requests: list[tuple[str, dict, str | None]] = []
+        self.connections: set[tuple[str, int]] = set()
+        self._track_ids = itertools.count(1000)
+        self._failures: list[int] = []
+        self._html_responses = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), FakeZibalHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1/"
+
+    def start(self) -> "FakeZibalServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def fail_next(self, count: int = 1, status_code: int = 503) -> None:
+        with self._lock:
+            self._failures.extend([status_code] * count)
+
+    def serve_html_next(self, count: int = 1) -> None:
+        with self._lock:
+            self._html_responses += count
+
+    def pay(self, track_id: int) -> None:
+        with self._lock:
+            transaction = self.transactions[track_id]
+            transaction["status"] = 2
+            transaction["paidAt"] = datetime.now().isoformat()
+
+    def count(self, endpoint: str) -> int:
+        return sum(1 for requested, _, _ in self.requests if requested == endpoint)
+
+    def handle(self, endpoint, data, idempotency_key, client_address):
+        with self._lock:
+            self.requests.append((endpoint, data, idempotency_key))
+            self.connections.add(client_address)
+            if self._failures:
+                return self._failures.pop(0), {"message": "unavailable"}
+            if self._html_responses:
+                self._html_responses -= 1
+                return 200, "<html><body>Under maintenance</body></html>"
+            return 200, getattr(self, f"_{endpoint}")(data)
+
+    def probe(self) -> int:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else 200
+
+    def _request(self, data):
+        track_id = next(self._track_ids)
+        self.transactions[track_id] = {
+            "amount": data["amount"],
+            "status": -1,
+            "createdAt": datetime.now().isoformat(),
+            "paidAt": "",
+            "verifiedAt": "",
+        }
+        return {"trackId": track_id, "result": 100, "message": "success"}
+
+    def _transaction_body(self, track_id, transaction):
+        return {
+            "paidAt": transaction["paidAt"],
+            "status": transaction["status"],
+            "amount": transaction["amount"],
+            "refNumber": track_id,
+            "description": "",
+            "orderId": "",
+            "message": "success",
+        }
+
+    def _verify(self, data):
+        transaction = self.transactions.get(data["trackId"])
+        if transaction is None:
+            return {"result": 203, "message": "invalid track id"}
+        if transaction["status"] == 1:
+            return {"result": 201, "message": "already verified"}
+        if transaction["status"] != 2:
+            return {"result": 202, "message": "not paid"}
+        transaction["status"] = 1
+        transaction["verifiedAt"] = datetime.now().isoformat()
+        return {"result": 100, **self._transaction_body(data["trackId"], transaction)}
+
+    def _inquiry(self, data):
+        transaction = self.transactions.get(data["trackId"])
+        if transaction is None:
+            return {"result": 203, "message": "invalid track id"}
+        return {
+            "result": 100,
+            **self._transaction_body(data["trackId"], transaction),
+            "createdAt": transaction["createdAt"],
+            "verifiedAt": transaction["verifiedAt"],
+            "wage": 0,
+            "shaparakFee": 1200,
+        }
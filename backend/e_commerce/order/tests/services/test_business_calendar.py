@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from order.management.commands.benchmark_business_days import walk_business_days
+from order.services.business_calendar import (
+    BusinessCalendar,
+    add_business_days,
+    business_days_between,
+)
+
+
+@pytest.mark.parametrize("business_days", [0, 1, 5, 30, 400])
+def test_add_business_days_matches_walking_the_days(business_days):
+    start = date(2025, 3, 10)  # around the Nowruz holidays
+    for offset in range(0, 60, 3):
+        day = start + timedelta(days=offset)
+        assert add_business_days(day, business_days) == walk_business_days(
+            day, business_days
+        )
+
+
+def test_add_business_days_keeps_the_time():
+    when = datetime(2025, 10, 15, 13, 30)  # a wednesday
+    # thursday and friday are weekends
+    assert add_business_days(when, 1) == datetime(2025, 10, 18, 13, 30)
+
+
+def test_business_days_between():
+    calendar = BusinessCalendar(2025, 2025)
+    start, end = date(2025, 10, 15), date(2025, 10, 22)
+    expected = sum(
+        calendar.is_business_day(start + timedelta(days=i)) for i in range(1, 8)
+    )
+    assert business_days_between(start, end) == expected == 5
+    assert business_days_between(end, start) == 0
+    end = add_business_days(start, 42)
+    assert business_days_between(start, end) == 42
@@ -0,0 +1,57 @@
+import pytest
+from product.tests.product_factory import ProductVariantFactory
+
+from order.models import CartItem
+from order.services.cart_cache import get_cart_snapshot
+from order.services.inventory import reserve_stock
+
+
+@pytest.mark.django_db
+def test_cart_snapshot_is_written_through_on_item_changes(
+    customer_and_seller, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    customer, seller = customer_and_seller
+    variant = ProductVariantFactory(product__owner=seller, on_hand_stock=10, price=100)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item = CartItem.objects.create(
+            cart=customer.cart, product_variant=variant, quantity=2
+        )
+    with django_assert_num_queries(0):
+        snapshot = get_cart_snapshot(customer.id)
+    assert snapshot["total_price"] == 200
+    assert snapshot["seller"] == seller.id
+    assert [cart_item["quantity"] for cart_item in snapshot["items"]] == [2]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item.quantity = 3
+        item.save()
+    with django_assert_num_queries(0):
+        assert get_cart_snapshot(customer.id)["total_price"] == 300
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item.delete()
+    assert get_cart_snapshot(customer.id)["items"] == []
+
+
+@pytest.mark.django_db
+def test_cart_snapshot_is_invalidated_on_variant_changes(
+    customer_and_seller, django_capture_on_commit_callbacks
+):
+    customer, seller = customer_and_seller
+    variant = ProductVariantFactory(product__owner=seller, on_hand_stock=3, price=100)
+    with django_capture_on_commit_callbacks(execute=True):
+        item = CartItem.objects.create(
+            cart=customer.cart, product_variant=variant, quantity=2
+        )
+    assert get_cart_snapshot(customer.id)["total_price"] == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        variant.price = 150
+        variant.save()
+    assert get_cart_snapshot(customer.id)["total_price"] == 300
+
+    # another customer's reservation leaves less stock than the cart's quantity
+    with django_capture_on_commit_callbacks(execute=True):
+        reserve_stock({variant.id: 2})
+    assert item.id in get_cart_snapshot(customer.id)["cart_errors"]
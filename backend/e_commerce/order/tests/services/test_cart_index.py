@@ -0,0 +1,45 @@
+import pytest
+from django.core.cache import cache
+from product.tests.product_factory import ProductVariantFactory
+
+from order.models import CartItem
+from order.services.cart_index import (
+    get_variant_cart_user_ids,
+    rebuild_cart_variant_index,
+)
+
+
+@pytest.mark.django_db
+def test_cart_index_is_maintained_on_item_writes(
+    customer_and_seller, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    customer, seller = customer_and_seller
+    variant = ProductVariantFactory(product__owner=seller)
+    other_variant = ProductVariantFactory(product__owner=seller)
+    assert rebuild_cart_variant_index() == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item = CartItem.objects.create(
+            cart=customer.cart, product_variant=variant, quantity=1
+        )
+    with django_assert_num_queries(0):
+        assert get_variant_cart_user_ids([variant.id, other_variant.id]) == {
+            customer.id
+        }
+        assert get_variant_cart_user_ids([other_variant.id]) == set()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        item.delete()
+    assert get_variant_cart_user_ids([variant.id]) == set()
+
+
+@pytest.mark.django_db
+def test_cart_index_falls_back_to_database_until_built(customer_and_seller):
+    customer, seller = customer_and_seller
+    variant = ProductVariantFactory(product__owner=seller)
+    CartItem.objects.create(cart=customer.cart, product_variant=variant, quantity=1)
+    cache.clear()
+
+    assert get_variant_cart_user_ids([variant.id]) == {customer.id}
+    assert rebuild_cart_variant_index() == 1
+    assert get_variant_cart_user_ids([variant.id]) == {customer.id}
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from product.tests.product_factory import ProductVariantFactory
+
+from order.exceptions.errors import (
+    CartQuantityExceedError,
+    ProductDisabledError,
+    ProductUnavailableError,
+    SellerInactiveError,
+)
+from order.models import CartItem
+from order.services.validators import get_cart_errors
+
+
+def error_codes(errors: list[dict]) -> set[int]:
+    return {error["code"] for error in errors}
+
+
+@pytest.mark.django_db
+def test_get_cart_errors_validates_all_items_in_one_query(customer_and_seller):
+    customer, seller = customer_and_seller
+    seller.seller_profile.is_verified = True
+    seller.seller_profile.save()
+
+    valid_items = [
+        CartItem.objects.create(
+            cart=customer.cart,
+            product_variant=ProductVariantFactory(
+                product__owner=seller, on_hand_stock=10
+            ),
+            quantity=1,
+        )
+        for _ in range(5)
+    ]
+    exceeding_item = CartItem.objects.create(
+        cart=customer.cart,
+        product_variant=ProductVariantFactory(product__owner=seller, on_hand_stock=2),
+        quantity=3,
+    )
+    disabled_item = CartItem.objects.create(
+        cart=customer.cart,
+        product_variant=ProductVariantFactory(
+            product__owner=seller, on_hand_stock=5, is_enabled=False
+        ),
+        quantity=1,
+    )
+    unavailable_item = CartItem.objects.create(
+        cart=customer.cart,
+        product_variant=ProductVariantFactory(product__owner=seller, on_hand_stock=0),
+        quantity=1,
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        errors = get_cart_errors(customer.cart)
+    assert len(queries) == 1
+
+    assert all(item.id not in errors for item in valid_items)
+    assert error_codes(errors[exceeding_item.id]) == {CartQuantityExceedError.code}
+    assert error_codes(errors[disabled_item.id]) == {ProductDisabledError.code}
+    assert error_codes(errors[unavailable_item.id]) == {ProductUnavailableError.code}
+
+
+@pytest.mark.django_db
+def test_get_cart_errors_of_inactive_seller(customer_and_seller):
+    customer, seller = customer_and_seller
+    item = CartItem.objects.create(
+        cart=customer.cart,
+        product_variant=ProductVariantFactory(product__owner=seller, on_hand_stock=5),
+        quantity=1,
+    )
+
+    errors = get_cart_errors(customer.cart)
+    assert error_codes(errors[item.id]) == {SellerInactiveError.code}
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+from ecom_user_profile.tests.profile_factory import SellerFactory
+from financeops.models import FinancialRecord
+from financeops.services.ledger import verify_wallet_balances
+
+from order.models import Order
+from order.services.delivery import deliver_due_orders
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+
+
+def create_shipped_order(seller, total_price: int, due: bool) -> Order:
+    delta = timedelta(minutes=-1 if due else 60)
+    order = OrderFactory(
+        status=Order.SHIPPED, seller=seller, delivery_due_at=timezone.now() + delta
+    )
+    OrderItemFactory(order=order, submitted_price=total_price, quantity=1)
+    return order
+
+
+@pytest.mark.django_db
+def test_deliver_due_orders_credits_sellers_in_batches():
+    first_seller, second_seller = SellerFactory(), SellerFactory()
+    due_orders = [
+        create_shipped_order(first_seller, 1000, due=True),
+        create_shipped_order(first_seller, 2000, due=True),
+        create_shipped_order(second_seller, 4000, due=True),
+    ]
+    pending_order = create_shipped_order(second_seller, 8000, due=False)
+
+    assert deliver_due_orders(batch_size=2) == 3
+
+    for order in due_orders:
+        order.refresh_from_db()
+        assert order.status == Order.DELIVERED
+    pending_order.refresh_from_db()
+    assert pending_order.status == Order.SHIPPED
+
+    rate = settings.COMMISSION_RATE
+    first_seller.wallet.refresh_from_db()
+    second_seller.wallet.refresh_from_db()
+    assert first_seller.wallet.balance == int(1000 * rate) + int(2000 * rate)
+    assert second_seller.wallet.balance == int(4000 * rate)
+    assert (
+        FinancialRecord.objects.filter(type=FinancialRecord.ORDER_REVENUE).count() == 3
+    )
+    assert verify_wallet_balances() == []
+
+    assert deliver_due_orders() == 0
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from product.models import ProductVariant
+from product.tests.product_factory import ProductVariantFactory
+
+from order.models import Order
+from order.services.expiry import expire_unpaid_orders
+from order.services.inventory import reserve_stock
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+
+
+def create_unpaid_order(variant: ProductVariant, quantity: int, expired: bool) -> Order:
+    delta = timedelta(minutes=-1 if expired else 30)
+    order = OrderFactory(status=Order.UNPAID, expire_timestamp=timezone.now() + delta)
+    OrderItemFactory(order=order, product_variant=variant, quantity=quantity)
+    reserve_stock({variant.id: quantity})
+    return order
+
+
+@pytest.mark.django_db
+def test_expire_unpaid_orders_releases_stock_in_batches():
+    variant = ProductVariantFactory(on_hand_stock=20)
+    expired_orders = [create_unpaid_order(variant, 2, expired=True) for _ in range(3)]
+    pending_order = create_unpaid_order(variant, 4, expired=False)
+
+    assert expire_unpaid_orders(batch_size=2) == 3
+
+    for order in expired_orders:
+        order.refresh_from_db()
+        assert order.status == Order.TIMED_OUT
+    pending_order.refresh_from_db()
+    assert pending_order.status == Order.UNPAID
+    variant.refresh_from_db()
+    assert variant.reserved_stock == 4
+    assert variant.available_stock == 16
+
+    assert expire_unpaid_orders() == 0
+
+
+@pytest.mark.django_db
+def test_expire_unpaid_orders_ignores_paid_orders():
+    variant = ProductVariantFactory(on_hand_stock=5)
+    order = OrderFactory(
+        status=Order.PAID, expire_timestamp=timezone.now() - timedelta(minutes=1)
+    )
+    OrderItemFactory(order=order, product_variant=variant, quantity=1)
+
+    assert expire_unpaid_orders() == 0
+    order.refresh_from_db()
+    assert order.status == Order.PAID
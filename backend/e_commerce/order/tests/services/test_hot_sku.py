@@ -0,0 +1,72 @@
+import pytest
+from django.core.cache import cache
+from product.tests.product_factory import ProductVariantFactory
+from redis.exceptions import RedisError
+
+from order.exceptions.errors import CartQuantityExceedError
+from order.services.hot_sku import hot_sku_stock_key, reconcile_hot_sku_stocks
+from order.services.inventory import release_stock, reserve_stock
+
+
+def hot_stock(variant) -> int:
+    return int(cache.client.get_client().get(hot_sku_stock_key(variant.id)))
+
+
+@pytest.mark.django_db
+def test_hot_sku_reservation_goes_through_redis_counter(
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    hot_variant = ProductVariantFactory(on_hand_stock=5, is_hot_sku=True)
+    variant = ProductVariantFactory(on_hand_stock=5)
+    assert reconcile_hot_sku_stocks() == 1
+
+    reserve_stock({hot_variant.id: 3, variant.id: 1})
+    assert hot_stock(hot_variant) == 2
+    hot_variant.refresh_from_db()
+    assert hot_variant.reserved_stock == 3
+
+    # sold out hot variants are rejected without touching the database
+    with django_assert_num_queries(0):
+        with pytest.raises(CartQuantityExceedError):
+            reserve_stock({hot_variant.id: 3})
+    assert hot_stock(hot_variant) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        release_stock({hot_variant.id: 3})
+    assert hot_stock(hot_variant) == 5
+
+
+@pytest.mark.django_db
+def test_hot_sku_counter_is_restored_when_database_reservation_fails():
+    hot_variant = ProductVariantFactory(on_hand_stock=5, is_hot_sku=True)
+    variant = ProductVariantFactory(on_hand_stock=1)
+    reconcile_hot_sku_stocks()
+
+    with pytest.raises(CartQuantityExceedError):
+        reserve_stock({hot_variant.id: 2, variant.id: 2})
+    assert hot_stock(hot_variant) == 5
+
+
+@pytest.mark.django_db
+def test_reconciliation_corrects_drift():
+    hot_variant = ProductVariantFactory(on_hand_stock=5, is_hot_sku=True)
+    reconcile_hot_sku_stocks()
+    hot_variant.on_hand_stock = 20  # restocked by the seller
+    hot_variant.save()
+
+    reconcile_hot_sku_stocks()
+    assert hot_stock(hot_variant) == 20
+
+
+@pytest.mark.django_db
+def test_hot_sku_counters_fall_back_to_the_database_without_redis(mocker):
+    hot_variant = ProductVariantFactory(on_hand_stock=5, is_hot_sku=True)
+    client = cache.client.get_client()
+    mocker.patch.object(client, "pipeline", side_effect=RedisError("unavailable"))
+    mocker.patch.object(client, "evalsha", side_effect=RedisError("unavailable"))
+
+    assert reconcile_hot_sku_stocks() == 0
+    reserve_stock({hot_variant.id: 3})
+    hot_variant.refresh_from_db()
+    assert hot_variant.reserved_stock == 3
+    release_stock({hot_variant.id: 3})
@@ -0,0 +1,53 @@
+import pytest
+from product.models import ProductVariant
+from product.tests.product_factory import ProductVariantFactory
+
+from order.exceptions.errors import CartQuantityExceedError, InvalidOrderError
+from order.services.inventory import commit_stock, release_stock, reserve_stock
+
+
+def stocks(variant: ProductVariant) -> tuple[int, int, int, int]:
+    variant.refresh_from_db()
+    return (
+        variant.on_hand_stock,
+        variant.reserved_stock,
+        variant.available_stock,
+        variant.number_sold,
+    )
+
+
+@pytest.mark.django_db
+def test_reserve_release_and_commit_stock():
+    variant = ProductVariantFactory(on_hand_stock=10)
+
+    reserve_stock({variant.id: 4})
+    assert stocks(variant) == (10, 4, 6, 0)
+
+    release_stock({variant.id: 1})
+    assert stocks(variant) == (10, 3, 7, 0)
+
+    commit_stock({variant.id: 3})
+    assert stocks(variant) == (7, 0, 7, 3)
+
+
+@pytest.mark.django_db
+def test_reserve_stock_is_all_or_nothing():
+    first_variant = ProductVariantFactory(on_hand_stock=10)
+    second_variant = ProductVariantFactory(on_hand_stock=2)
+
+    with pytest.raises(CartQuantityExceedError):
+        reserve_stock({first_variant.id: 5, second_variant.id: 3})
+    assert stocks(first_variant) == (10, 0, 10, 0)
+    assert stocks(second_variant) == (2, 0, 2, 0)
+
+
+@pytest.mark.django_db
+def test_release_more_than_reserved_stock_fails():
+    variant = ProductVariantFactory(on_hand_stock=10)
+    reserve_stock({variant.id: 2})
+
+    with pytest.raises(InvalidOrderError):
+        release_stock({variant.id: 3})
+    with pytest.raises(InvalidOrderError):
+        commit_stock({variant.id: 3})
+    assert stocks(variant) == (10, 2, 8, 0)
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from order.models import Order
+from order.services.ipg_outage import apply_ipg_outage_policy
+from order.tests.order_factory import OrderFactory
+
+
+@pytest.mark.django_db
+def test_orders_are_held_while_all_ipgs_are_down(monkeypatch):
+    unpaid = OrderFactory(status=Order.UNPAID)
+    expired = OrderFactory(
+        status=Order.UNPAID, expire_timestamp=timezone.now() - timedelta(minutes=1)
+    )
+    held_by_support = OrderFactory(status=Order.ON_HOLD)
+
+    monkeypatch.setattr(
+        "order.services.ipg_outage.PaymentGatewayFactory.get_available_ipgs", lambda: []
+    )
+    assert apply_ipg_outage_policy() == 1
+    unpaid.refresh_from_db()
+    assert unpaid.status == Order.ON_HOLD and unpaid.held_by_server
+    expired.refresh_from_db()
+    assert expired.status == Order.UNPAID
+
+    monkeypatch.setattr(
+        "order.services.ipg_outage.PaymentGatewayFactory.get_available_ipgs", lambda: [1]
+    )
+    assert apply_ipg_outage_policy() == 1
+    unpaid.refresh_from_db()
+    assert unpaid.status == Order.UNPAID and not unpaid.held_by_server
+    assert unpaid.expire_timestamp > timezone.now()
+    held_by_support.refresh_from_db()
+    assert held_by_support.status == Order.ON_HOLD
@@ -0,0 +1,50 @@
+from contextlib import nullcontext
+
+import pytest
+from django.db import transaction
+from product.tasks import refresh_listings
+
+from order.models import OutboxMessage
+from order.services import outbox
+from order.services.outbox import enqueue_task, relay_outbox_messages
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    sent = []
+    monkeypatch.setattr(outbox, "_producer", lambda: nullcontext())
+    monkeypatch.setattr(
+        outbox,
+        "_send_task",
+        lambda message, producer: sent.append((message.task, message.args)),
+    )
+    return sent
+
+
+@pytest.mark.django_db(transaction=True)
+def test_tasks_are_enqueued_with_the_transaction(sent):
+    with transaction.atomic():
+        enqueue_task(refresh_listings, [1, 2])
+    with pytest.raises(RuntimeError), transaction.atomic():
+        enqueue_task(refresh_listings, [3])
+        raise RuntimeError()
+
+    assert relay_outbox_messages(batch_size=1) == 1
+    assert sent == [("product.tasks.refresh_listings", [[1, 2]])]
+    assert not OutboxMessage.objects.exists()
+
+
+@pytest.mark.django_db
+def test_unpublished_messages_are_kept(sent, monkeypatch):
+    for product_id in range(3):
+        enqueue_task("product.tasks.refresh_listings", [product_id])
+
+    def send_until_broker_fails(message, producer):
+        if sent:
+            raise ConnectionError()
+        sent.append(message.args)
+
+    monkeypatch.setattr(outbox, "_send_task", send_until_broker_fails)
+    assert relay_outbox_messages() == 1
+    assert sent == [[[0]]]
+    assert list(OutboxMessage.objects.values_list("args", flat=True)) == [[[1]], [[2]]]
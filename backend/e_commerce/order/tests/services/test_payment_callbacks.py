@@ -0,0 +1,116 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from ecom_core import ipgs
+from financeops.models import Payment
+from financeops.tests.finance_factory import PaymentFactory
+
+from order.cache_keys import (
+    PAYMENT_CALLBACK_DEAD_LETTER_STREAM_KEY,
+    PAYMENT_CALLBACK_GROUP,
+    PAYMENT_CALLBACK_STREAM_KEY,
+)
+from order.models import Order
+from order.payment.factory import PaymentGatewayFactory
+from order.services import callbacks
+from order.services.callbacks import consume_payment_callbacks, enqueue_payment_callback
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+
+CALLBACK_URL = "https://localhost.com/callback"
+
+
+@pytest.fixture
+def paid_payment(fake_ipg):
+    order = OrderFactory(status=Order.UNPAID)
+    OrderItemFactory(order=order, submitted_price=10000, quantity=2)
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    track_id = client.request_transaction(20000, CALLBACK_URL).track_id
+    fake_ipg.pay(track_id)
+    return PaymentFactory(
+        status=Payment.PAYING,
+        amount=20000,
+        order=order,
+        ipg_service=ipgs.ZIBAL,
+        track_id=str(track_id),
+        track_id_submitted_at=timezone.now() - timedelta(minutes=1),
+    )
+
+
+@pytest.mark.django_db
+def test_duplicate_callbacks_transition_payment_once(fake_ipg, paid_payment):
+    for _ in range(3):
+        enqueue_payment_callback(ipgs.ZIBAL, paid_payment.track_id, True)
+    enqueue_payment_callback(ipgs.ZIBAL, "404", True)
+
+    report = consume_payment_callbacks("worker-1")
+
+    assert report.paid == report.paid_orders == 1
+    paid_payment.refresh_from_db()
+    assert paid_payment.status == Payment.PAID and paid_payment.is_used
+    assert paid_payment.order.status == Order.PAID
+    assert fake_ipg.count("verify") == 1
+
+    # a late duplicate is skipped without calling the IPG
+    enqueue_payment_callback(ipgs.ZIBAL, paid_payment.track_id, True)
+    assert consume_payment_callbacks("worker-1").paid == 0
+    assert fake_ipg.count("inquiry") == 1
+    assert cache.client.get_client().xlen(PAYMENT_CALLBACK_STREAM_KEY) == 0
+
+
+@pytest.mark.django_db
+def test_pending_callbacks_of_dead_consumers_are_claimed(
+    fake_ipg, paid_payment, monkeypatch
+):
+    enqueue_payment_callback(ipgs.ZIBAL, paid_payment.track_id, True)
+    client = cache.client.get_client()
+    callbacks._ensure_group(client)
+    # read by a consumer which dies before acknowledging the callback
+    client.xreadgroup(
+        PAYMENT_CALLBACK_GROUP, "worker-1", {PAYMENT_CALLBACK_STREAM_KEY: ">"}
+    )
+    assert consume_payment_callbacks("worker-2").paid == 0
+
+    monkeypatch.setattr(callbacks, "CALLBACK_CLAIM_IDLE_TIME", 0)
+    assert consume_payment_callbacks("worker-2").paid == 1
+    paid_payment.refresh_from_db()
+    assert paid_payment.status == Payment.PAID
+
+
+@pytest.mark.django_db
+def test_callbacks_delivered_too_many_times_are_dead_lettered(
+    fake_ipg, paid_payment, monkeypatch
+):
+    enqueue_payment_callback(ipgs.ZIBAL, paid_payment.track_id, True)
+    client = cache.client.get_client()
+    callbacks._ensure_group(client)
+    monkeypatch.setattr(callbacks, "CALLBACK_CLAIM_IDLE_TIME", 0)
+    # delivered to consumers which fail to handle it
+    client.xreadgroup(
+        PAYMENT_CALLBACK_GROUP, "worker-1", {PAYMENT_CALLBACK_STREAM_KEY: ">"}
+    )
+    for _ in range(callbacks.CALLBACK_MAX_DELIVERIES - 1):
+        callbacks._read_callbacks(client, "worker-1", 10, None)
+    time.sleep(0.01)  # idle since its last delivery
+
+    assert consume_payment_callbacks("worker-2").paid == 0
+    assert client.xlen(PAYMENT_CALLBACK_STREAM_KEY) == 0
+    assert client.xpending(PAYMENT_CALLBACK_STREAM_KEY, PAYMENT_CALLBACK_GROUP)["pending"] == 0
+    [(_, fields)] = client.xrange(PAYMENT_CALLBACK_DEAD_LETTER_STREAM_KEY)
+    assert fields[b"track_id"] == paid_payment.track_id.encode()
+    paid_payment.refresh_from_db()
+    assert paid_payment.status == Payment.PAYING
+
+
+@pytest.mark.django_db
+def test_consume_payment_callbacks_command(fake_ipg, paid_payment):
+    enqueue_payment_callback(ipgs.ZIBAL, paid_payment.track_id, True)
+    out = StringIO()
+    call_command("consume_payment_callbacks", "--once", stdout=out)
+    assert "1 paid" in out.getvalue()
+    paid_payment.refresh_from_db()
+    assert paid_payment.status == Payment.PAID
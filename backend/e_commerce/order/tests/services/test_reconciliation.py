@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from ecom_core import ipgs
+from financeops.models import Payment
+from financeops.tests.finance_factory import PaymentFactory
+
+from order.models import Order
+from order.payment.factory import PaymentGatewayFactory
+from order.payment.schemas import PaymentStatusResponse
+from order.services.reconciliation import get_payment_status, reconcile_payments
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+
+CALLBACK_URL = "https://localhost.com/callback"
+
+
+def create_paying_payment(amount: int, minutes_ago: int, paid: bool, fake_ipg, order=None):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    track_id = client.request_transaction(amount, CALLBACK_URL).track_id
+    if paid:
+        fake_ipg.pay(track_id)
+    return PaymentFactory(
+        status=Payment.PAYING,
+        amount=amount,
+        order=order,
+        ipg_service=ipgs.ZIBAL,
+        track_id=str(track_id),
+        track_id_submitted_at=timezone.now() - timedelta(minutes=minutes_ago),
+    )
+
+
+def create_unpaid_order() -> Order:
+    order = OrderFactory(status=Order.UNPAID)
+    OrderItemFactory(order=order, submitted_price=10000, quantity=2)
+    return order
+
+
+@pytest.mark.django_db
+def test_reconcile_payments(fake_ipg):
+    paid_order = create_unpaid_order()
+    paid = create_paying_payment(20000, 10, True, fake_ipg, order=paid_order)
+    mismatched_order = create_unpaid_order()
+    mismatched = create_paying_payment(15000, 10, True, fake_ipg, order=mismatched_order)
+    expired = create_paying_payment(20000, 20, False, fake_ipg)
+    waiting = create_paying_payment(20000, 10, False, fake_ipg)
+    recent = create_paying_payment(20000, 1, True, fake_ipg)
+
+    report = reconcile_payments(batch_size=2)
+
+    assert (report.paid, report.cancelled, report.failed) == (2, 1, 0)
+    assert report.unresolved == 1
+    assert report.paid_orders == 1
+    assert [(m.payment_id, m.reason) for m in report.mismatches] == [
+        (mismatched.id, "amount_mismatch")
+    ]
+    for payment, status in [
+        (paid, Payment.PAID),
+        (mismatched, Payment.PAID),
+        (expired, Payment.CANCELLED),
+        (waiting, Payment.PAYING),
+        (recent, Payment.PAYING),
+    ]:
+        payment.refresh_from_db()
+        assert payment.status == status
+    paid_order.refresh_from_db()
+    assert paid_order.status == Order.PAID
+    mismatched_order.refresh_from_db()
+    assert mismatched_order.status == Order.UNPAID
+    # the recent payment isn't inquired, the paid one is also verified
+    assert fake_ipg.count("inquiry") == 4
+    assert fake_ipg.count("verify") == 2
+
+    # the resolved payments aren't inquired again
+    report = reconcile_payments()
+    assert report.unresolved == 1 and not report.mismatches
+
+
+
+@pytest.mark.django_db
+def test_reconcile_payments_with_non_json_response(fake_ipg):
+    payments = [create_paying_payment(20000, 10, True, fake_ipg) for _ in range(2)]
+    # e.g. the maintenance page of a proxy, for one of the inquiries
+    fake_ipg.serve_html_next(1)
+
+    report = reconcile_payments()
+
+    assert (report.paid, report.unresolved) == (1, 1)
+    statuses = []
+    for payment in payments:
+        payment.refresh_from_db()
+        statuses.append(payment.status)
+    assert sorted(statuses) == [Payment.PAID, Payment.PAYING]
+
+@pytest.mark.parametrize(
+    "status, minutes_ago, expected",
+    [
+        (2, 1, Payment.PAID),
+        (-1, 1, None),
+        (-1, 60, Payment.CANCELLED),
+        (-2, 60, None),
+        (3, 1, Payment.CANCELLED),
+        (5, 1, Payment.FAILED),
+    ],
+)
+def test_get_payment_status(status, minutes_ago, expected):
+    now = timezone.now()
+    payment = {"track_id_submitted_at": now - timedelta(minutes=minutes_ago)}
+    response = PaymentStatusResponse(
+        status=status, paid_at="", status_meaning="", amount=20000
+    )
+    assert get_payment_status(payment, response, now) == expected
@@ -0,0 +1,75 @@
+import pytest
+from ecom_core import ipgs
+
+from order.payment import breaker
+from order.payment.exceptions import PaymentRequestError, PaymentServiceUnavailableError
+from order.payment.factory import PaymentGatewayFactory
+
+CALLBACK_URL = "https://localhost.com/callback"
+
+
+@pytest.fixture(autouse=True)
+def transitions(monkeypatch):
+    monkeypatch.setattr("order.payment.http.backoff_delay", lambda attempt: 0)
+    calls = []
+    monkeypatch.setattr(breaker, "_on_transition", lambda: calls.append(1))
+    return calls
+
+
+def open_breaker(fake_ipg, client):
+    fake_ipg.fail_next(breaker.BREAKER_MIN_REQUESTS)
+    for _ in range(breaker.BREAKER_MIN_REQUESTS):
+        with pytest.raises(PaymentRequestError):
+            client.request_transaction(5000, CALLBACK_URL)
+
+
+def test_breaker_opens_on_errors_and_rejects_requests(fake_ipg, transitions):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    assert PaymentGatewayFactory.get_available_ipgs() == [ipgs.ZIBAL]
+
+    open_breaker(fake_ipg, client)
+    assert client.transport.breaker.state == breaker.OPEN
+    assert PaymentGatewayFactory.get_available_ipgs() == []
+    assert len(transitions) == 1
+
+    # requests are rejected without reaching the IPG while the breaker is open
+    with pytest.raises(PaymentServiceUnavailableError):
+        client.request_transaction(5000, CALLBACK_URL)
+    assert fake_ipg.count("request") == breaker.BREAKER_MIN_REQUESTS
+
+
+def test_breaker_stays_closed_below_min_requests(fake_ipg, transitions):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    fake_ipg.fail_next(breaker.BREAKER_MIN_REQUESTS - 1)
+    for _ in range(breaker.BREAKER_MIN_REQUESTS - 1):
+        with pytest.raises(PaymentRequestError):
+            client.request_transaction(5000, CALLBACK_URL)
+    assert client.transport.breaker.state == breaker.CLOSED
+    assert not transitions
+
+
+def test_half_open_breaker_is_closed_by_probe(fake_ipg, transitions, monkeypatch):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    open_breaker(fake_ipg, client)
+
+    monkeypatch.setattr(breaker, "BREAKER_COOLDOWN", 0)
+    assert client.transport.breaker.state == breaker.HALF_OPEN
+    # a single probe is let through at a time
+    assert client.transport.breaker.allow_request()
+    assert not client.transport.breaker.allow_request()
+
+    assert PaymentGatewayFactory.probe_ipgs() == {ipgs.ZIBAL: True}
+    assert client.transport.breaker.state == breaker.CLOSED
+    assert len(transitions) == 2
+    assert client.request_transaction(5000, CALLBACK_URL).track_id
+
+
+def test_failed_probe_reopens_breaker(fake_ipg, monkeypatch):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    open_breaker(fake_ipg, client)
+
+    monkeypatch.setattr(breaker, "BREAKER_COOLDOWN", 0)
+    fake_ipg.fail_next(1)
+    assert PaymentGatewayFactory.probe_ipgs() == {ipgs.ZIBAL: False}
+    monkeypatch.setattr(breaker, "BREAKER_COOLDOWN", 30)
+    assert client.transport.breaker.state == breaker.OPEN
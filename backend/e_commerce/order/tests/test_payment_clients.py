@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from ecom_core import ipgs
+
+from order.payment.exceptions import PaymentRequestError, PaymentResponseError
+from order.payment.factory import PaymentGatewayFactory
+
+CALLBACK_URL = "https://localhost.com/callback"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("order.payment.http.backoff_delay", lambda attempt: 0)
+
+
+def test_client_reuses_its_connection(fake_ipg):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    assert PaymentGatewayFactory.get_client(ipgs.ZIBAL) is client
+
+    response = client.request_transaction(5000, CALLBACK_URL)
+    fake_ipg.pay(response.track_id)
+    assert client.verify_transaction(response.track_id).status == 1
+    assert client.inquiry_transaction(response.track_id).status == 1
+
+    assert len(fake_ipg.requests) == 3
+    assert len(fake_ipg.connections) == 1
+
+
+def test_verify_transaction_is_idempotent(fake_ipg):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    track_id = client.request_transaction(5000, CALLBACK_URL).track_id
+
+    # unpaid transactions aren't stored, so they can be verified after payment
+    with pytest.raises(PaymentResponseError):
+        client.verify_transaction(track_id)
+    fake_ipg.pay(track_id)
+    first = client.verify_transaction(track_id)
+    assert client.verify_transaction(track_id) == first
+    assert fake_ipg.count("verify") == 2
+    assert fake_ipg.requests[-1][2] == f"verify:{track_id}"
+
+
+def test_idempotent_requests_are_retried(fake_ipg):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    track_id = client.request_transaction(5000, CALLBACK_URL).track_id
+
+    fake_ipg.fail_next(2)
+    assert client.inquiry_transaction(track_id).status == -1
+    assert fake_ipg.count("inquiry") == 3
+
+    # requesting a transaction without an idempotency key isn't retried
+    fake_ipg.fail_next(1)
+    with pytest.raises(PaymentRequestError):
+        client.request_transaction(5000, CALLBACK_URL)
+
+    fake_ipg.fail_next(1)
+    response = client.request_transaction(5000, CALLBACK_URL, idempotency_key="order:1")
+    assert (
+        client.request_transaction(5000, CALLBACK_URL, idempotency_key="order:1")
+        == response
+    )
+
+
+def test_async_client(fake_ipg):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+
+    async def pay_and_verify():
+        response = await client.arequest_transaction(5000, CALLBACK_URL)
+        fake_ipg.pay(response.track_id)
+        verified = await client.averify_transaction(response.track_id)
+        inquired = await client.ainquiry_transaction(response.track_id)
+        return verified, inquired
+
+    verified, inquired = asyncio.run(pay_and_verify())
+    assert verified.status == inquired.status == 1
+
+
+def test_non_json_responses_raise_response_error(fake_ipg):
+    client = PaymentGatewayFactory.get_client(ipgs.ZIBAL)
+    track_id = client.request_transaction(5000, CALLBACK_URL).track_id
+
+    fake_ipg.serve_html_next(2)
+    with pytest.raises(PaymentResponseError):
+        client.inquiry_transaction(track_id)
+    with pytest.raises(PaymentResponseError):
+        asyncio.run(client.ainquiry_transaction(track_id))
+    assert client.inquiry_transaction(track_id).status == -1
@@ -1,6 +1,6 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
-import holidays
+from order.services import business_calendar
 
 
 def format_time(time: int) -> str:
@@ -27,18 +27,8 @@ def format_time(time: int) -> str:
 
 
 def add_business_days(date: datetime, business_days: int) -> datetime:
-    "Add business days to a `datetime` object by excluding weekends and holidays."
-    ir_holidays = holidays.IR()
-    added_days = 0
-    current_date = date
-    THURSDAY, FRIDAY = 2, 3  # weekends 
-
-    while added_days < business_days:
-        current_date += timedelta(days=1)
-        if (
-            current_date.weekday() not in (THURSDAY, FRIDAY)
-            and current_date.date() not in ir_holidays
-        ):
-            added_days += 1
-
-    return current_date
+    """
+    Add business days to a `datetime` object by excluding weekends and holidays
+    (refer to `order.services.business_calendar`).
+    """
+    return business_calendar.add_business_days(date, business_days)
@@ -1,7 +1,7 @@
 import logging
 
-from django.core.exceptions import ObjectDoesNotExist
-from financeops.models import Payment
+from ecom_core import ipgs
+from ecom_core.pagination import KeysetOrPageNumberPagination
 from product.permissions import IsSellerVerified
 from rest_framework import status
 from rest_framework.generics import (
@@ -16,16 +16,17 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from zibal.utils import to_snake_case_dict
 
-from order.models import Cart, CartItem, Order
+from order.models import CartItem, Order
 from order.permissions import IsCartItemOwner, IsSellerOfOrder
 from order.serializers import (
     CartItemSerializer,
-    CartSerializerForCustomer,
     OrderPaymentSerializer,
     OrderSerializerForCustomer,
     OrderSerializerForSeller,
     ZibalCallbackSerializer,
 )
+from order.services.callbacks import enqueue_payment_callback
+from order.services.cart_cache import get_cart_snapshot
 
 logger = logging.getLogger("order")
 
@@ -57,14 +58,13 @@ class CartItemDetail(GenericAPIView, UpdateModelMixin, DestroyModelMixin):
 class CartDetail(APIView):
     """
     Allows a customer to inspect their current cart and its items.
+    The cart is served from its cached snapshot (refer to `order.services.cart_cache`).
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
-        cart_obj, _ = Cart.objects.get_or_create(user=self.request.user)
-        serializer = CartSerializerForCustomer(cart_obj)
-        return Response(serializer.data)
+        return Response(get_cart_snapshot(request.user.id))
 
 
 # class CustomerOrderCreation(APIView):
@@ -90,14 +90,22 @@ class CustomerOrderList(ListCreateAPIView):
 
     Note that this endpoint is not responsible for handling the payment when
     creating an order.
+
+    Keyset pagination can be used via ?pagination=cursor.
     """
 
     queryset = Order.objects.all()
     serializer_class = OrderSerializerForCustomer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_queryset(self):
-        return super().get_queryset().filter(user=self.request.user)
+        return (
+            super()
+            .get_queryset()
+            .filter(customer=self.request.user)
+            .order_by("-created_at")
+        )
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -126,14 +134,17 @@ class SellerOrderList(ListAPIView):
     """
     For listing all the orders which the current authenticated user is
     the seller of the orders.
+
+    Keyset pagination can be used via ?pagination=cursor.
     """
 
     permission_classes = [IsAuthenticated, IsSellerVerified]
     queryset = Order.objects.all()
     serializer_class = OrderSerializerForSeller
+    pagination_class = KeysetOrPageNumberPagination
 
     def get_queryset(self):
-        return self.queryset.filter(seller=self.request.user)
+        return self.queryset.filter(seller=self.request.user).order_by("-created_at")
 
 
 class SellerOrderDetail(RetrieveUpdateAPIView):
@@ -167,9 +178,10 @@ class ZibalCallbackView(APIView):
         #     )
         #     raise PermissionDenied("Unauthorized request.")
         payment_data = to_snake_case_dict(self.request.query_params)
-        serializer = ZibalCallbackSerializer(payment_data)
+        serializer = ZibalCallbackSerializer(data=payment_data)
 
-        # validate the data and try to retrieve the payment instance
+        # validate the data, the payment is verified and updated asynchronously
+        # (refer to `order.services.callbacks`)
         if not serializer.is_valid():
             logger.error(
                 "Data recieved from the Zibal IPG doesn't have the expected "
@@ -181,35 +193,9 @@ class ZibalCallbackView(APIView):
                 {"error": "Unexpected data structure recieved from the IPG"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-        try:
-            payment_obj = Payment.objects.get(track_id=serializer.data["track_id"])
-        except ObjectDoesNotExist:
-            logger.error(
-                f"The given track id {serializer.data['track_id']} from IPG's"
-                "callback request wasn't associated with any `Payment` objects."
-            )
-            return Response(
-                {"error": "No Payment instances were found with the given track_id"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        # update the payment instance
-        if serializer.data["success"] == 0:
-            payment_obj.status = Payment.CANCELLED
-            logger.warning(
-                f"The payment with track id of {serializer.data['track_id']} was unsuccesful."
-                f"Result code: {serializer.data['status']}"
-            )
-            return Response(
-                {"error": "The payment was unsuccesful"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        else:
-            payment_obj.status = Payment.PAID
-            logger.info(
-                f"The payment instance with id of {payment_obj.id} was updated"
-                "to PAID due to successful callback request from Zibal's IPG."
-            )
-
-        payment_obj.save()
-        return Response({"status": "success"}, status=status.HTTP_200_OK)
+        enqueue_payment_callback(
+            ipgs.ZIBAL,
+            serializer.validated_data["track_id"],
+            serializer.validated_data["success"] == 1,
+        )
+        return Response({"status": "accepted"}, status=status.HTTP_200_OK)
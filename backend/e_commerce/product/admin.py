@@ -28,6 +28,7 @@ class ProductVariantInline(admin.TabularInline):
         "image",
         "on_hand_stock",
         "is_enabled",
+        "is_hot_sku",
     )
     readonly_fields = ("reserved_stock", "number_sold")
     show_change_link = True
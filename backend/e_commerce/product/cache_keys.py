@@ -4,3 +4,23 @@ FULLCATEGORIES_CACHE_KEY = "fullcategories"
 
 def breadcrumb_cache_key(subcategory_id: int) -> str:
     return f"breadcrumb:{subcategory_id}"
+
+
+VIEW_COUNT_DELTAS_CACHE_KEY = "product:view_count:deltas"
+VIEW_COUNT_FLUSHING_CACHE_KEY = "product:view_count:flushing"
+
+
+def product_viewers_cache_key(product_id: int, day) -> str:
+    return f"product:{product_id}:viewers:{day.isoformat()}"
+
+
+def owner_stats_cache_key(product_id: int) -> str:
+    return f"product:{product_id}:owner_stats"
+
+
+def product_detail_version_cache_key(product_id: int) -> str:
+    return f"product:{product_id}:detail_version"
+
+
+def product_detail_cache_key(product_id: int, version: int) -> str:
+    return f"product:{product_id}:detail:{version}"
@@ -1,25 +1,31 @@
 from django_filters import rest_framework as filters
 
-from product.models import Product
+from product.models import ProductListing, Tag
+from product.services.search import search_listings
 
 
 class ProductFilter(filters.FilterSet):
     """
-    It is assumed that the 'Product' querysets that are used within this filter,
+    It is assumed that the 'ProductListing' querysets that are used within this filter,
     and their 'is_valid' fields are true (the 'main_variant' and 'owner'
     fields are not null on the Product instance).
     """
 
     name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+    search = filters.CharFilter(method="filter_search")
     subcategory = filters.NumberFilter(field_name="subcategory__id", lookup_expr="exact", required=True)
-    price_min = filters.NumberFilter(
-        field_name="main_variant__price", lookup_expr="gte"
-    )
-    price_max = filters.NumberFilter(
-        field_name="main_variant__price", lookup_expr="lte"
-    )
+    price_min = filters.NumberFilter(field_name="main_price", lookup_expr="gte")
+    price_max = filters.NumberFilter(field_name="main_price", lookup_expr="lte")
     in_stock = filters.BooleanFilter()
+    tags = filters.ModelMultipleChoiceFilter(
+        field_name="product__tags", queryset=Tag.objects.all()
+    )
 
     class Meta:
-        model = Product
+        model = ProductListing
         fields = ["name", "subcategory", "tags"]
+
+    def filter_search(self, queryset, name, value):
+        # the results are ordered by relevance, unless an ordering is requested.
+        order = self.request is None or "ordering" not in self.request.query_params
+        return search_listings(queryset, value, order=order)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandParser
+from tqdm import tqdm
+
+from product.models import Product
+from product.services.listing import refresh_product_listings
+
+
+class Command(BaseCommand):
+    help = "Rebuild the `ProductListing` read model rows for all of the products"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch_size",
+            type=int,
+            default=1000,
+            help="Number of products to be refreshed per query",
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs["batch_size"]
+        product_ids = Product.objects.order_by("id").values_list("id", flat=True)
+        total = product_ids.count()
+        refreshed = 0
+        with tqdm(total=total, desc="Rebuilding product listings...") as progress:
+            batch = []
+            for product_id in product_ids.iterator(chunk_size=batch_size):
+                batch.append(product_id)
+                if len(batch) >= batch_size:
+                    refreshed += refresh_product_listings(batch)
+                    progress.update(len(batch))
+                    batch = []
+            if batch:
+                refreshed += refresh_product_listings(batch)
+                progress.update(len(batch))
+        self.stdout.write(
+            self.style.SUCCESS(f"{refreshed} product listings were rebuilt.")
+        )
@@ -1,6 +1,7 @@
 from django.apps import apps
 from django.db import models
-from django.db.models import Exists, F, OuterRef, Sum
+from django.db.models import Avg, Count, Exists, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 
 
 class ProductQuerySet(models.QuerySet):
@@ -23,6 +24,48 @@ class ProductQuerySet(models.QuerySet):
         )
         return self.annotate(in_stock=Exists(in_stock_subquery))
 
+    def with_rating(self):
+        # subqueries are used instead of joins, so that the rating annotations
+        # can be combined with the variant aggregations without duplicating rows.
+        ProductReview = apps.get_model("feedback", "ProductReview")
+        reviews = (
+            ProductReview.objects.filter(product=OuterRef("pk"))
+            .order_by()
+            .values("product")
+        )
+        return self.annotate(
+            rating_avg=Coalesce(
+                Subquery(reviews.annotate(avg=Avg("rating")).values("avg")),
+                0.0,
+                output_field=FloatField(),
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(count=Count("id")).values("count")), 0
+            ),
+        )
+
+
+    def with_detail_relations(self):
+        """
+        Load the relations which are represented by the product detail serializers
+        (`ProductSerializerForAny` and `ProductSerializerForOwner`) in advance.
+        """
+        ProductVariant = apps.get_model("product", "ProductVariant")
+        return (
+            self.select_related("owner__seller_profile", "subcategory", "main_variant")
+            .prefetch_related(
+                models.Prefetch(
+                    "variants",
+                    queryset=ProductVariant.objects.order_by("id").prefetch_related(
+                        "images"
+                    ),
+                ),
+                "technical_details",
+                "tags",
+            )
+            .with_rating()
+        )
+
 
 class ProductManager(models.Manager):
     def get_queryset(self):
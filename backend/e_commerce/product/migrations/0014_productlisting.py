@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecom_user_profile', '0007_alter_sellerprofile_store_name'),
+        ('product', '0013_alter_technicaldetail_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductListing',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='product.product')),
+                ('name', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('main_price', models.PositiveIntegerField(null=True)),
+                ('main_image', models.ImageField(blank=True, null=True, upload_to='')),
+                ('in_stock', models.BooleanField(default=False)),
+                ('total_number_sold', models.PositiveIntegerField(default=0)),
+                ('view_count', models.PositiveIntegerField(default=0)),
+                ('rating_avg', models.FloatField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('store_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('store_image', models.ImageField(blank=True, null=True, upload_to='')),
+                ('is_valid', models.BooleanField(db_index=True, default=False)),
+                ('is_enabled', models.BooleanField(default=True)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('seller_profile', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='ecom_user_profile.sellerprofile')),
+                ('subcategory', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='product.subcategory')),
+            ],
+        ),
+    ]
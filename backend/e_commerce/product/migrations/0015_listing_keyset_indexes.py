@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ecom_user_profile', '0007_alter_sellerprofile_store_name'),
+        ('product', '0014_productlisting'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_valid', True)), fields=['subcategory', 'created_at', 'product'], name='listing_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_valid', True)), fields=['subcategory', 'main_price', 'product'], name='listing_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_valid', True)), fields=['subcategory', 'view_count', 'product'], name='listing_views_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productlisting',
+            index=models.Index(condition=models.Q(('is_valid', True)), fields=['subcategory', 'total_number_sold', 'product'], name='listing_sold_idx'),
+        ),
+    ]
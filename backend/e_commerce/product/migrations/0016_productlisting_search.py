@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:32
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# The search vector and the GIN indexes are postgres specific, so they are created
+# by raw SQL which is skipped for the other databases.
+SEARCH_VECTOR_SQL = [
+    """
+    ALTER TABLE product_productlisting ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, search_name), 'A')
+        || setweight(to_tsvector('simple'::regconfig, search_document), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX listing_search_vector_idx ON product_productlisting "
+    "USING gin (search_vector)",
+    "CREATE INDEX listing_search_name_trgm_idx ON product_productlisting "
+    "USING gin (search_name gin_trgm_ops)",
+]
+REVERSE_SEARCH_VECTOR_SQL = [
+    "DROP INDEX IF EXISTS listing_search_name_trgm_idx",
+    "ALTER TABLE product_productlisting DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in REVERSE_SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0015_listing_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productlisting',
+            name='search_document',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='productlisting',
+            name='search_name',
+            field=models.CharField(default='', max_length=50),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0016_productlisting_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productvariant',
+            name='is_hot_sku',
+            field=models.BooleanField(default=False, help_text='Reservations are admitted by a Redis counter first, for flash sales.'),
+        ),
+    ]
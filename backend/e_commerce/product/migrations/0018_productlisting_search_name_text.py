@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+# The type of a column used by a generated column can't be altered on postgres,
+# so the search vector (and the trigram index) is dropped and created again
+# around the alteration (refer to `0016_productlisting_search`).
+SEARCH_VECTOR_SQL = [
+    """
+    ALTER TABLE product_productlisting ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple'::regconfig, search_name), 'A')
+        || setweight(to_tsvector('simple'::regconfig, search_document), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX listing_search_vector_idx ON product_productlisting "
+    "USING gin (search_vector)",
+    "CREATE INDEX listing_search_name_trgm_idx ON product_productlisting "
+    "USING gin (search_name gin_trgm_ops)",
+]
+DROP_SEARCH_VECTOR_SQL = [
+    "DROP INDEX IF EXISTS listing_search_name_trgm_idx",
+    "ALTER TABLE product_productlisting DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in DROP_SEARCH_VECTOR_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0017_productvariant_is_hot_sku'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_vector, create_search_vector),
+        migrations.AlterField(
+            model_name='productlisting',
+            name='search_name',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
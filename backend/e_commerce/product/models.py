@@ -93,6 +93,10 @@ class ProductVariant(models.Model):
     )
     number_sold = models.PositiveIntegerField(default=0)
     is_enabled = models.BooleanField(default=True)
+    is_hot_sku = models.BooleanField(
+        default=False,
+        help_text="Reservations are admitted by a Redis counter first, for flash sales.",
+    )
 
     def save(self, *args, **kwargs):
         if self.reserved_stock > self.on_hand_stock:
@@ -170,6 +174,7 @@ class Product(models.Model):
         self.view_count = F("view_count") + 1  # to avoid race condition
         self.save(update_fields=["view_count"])
         self.refresh_from_db(fields=["view_count"])
+        ProductListing.objects.filter(product=self).update(view_count=self.view_count)
 
     def _get_stock_field(self, field: str) -> int:
         return self.variants.aggregate(stock=Sum(F(field))).get(field) or 0
@@ -235,3 +240,66 @@ class TechnicalDetail(models.Model):
     @property
     def owner(self):
         return self.product.owner
+
+
+class ProductListing(models.Model):
+    """
+    A denormalized read model of `Product`, used for serving the product listing
+    endpoint without any joins or aggregations over the variants and reviews.
+
+    Rows are maintained by the write paths of products, variants, reviews and
+    seller profiles (refer to `product.services.listing`), and thus they shouldn't
+    be modified directly.
+    """
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="listing"
+    )
+    name = models.CharField(max_length=50)
+    subcategory = models.ForeignKey(
+        SubCategory, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    owner = models.ForeignKey(
+        EcomUser, on_delete=models.SET_NULL, null=True, related_name="+"
+    )
+    created_at = models.DateTimeField()
+    main_price = models.PositiveIntegerField(null=True)
+    main_image = models.ImageField(null=True, blank=True)
+    in_stock = models.BooleanField(default=False)
+    total_number_sold = models.PositiveIntegerField(default=0)
+    view_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    seller_profile = models.ForeignKey(
+        "ecom_user_profile.SellerProfile",
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+    )
+    store_name = models.CharField(max_length=100, blank=True, null=True)
+    store_image = models.ImageField(blank=True, null=True)
+    is_valid = models.BooleanField(default=False, db_index=True)
+    is_enabled = models.BooleanField(default=True)
+    # normalized texts used for the product search (refer to
+    # `product.services.search`), on postgres, a generated `search_vector`
+    # column is also maintained for these fields.
+    search_name = models.TextField(default="")
+    search_document = models.TextField(default="")
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # composite indexes for keyset pagination of the listing by each
+        # of the ordering fields (refer to `ecom_core.pagination`).
+        indexes = [
+            models.Index(
+                fields=["subcategory", field, "product"],
+                condition=models.Q(is_valid=True),
+                name=f"listing_{name}_idx",
+            )
+            for field, name in (
+                ("created_at", "created"),
+                ("main_price", "price"),
+                ("view_count", "views"),
+                ("total_number_sold", "sold"),
+            )
+        ]
@@ -2,6 +2,8 @@ from .base import (
     BreadcrumbSerializer,
     CategorySerializer,
     FullCategorySerializer,
+    ListingSellerSerializer,
+    ProductListingSerializer,
     ProductListSerializer,
     ProductTagSerializer,
     SellerBriefProfileSerializer,
@@ -18,12 +20,15 @@ from .product_any import (
 from .product_owner import (
     ProductSerializerForOwner,
     ProductVariantSerializerForOwner,
+    ShopProductSerializer,
 )
 
 __all__ = [
     "BreadcrumbSerializer",
     "CategorySerializer",
     "FullCategorySerializer",
+    "ListingSellerSerializer",
+    "ProductListingSerializer",
     "ProductListSerializer",
     "ProductTagSerializer",
     "SellerBriefProfileSerializer",
@@ -36,4 +41,5 @@ __all__ = [
     "ProductVariantSerializerForAny",
     "ProductSerializerForOwner",
     "ProductVariantSerializerForOwner",
+    "ShopProductSerializer",
 ]
@@ -1,3 +1,4 @@
+from django.urls import reverse
 from ecom_user_profile.serializers import SellerBriefProfileSerializer
 from rest_framework import serializers
 
@@ -5,6 +6,7 @@ from product.models import (
     Category,
     MainCategory,
     Product,
+    ProductListing,
     ProductVariantImage,
     SubCategory,
     Tag,
@@ -59,6 +61,38 @@ class ProductListSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "main_price", "main_image", "seller_profile"]
 
 
+class ListingSellerSerializer(serializers.Serializer):
+    """
+    Mirrors `SellerBriefProfileSerializer` by using the denormalized seller
+    fields of a `ProductListing` instance. Only used for representation.
+    """
+
+    store_name = serializers.CharField()
+    store_image = serializers.ImageField()
+    store_url = serializers.SerializerMethodField()
+
+    def get_store_url(self, listing):
+        if not listing.seller_profile_id:
+            return None
+        return reverse(
+            "seller-public-profile", kwargs={"pk": listing.seller_profile_id}
+        )
+
+
+class ProductListingSerializer(serializers.ModelSerializer):
+    """
+    Used for representing a list of products using the `ProductListing` read
+    model, the representation is the same as `ProductListSerializer`.
+    """
+
+    id = serializers.IntegerField(source="product_id", read_only=True)
+    seller_profile = ListingSellerSerializer(read_only=True, source="*")
+
+    class Meta:
+        model = ProductListing
+        fields = ["id", "name", "main_price", "main_image", "seller_profile"]
+
+
 class SubCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = SubCategory
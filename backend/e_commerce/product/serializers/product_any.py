@@ -8,6 +8,7 @@ from product.serializers.base import (
     ProductVariantImageSerializer,
     TechnicalDetailSerializer,
 )
+from product.services.breadcrumb import get_breadcrumb
 
 
 class ProductVariantSerializerForAny(serializers.ModelSerializer):
@@ -27,7 +28,11 @@ class ProductSellerSerializer(serializers.ModelSerializer):
 
 
 class ProductSerializerForAny(serializers.ModelSerializer):
-    "Only used for representation"
+    """
+    Only used for representation. The represented relations should be loaded in
+    advance by `ProductQuerySet.with_detail_relations`, otherwise each of them
+    is queried separately.
+    """
 
     technical_details = TechnicalDetailSerializer(many=True, read_only=True)
     variants = ProductVariantSerializerForAny(many=True, read_only=True)
@@ -53,6 +58,8 @@ class ProductSerializerForAny(serializers.ModelSerializer):
         return ret
 
     def get_rating_avg(self, product_obj):
+        if hasattr(product_obj, "rating_avg"):  # annotated by `with_rating`
+            return product_obj.rating_avg
         return cache.get_or_set(
             f"product:{product_obj.id}:rating_avg",
             lambda: product_obj.reviews.aggregate(avg=Avg("rating"))["avg"] or 0,
@@ -60,6 +67,8 @@ class ProductSerializerForAny(serializers.ModelSerializer):
         )
 
     def get_rating_count(self, product_obj):
+        if hasattr(product_obj, "rating_count"):  # annotated by `with_rating`
+            return product_obj.rating_count
         return cache.get_or_set(
             f"product:{product_obj.id}:rating_count",
             lambda: product_obj.reviews.aggregate(count=Count("id"))["count"] or 0,
@@ -67,8 +76,6 @@ class ProductSerializerForAny(serializers.ModelSerializer):
         )
 
     def get_bread_crumb(self, product_obj):
-        return {
-            "sub_category": product_obj.subcategory.name,
-            "category": product_obj.subcategory.category.name,
-            "main_category": product_obj.subcategory.category.main_category.name,
-        }
+        if product_obj.subcategory_id is None:
+            return None
+        return get_breadcrumb(product_obj.subcategory_id)
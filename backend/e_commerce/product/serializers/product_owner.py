@@ -1,4 +1,3 @@
-from django.core.cache import cache
 from rest_framework import serializers
 
 from product.models import Product, ProductVariant
@@ -6,6 +5,48 @@ from product.serializers.base import (
     ProductVariantImageSerializer,
     TechnicalDetailSerializer,
 )
+from product.services.owner_stats import get_owner_stats
+
+
+class OwnerStatField(serializers.ReadOnlyField):
+    """
+    A read only field which represents one of the product's owner stats, the
+    parent serializer should inherit from `OwnerStatsMixin`.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["source"] = "*"
+        super().__init__(**kwargs)
+
+    def to_representation(self, product):
+        return self.parent.get_owner_stats(product)[self.field_name]
+
+
+class OwnerStatsListSerializer(serializers.ListSerializer):
+    """
+    Fetches the owner stats of all the products in a single call before
+    representing them, rather than once per product.
+    """
+
+    def to_representation(self, data):
+        products = list(data.all() if hasattr(data, "all") else data)
+        owner_stats = self.context.setdefault("owner_stats", {})
+        owner_stats.update(get_owner_stats(product.id for product in products))
+        return super().to_representation(products)
+
+
+class OwnerStatsMixin:
+    """
+    The owner stats are shared between the fields via the serializer context,
+    so that all of them are fetched by a single call (refer to
+    `product.services.owner_stats`).
+    """
+
+    def get_owner_stats(self, product) -> dict:
+        owner_stats = self.context.setdefault("owner_stats", {})
+        if product.id not in owner_stats:
+            owner_stats.update(get_owner_stats([product.id]))
+        return owner_stats[product.id]
 
 
 class ProductVariantSerializerForOwner(serializers.ModelSerializer):
@@ -14,6 +55,7 @@ class ProductVariantSerializerForOwner(serializers.ModelSerializer):
     class Meta:
         model = ProductVariant
         exclude = ["product"]
+        read_only_fields = ["is_hot_sku"]
 
     def create(self, validated_data):
         if not validated_data.get("product"):
@@ -23,7 +65,7 @@ class ProductVariantSerializerForOwner(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ProductSerializerForOwner(serializers.ModelSerializer):
+class ProductSerializerForOwner(OwnerStatsMixin, serializers.ModelSerializer):
     """
     Note that main variant assignment is handled via signals. and the conditional expression
     on the field `is_valid` ensures that as long as either the field `owner` or `main_variant`
@@ -34,21 +76,17 @@ class ProductSerializerForOwner(serializers.ModelSerializer):
         many=True, read_only=True
     )  # creation/update in different serializer
     technical_details = TechnicalDetailSerializer(many=True, read_only=True)
-    on_hand_stock = serializers.IntegerField(source="get_on_hand_stock", read_only=True)
-    reserved_stock = serializers.IntegerField(
-        source="get_reserved_stock", read_only=True
-    )
-    available_stock = serializers.IntegerField(
-        source="get_available_stock", read_only=True
-    )
-    number_sold = serializers.IntegerField(source="get_number_sold", read_only=True)
+    on_hand_stock = OwnerStatField()
+    reserved_stock = OwnerStatField()
+    available_stock = OwnerStatField()
+    number_sold = OwnerStatField()
     main_price = serializers.IntegerField(source="main_variant.price", read_only=True)
     main_image = serializers.ImageField(source="main_variant.image", read_only=True)
-    rating_avg = serializers.SerializerMethodField()
-    rating_count = serializers.SerializerMethodField()
-    total_revenue = serializers.SerializerMethodField()
-    total_orders = serializers.SerializerMethodField()
-    total_units_sold = serializers.SerializerMethodField()
+    rating_avg = OwnerStatField()
+    rating_count = OwnerStatField()
+    total_revenue = OwnerStatField()
+    total_orders = OwnerStatField()
+    total_units_sold = OwnerStatField()
 
     class Meta:
         model = Product
@@ -113,37 +151,45 @@ class ProductSerializerForOwner(serializers.ModelSerializer):
             )
         return tags
 
-    def get_rating_avg(self, product_obj):
-        return cache.get_or_set(
-            f"product:{product_obj.id}:rating_avg",
-            product_obj.get_rating_avg(),
-            10 * 60,
-        )
-
-    def get_rating_count(self, product_obj):
-        return cache.get_or_set(
-            f"product:{product_obj.id}:rating_count",
-            product_obj.get_rating_count(),
-            10 * 60,
-        )
-
-    def get_total_revenue(self, product_obj):
-        return cache.get_or_set(
-            f"product:{product_obj.id}:total_revenue",
-            product_obj.get_total_revenue(),
-            5 * 60,  # 5 mins
-        )
-
-    def get_total_orders(self, product_obj):
-        return cache.get_or_set(
-            f"product:{product_obj.id}:total_orders",
-            product_obj.get_total_orders(),
-            5 * 60,
-        )
-
-    def get_total_units_sold(self, product_obj):
-        return cache.get_or_set(
-            f"product:{product_obj.id}:total_units_sold",
-            product_obj.get_total_units_sold(),
-            5 * 60,
-        )
+
+class ShopProductSerializer(OwnerStatsMixin, serializers.ModelSerializer):
+    """
+    Used for listing the products of a seller along with their stats, the stats of
+    a whole page of products are fetched at once.
+    """
+
+    main_price = serializers.IntegerField(source="main_variant.price", read_only=True)
+    main_image = serializers.ImageField(source="main_variant.image", read_only=True)
+    on_hand_stock = OwnerStatField()
+    reserved_stock = OwnerStatField()
+    available_stock = OwnerStatField()
+    number_sold = OwnerStatField()
+    rating_avg = OwnerStatField()
+    rating_count = OwnerStatField()
+    total_revenue = OwnerStatField()
+    total_orders = OwnerStatField()
+    total_units_sold = OwnerStatField()
+
+    class Meta:
+        model = Product
+        fields = [
+            "id",
+            "name",
+            "created_at",
+            "main_price",
+            "main_image",
+            "is_valid",
+            "is_enabled",
+            "view_count",
+            "on_hand_stock",
+            "reserved_stock",
+            "available_stock",
+            "number_sold",
+            "rating_avg",
+            "rating_count",
+            "total_revenue",
+            "total_orders",
+            "total_units_sold",
+        ]
+        read_only_fields = fields
+        list_serializer_class = OwnerStatsListSerializer
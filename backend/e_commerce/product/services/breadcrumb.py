@@ -0,0 +1,33 @@
+from typing import Optional
+
+from django.core.cache import cache
+
+from product.cache_keys import breadcrumb_cache_key
+from product.models import SubCategory
+
+BREADCRUMB_CACHE_TTL = 60 * 60 * 24  # 1 day
+
+
+def get_breadcrumb(subcategory_id: int) -> Optional[dict]:
+    """
+    Return the breadcrumb of the subcategory from the cache, or build and cache it
+    if it's missing. Returns None if the subcategory doesn't exist.
+    The cache is shared with `SubCategoryBreadCrumb` and invalidated by signals.
+    """
+    # imported here, as the serializers depend on the services of this package.
+    from product.serializers import BreadcrumbSerializer
+
+    cache_key = breadcrumb_cache_key(subcategory_id)
+    breadcrumb = cache.get(cache_key)
+    if breadcrumb:
+        return breadcrumb
+    subcategory = (
+        SubCategory.objects.select_related("category__main_category")
+        .filter(id=subcategory_id)
+        .first()
+    )
+    if subcategory is None:
+        return None
+    breadcrumb = BreadcrumbSerializer(subcategory).data
+    cache.set(cache_key, breadcrumb, BREADCRUMB_CACHE_TTL)
+    return breadcrumb
@@ -0,0 +1,64 @@
+import time
+from functools import partial
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+from product.cache_keys import (
+    product_detail_cache_key,
+    product_detail_version_cache_key,
+)
+
+PRODUCT_DETAIL_CACHE_TTL = 10 * 60  # 10 mins
+# the version outlives the cached responses, so that a response can't be
+# cached under a version which was replaced in the meantime.
+PRODUCT_DETAIL_VERSION_TTL = 60 * 60 * 24  # 1 day
+
+
+def _new_version() -> int:
+    return time.time_ns()
+
+
+def get_product_detail_version(product_id: int) -> int:
+    "Return the current version of the product's cached detail response."
+    key = product_detail_version_cache_key(product_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, PRODUCT_DETAIL_VERSION_TTL):
+            version = cache.get(key, version)
+    return version
+
+
+def get_cached_product_detail(product_id: int, version: int) -> Optional[bytes]:
+    return cache.get(product_detail_cache_key(product_id, version))
+
+
+def cache_product_detail(product_id: int, version: int, body: bytes) -> None:
+    """
+    Cache the rendered detail response of the product, the version should be read
+    by `get_product_detail_version` before the product is fetched.
+    """
+    cache.set(product_detail_cache_key(product_id, version), body, PRODUCT_DETAIL_CACHE_TTL)
+
+
+def invalidate_product_details(product_ids: Iterable[int]) -> None:
+    """
+    Invalidate the cached detail responses of the given products by bumping their
+    versions, the stale responses are left to expire.
+    """
+    version = _new_version()
+    cache.set_many(
+        {product_detail_version_cache_key(product_id): version for product_id in product_ids},
+        PRODUCT_DETAIL_VERSION_TTL,
+    )
+
+
+def invalidate_product_details_on_commit(product_ids: Iterable[int]) -> None:
+    """
+    Invalidate the cached detail responses of the given products once the current
+    transaction is committed, so a response read meanwhile can't be cached under
+    the new version.
+    """
+    transaction.on_commit(partial(invalidate_product_details, list(product_ids)))
@@ -0,0 +1,100 @@
+from typing import Iterable
+
+from django.db import connection
+
+from product.models import Product, ProductListing
+from product.services.search import build_search_fields
+
+# fields of `ProductListing` which are updated on each refresh
+LISTING_UPDATE_FIELDS = [
+    "name",
+    "subcategory",
+    "owner",
+    "created_at",
+    "main_price",
+    "main_image",
+    "in_stock",
+    "total_number_sold",
+    "view_count",
+    "rating_avg",
+    "rating_count",
+    "seller_profile",
+    "store_name",
+    "store_image",
+    "is_valid",
+    "is_enabled",
+    "search_name",
+    "search_document",
+    "refreshed_at",
+]
+
+
+def _build_listing(product: Product) -> ProductListing:
+    seller_profile = getattr(product.owner, "seller_profile", None)
+    return ProductListing(
+        product_id=product.id,
+        name=product.name,
+        subcategory_id=product.subcategory_id,
+        owner_id=product.owner_id,
+        created_at=product.created_at,
+        main_price=product.main_price,
+        main_image=product.main_image or None,
+        in_stock=product.in_stock,
+        total_number_sold=product.total_number_sold or 0,
+        view_count=product.view_count,
+        rating_avg=product.rating_avg,
+        rating_count=product.rating_count,
+        seller_profile=seller_profile,
+        store_name=seller_profile.store_name if seller_profile else None,
+        store_image=seller_profile.store_image if seller_profile else None,
+        is_valid=product.is_valid,
+        is_enabled=product.is_enabled,
+        **build_search_fields(product),
+    )
+
+
+def refresh_product_listings(product_ids: Iterable[int]) -> int:
+    """
+    Recompute the `ProductListing` rows of the given products in a single
+    annotated query, and upsert them in a single statement.
+
+    Should be called by any write path which changes the data represented
+    in the listing, and which bypasses the model signals (such as `bulk_update`
+    or queryset `update` calls on variants).
+    Returns the number of refreshed listings.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+    products = (
+        Product.objects.filter(id__in=product_ids)
+        .select_related("owner__seller_profile")
+        .prefetch_related("tags", "technical_details")
+        .with_in_stock()
+        .with_main_variant_info()
+        .with_total_number_sold()
+        .with_rating()
+    )
+    listings = [_build_listing(product) for product in products]
+    # MySQL doesn't accept a conflict target, the primary key is used implicitly.
+    if connection.features.supports_update_conflicts_with_target:
+        unique_fields = ["product"]
+    else:
+        unique_fields = None
+    ProductListing.objects.bulk_create(
+        listings,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=LISTING_UPDATE_FIELDS,
+    )
+    return len(listings)
+
+
+def refresh_seller_listings(seller_profile) -> int:
+    "Propagate the seller's brief profile to all of the seller's product listings."
+    return ProductListing.objects.filter(owner_id=seller_profile.user_id).update(
+        seller_profile=seller_profile,
+        store_name=seller_profile.store_name,
+        store_image=seller_profile.store_image,
+    )
+
@@ -0,0 +1,93 @@
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Coalesce
+from order.models import Order, OrderItem
+
+from product.cache_keys import owner_stats_cache_key
+from product.models import Product
+
+OWNER_STATS_TTL = 5 * 60  # 5 mins
+
+OWNER_STATS_FIELDS = [
+    "on_hand_stock",
+    "reserved_stock",
+    "available_stock",
+    "number_sold",
+    "rating_avg",
+    "rating_count",
+    "total_revenue",
+    "total_orders",
+    "total_units_sold",
+]
+
+
+def _order_items_subquery(aggregate, **filters) -> Subquery:
+    order_items = (
+        OrderItem.objects.filter(product_variant__product=OuterRef("pk"), **filters)
+        .order_by()
+        .values("product_variant__product")
+        .annotate(result=aggregate)
+        .values("result")
+    )
+    return Coalesce(Subquery(order_items), 0, output_field=BigIntegerField())
+
+
+def compute_owner_stats(product_ids: Iterable[int]) -> dict[int, dict]:
+    """
+    Compute the stats of the given products for their owner in a single query,
+    the variant stocks are aggregated over a join, and the rating and the order
+    stats are computed by correlated subqueries.
+    """
+    products = (
+        Product.objects.filter(id__in=product_ids)
+        .with_rating()
+        .annotate(
+            on_hand_stock=Coalesce(Sum("variants__on_hand_stock"), 0),
+            reserved_stock=Coalesce(Sum("variants__reserved_stock"), 0),
+            available_stock=Coalesce(Sum("variants__available_stock"), 0),
+            number_sold=Coalesce(Sum("variants__number_sold"), 0),
+            total_revenue=_order_items_subquery(
+                Sum(F("quantity") * F("submitted_price")),
+                order__seller=OuterRef("owner"),
+                order__status__in=[Order.COMPLETED, Order.DELIVERED],
+            ),
+            total_orders=_order_items_subquery(Count("order", distinct=True)),
+            total_units_sold=_order_items_subquery(
+                Sum("quantity", output_field=IntegerField())
+            ),
+        )
+        .values("id", *OWNER_STATS_FIELDS)
+    )
+    return {stats.pop("id"): stats for stats in products}
+
+
+def get_owner_stats(product_ids: Iterable[int]) -> dict[int, dict]:
+    """
+    Return the owner stats of the given products mapped by their id. The stats of
+    each product are cached as a single bundle, and the stats of the products
+    missing from the cache are computed together (refer to `compute_owner_stats`).
+    """
+    product_ids = list(dict.fromkeys(product_ids))
+    keys = {owner_stats_cache_key(product_id): product_id for product_id in product_ids}
+    cached = cache.get_many(keys.keys())
+    owner_stats = {keys[key]: stats for key, stats in cached.items()}
+
+    missing_ids = [product_id for product_id in product_ids if product_id not in owner_stats]
+    if missing_ids:
+        computed = compute_owner_stats(missing_ids)
+        cache.set_many(
+            {owner_stats_cache_key(product_id): stats for product_id, stats in computed.items()},
+            OWNER_STATS_TTL,
+        )
+        owner_stats.update(computed)
+    return owner_stats
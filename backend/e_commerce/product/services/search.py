@@ -0,0 +1,120 @@
+import re
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import F, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from product.models import Product, ProductListing
+
+# text search configuration used for building and querying the search vectors,
+# 'simple' is used since postgres doesn't ship a persian stemmer.
+SEARCH_CONFIG = "simple"
+
+_PERSIAN_TRANSLATION = str.maketrans(
+    {
+        # arabic letters unified to their persian counterparts
+        "\u064a": "\u06cc",  # ي -> ی
+        "\u0649": "\u06cc",  # ى -> ی
+        "\u0643": "\u06a9",  # ك -> ک
+        "\u0629": "\u0647",  # ة -> ه
+        "\u06c0": "\u0647",  # ۀ -> ه
+        "\u0623": "\u0627",  # أ -> ا
+        "\u0625": "\u0627",  # إ -> ا
+        "\u0624": "\u0648",  # ؤ -> و
+        # zero width non-joiner and other zero width characters separate words
+        "\u200c": " ",
+        "\u200b": " ",
+        "\u200d": " ",
+        "\ufeff": " ",
+        # tatweel
+        "\u0640": None,
+        # persian and arabic-indic digits
+        **{chr(0x06F0 + i): str(i) for i in range(10)},
+        **{chr(0x0660 + i): str(i) for i in range(10)},
+    }
+)
+# arabic diacritics (harakat) and the superscript alef
+_DIACRITICS_PATTERN = re.compile("[\u064b-\u065f\u0670]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_search_text(text: str) -> str:
+    """
+    Normalize the given text for indexing and querying, so that the different
+    ways of typing the same persian word (arabic yeh and kaf, diacritics,
+    ZWNJ or space between the parts of a word, persian digits) match each other.
+    """
+    text = _DIACRITICS_PATTERN.sub("", text.translate(_PERSIAN_TRANSLATION))
+    return _WHITESPACE_PATTERN.sub(" ", text).strip().casefold()
+
+
+def build_search_fields(product: Product) -> dict[str, str]:
+    """
+    Return the normalized search fields of the product's listing, the tags and the
+    technical details of the product are expected to be prefetched.
+    """
+    document = [product.description]
+    document.extend(tag.name for tag in product.tags.all())
+    document.extend(detail.value for detail in product.technical_details.all())
+    return {
+        "search_name": normalize_search_text(product.name),
+        "search_document": normalize_search_text(" ".join(document)),
+    }
+
+
+def _build_tsquery(tokens: list[str]) -> SearchQuery:
+    # the tokens only contain word characters, so they are safe for a raw tsquery.
+    # The last token is matched as a prefix as it might not be completely typed.
+    terms = [*tokens[:-1], f"{tokens[-1]}:*"]
+    return SearchQuery(" & ".join(terms), config=SEARCH_CONFIG, search_type="raw")
+
+
+def _search_vector() -> RawSQL:
+    # `search_vector` is a generated column which only exists on postgres, and
+    # isn't declared on the model (refer to migration 0016 of product).
+    table = connection.ops.quote_name(ProductListing._meta.db_table)
+    column = connection.ops.quote_name("search_vector")
+    return RawSQL(f"{table}.{column}", [], output_field=SearchVectorField())
+
+
+def search_listings(queryset: QuerySet, term: str, order: bool = True) -> QuerySet:
+    """
+    Filter the given `ProductListing` queryset by the search term.
+
+    On postgres, listings are matched by the full text search vector (name,
+    description, tags and technical details), or by trigram word similarity of
+    their name for tolerating typos. The matches are annotated by `search_score`,
+    and ordered by it if `order` is true.
+    On the other databases, every word of the term should be contained within
+    the listing's search document.
+    """
+    normalized = normalize_search_text(term)
+    tokens = _TOKEN_PATTERN.findall(normalized)
+    if not tokens:
+        return queryset
+    if connection.vendor != "postgresql":
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(search_name__contains=token) | Q(search_document__contains=token)
+            )
+        return queryset
+
+    query = _build_tsquery(tokens)
+    queryset = (
+        queryset.alias(search_vector=_search_vector())
+        .filter(Q(search_vector=query) | Q(search_name__trigram_word_similar=normalized))
+        .annotate(
+            search_score=SearchRank(F("search_vector"), query)
+            + TrigramWordSimilarity(normalized, "search_name")
+        )
+    )
+    if order:
+        queryset = queryset.order_by("-search_score", "-pk")
+    return queryset
@@ -2,15 +2,27 @@ import logging
 
 from django.core.cache import cache
 from django.db import transaction
-from django.db.models.signals import post_delete, post_save, pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from ecom_user_profile.models import SellerProfile
 
 from .cache_keys import (
     FULLCATEGORIES_CACHE_KEY,
     SUBCATEGORIES_CACHE_KEY,
     breadcrumb_cache_key,
 )
-from .models import Category, MainCategory, ProductVariant, SubCategory
+from .models import (
+    Category,
+    MainCategory,
+    Product,
+    ProductVariant,
+    ProductVariantImage,
+    SubCategory,
+    Tag,
+    TechnicalDetail,
+)
+from .services.detail_cache import invalidate_product_details_on_commit
+from .services.listing import refresh_product_listings, refresh_seller_listings
 
 logger = logging.getLogger("django")
 
@@ -56,3 +68,99 @@ def invalidate_full_category_cache(sender, instance, **kwargs):
         f"Cache invalidated for full category by model {sender.__name__} with ID {instance.id}"
     )
     cache.delete(FULLCATEGORIES_CACHE_KEY)
+
+
+# The following receivers keep the `ProductListing` read model in sync, note that
+# they should stay registered after the main variant assignment receivers.
+
+
+@receiver(post_save, sender=Product)
+def refresh_listing_on_product_save(sender, instance, **kwargs):
+    refresh_product_listings([instance.id])
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+def refresh_listing_on_variant_change(sender, instance, **kwargs):
+    refresh_product_listings([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=TechnicalDetail)
+def refresh_listing_on_technical_detail_change(sender, instance, **kwargs):
+    refresh_product_listings([instance.product_id])
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def refresh_listing_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_product_listings([instance.id])
+    elif pk_set:
+        refresh_product_listings(pk_set)
+    # for a cleared tag, its products aren't known anymore after the clear.
+
+
+@receiver(post_save, sender=Tag)
+def refresh_listing_on_tag_save(sender, instance, created, **kwargs):
+    if not created:
+        refresh_product_listings(instance.products.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=SellerProfile)
+def refresh_listing_on_seller_profile_save(sender, instance, created, **kwargs):
+    if not created:
+        refresh_seller_listings(instance)
+
+
+# The following receivers invalidate the cached detail responses of the products
+# (refer to `product.services.detail_cache`), once the write is committed.
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_detail_on_product_change(sender, instance, **kwargs):
+    invalidate_product_details_on_commit([instance.id])
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=TechnicalDetail)
+def invalidate_detail_on_product_relation_change(sender, instance, **kwargs):
+    invalidate_product_details_on_commit([instance.product_id])
+
+
+@receiver([post_save, post_delete], sender=ProductVariantImage)
+def invalidate_detail_on_variant_image_change(sender, instance, **kwargs):
+    product_ids = ProductVariant.objects.filter(
+        id=instance.product_variant_id
+    ).values_list("product_id", flat=True)
+    invalidate_product_details_on_commit(product_ids)
+
+
+@receiver(m2m_changed, sender=Product.tags.through)
+def invalidate_detail_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        invalidate_product_details_on_commit([instance.id])
+    elif pk_set:
+        invalidate_product_details_on_commit(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def invalidate_detail_on_tag_save(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_product_details_on_commit(instance.products.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=SubCategory)
+def invalidate_detail_on_subcategory_save(sender, instance, created, **kwargs):
+    # the breadcrumb of the subcategory is embedded in the responses
+    if not created:
+        invalidate_product_details_on_commit(instance.products.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=SellerProfile)
+def invalidate_detail_on_seller_profile_save(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_product_details_on_commit(
+            Product.objects.filter(owner_id=instance.user_id).values_list("id", flat=True)
+        )
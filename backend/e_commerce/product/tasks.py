@@ -0,0 +1,19 @@
+from celery import shared_task
+
+from product.services.listing import refresh_product_listings
+from product.services.view_count import flush_view_counts
+
+
+@shared_task
+def flush_product_view_counts() -> int:
+    """
+    Write the view counts buffered in Redis to the products, meant to be
+    scheduled periodically by celery beat.
+    """
+    return flush_view_counts()
+
+
+@shared_task
+def refresh_listings(product_ids: list[int]) -> int:
+    "Refresh the listings of the given products, dispatched by the write paths."
+    return refresh_product_listings(product_ids)
@@ -2,9 +2,18 @@ import pytest
 from django.core.cache import cache
 from django.urls import reverse
 from ecom_user.models import EcomUser
+from feedback.tests.feedback_factory import ProductReviewFactory
 from rest_framework.test import APIClient
 
-from product.models import Product, ProductVariant, TechnicalDetail
+from product.models import (
+    Product,
+    ProductListing,
+    ProductVariant,
+    ProductVariantImage,
+    Tag,
+    TechnicalDetail,
+)
+from product.services.view_count import flush_view_counts, get_pending_view_count
 
 # ---------------
 #    Fixtures
@@ -106,20 +115,23 @@ def test_seller_can_update_owned_product(
 def test_product_view_count_increases_on_view(
     api_client_with_seller_credentials, product_instance_factory
 ):
-    client_ip = "127.0.0.1"  # default ip used by APIClient
-    redis_client = cache.client.get_client()
+    client_ip = "127.0.0.1"
     product = product_instance_factory()
     url = reverse("product-detail", args=[product.id])
-    response = api_client_with_seller_credentials.get(url)
-    assert response.status_code == 200
+    for _ in range(2):  # the same client is only counted once
+        response = api_client_with_seller_credentials.get(url, {"user_ip": client_ip})
+        assert response.status_code == 200
 
-    # check to see if the cache key has been created for tracking
-    redis_key = f"product:{product.id}:ip:{client_ip}"
-    assert redis_client.exists(redis_key) == 1
+    # the view is buffered in redis until it is flushed
+    assert get_pending_view_count(product.id) == 1
+    product.refresh_from_db(fields=["view_count"])
+    assert product.view_count == 0
 
-    # check to see if the view count has increased
-    product = Product.objects.get(id=product.id)
+    assert flush_view_counts() == 1
+    assert get_pending_view_count(product.id) == 0
+    product.refresh_from_db(fields=["view_count"])
     assert product.view_count == 1
+    assert ProductListing.objects.get(product=product).view_count == 1
 
 
 @pytest.mark.django_db
@@ -294,3 +306,68 @@ def test_technical_list_create(
         obj_attribute = techincal_details[i].attribute
         obj_value = techincal_details[i].value
         assert {obj_attribute: obj_value} == {response_attribute: response_value}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("as_owner", [False, True])
+def test_product_detail_query_count(
+    django_assert_num_queries,
+    api_client_with_customer_credentials,
+    api_client_with_seller_credentials,
+    product_instance_factory,
+    as_owner,
+):
+    product = product_instance_factory()
+    for variant in product.variants.all():
+        ProductVariantImage.objects.create(product_variant=variant, image="image.jpg")
+    if as_owner:
+        api_client = api_client_with_seller_credentials
+    else:  # the responses for anonymous users are cached
+        api_client = api_client_with_customer_credentials
+    url = reverse("product-detail", args=[product.id])
+    api_client.get(url)  # warms up the breadcrumb and the owner stats caches
+
+    # product (with owner, subcategory and rating), variants, variant images,
+    # technical details and tags
+    with django_assert_num_queries(5):
+        response = api_client.get(url)
+    assert response.status_code == 200
+    assert len(response.data["variants"]) == product.variants.count()
+    assert len(response.data["technical_details"]) == product.technical_details.count()
+
+
+@pytest.mark.django_db
+def test_anonymous_product_detail_response_is_cached(
+    django_assert_num_queries, django_capture_on_commit_callbacks, product_instance_factory
+):
+    product = product_instance_factory()
+    api_client = APIClient()
+    url = reverse("product-detail", args=[product.id])
+    first_response = api_client.get(url)
+    assert first_response.status_code == 200
+
+    with django_assert_num_queries(0):
+        cached_response = api_client.get(url)
+    assert cached_response.status_code == 200
+    assert cached_response.content == first_response.content
+    assert cached_response.json()["name"] == product.name
+
+    # writes to the product and its related objects invalidate the response
+    variant = product.variants.first()
+    variant.price = 12345
+    with django_capture_on_commit_callbacks(execute=True):
+        variant.save()
+    response = api_client.get(url)
+    prices = [variant["price"] for variant in response.json()["variants"]]
+    assert 12345 in prices
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product.tags.add(Tag.objects.create(name="new tag"))
+    assert "new tag" in api_client.get(url).json()["tags"]
+
+    # the rating is embedded in the response as well
+    rating_count = api_client.get(url).json()["rating_count"]
+    with django_capture_on_commit_callbacks(execute=True):
+        ProductReviewFactory(product=product, rating=5)
+    assert api_client.get(url).json()["rating_count"] == rating_count + 1
+
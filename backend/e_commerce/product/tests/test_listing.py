@@ -0,0 +1,64 @@
+import pytest
+from django.urls import reverse
+from feedback.tests.feedback_factory import ProductReviewFactory
+from rest_framework.test import APIClient
+
+from product.models import ProductListing
+from product.services.listing import refresh_product_listings
+from product.tests.product_factory import ProductFactory, ProductVariantFactory
+
+
+@pytest.mark.django_db
+def test_listing_is_created_with_product_variants():
+    product = ProductFactory()
+    variant = ProductVariantFactory(product=product, on_hand_stock=10)
+    ProductVariantFactory(product=product, on_hand_stock=0)
+
+    listing = ProductListing.objects.get(product=product)
+    assert listing.is_valid
+    assert listing.main_price == variant.price
+    assert listing.in_stock
+    assert listing.subcategory_id == product.subcategory_id
+    assert listing.seller_profile_id == product.owner.seller_profile.id
+
+
+@pytest.mark.django_db
+def test_listing_tracks_stock_and_reviews():
+    product = ProductFactory()
+    variant = ProductVariantFactory(product=product, on_hand_stock=5)
+    ProductReviewFactory.create_batch(2, product=product, rating=4)
+
+    listing = ProductListing.objects.get(product=product)
+    assert listing.rating_count == 2
+    assert listing.rating_avg == 4
+
+    # stock changes which bypass the model signals require an explicit refresh
+    type(variant).objects.filter(id=variant.id).update(on_hand_stock=0)
+    refresh_product_listings([product.id])
+    listing.refresh_from_db()
+    assert not listing.in_stock
+
+
+@pytest.mark.django_db
+def test_product_list_is_served_from_listing(django_assert_num_queries):
+    product = ProductFactory()
+    ProductVariantFactory(product=product)
+    url = reverse("product-list")
+
+    # one query for the count and one for the page
+    with django_assert_num_queries(2):
+        response = APIClient().get(url, data={"subcategory": product.subcategory_id})
+    assert response.status_code == 200
+    assert response.data["results"][0]["id"] == product.id
+    assert response.data["results"][0]["seller_profile"]["store_url"]
+
+
+@pytest.mark.django_db
+def test_listing_search_name_isnt_limited_to_the_name_length():
+    # casefolding can make the name longer than the product's name field
+    product = ProductFactory(name="ß" * 50)
+    ProductVariantFactory(product=product)
+
+    listing = ProductListing.objects.get(product=product)
+    assert listing.search_name == "ss" * 50
+    assert ProductListing._meta.get_field("search_name").max_length is None
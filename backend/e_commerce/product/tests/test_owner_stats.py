@@ -0,0 +1,86 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from feedback.tests.feedback_factory import ProductReviewFactory
+from order.models import Order
+from order.tests.order_factory import OrderFactory, OrderItemFactory
+from rest_framework.test import APIClient
+
+from product.services.owner_stats import compute_owner_stats, get_owner_stats
+from product.tests.product_factory import ProductFactory, ProductVariantFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_owner_stats_are_computed_in_one_query(django_assert_num_queries):
+    product = ProductFactory()
+    variant = ProductVariantFactory(
+        product=product, on_hand_stock=10, reserved_stock=3, number_sold=4
+    )
+    ProductVariantFactory(product=product, on_hand_stock=5, number_sold=1)
+    ProductReviewFactory.create_batch(2, product=product, rating=3)
+    completed_order = OrderFactory(seller=product.owner, status=Order.COMPLETED)
+    OrderItemFactory(
+        order=completed_order, product_variant=variant, quantity=2, submitted_price=100
+    )
+    OrderItemFactory(
+        order=OrderFactory(seller=product.owner, status=Order.PAID),
+        product_variant=variant,
+        quantity=1,
+        submitted_price=100,
+    )
+
+    with django_assert_num_queries(1):
+        stats = compute_owner_stats([product.id])[product.id]
+    assert stats == {
+        "on_hand_stock": 15,
+        "reserved_stock": 3,
+        "available_stock": 12,
+        "number_sold": 5,
+        "rating_avg": 3,
+        "rating_count": 2,
+        "total_revenue": 200,  # only completed and delivered orders
+        "total_orders": 2,
+        "total_units_sold": 3,
+    }
+
+
+@pytest.mark.django_db
+def test_owner_stats_are_cached_as_a_bundle(django_assert_num_queries):
+    product = ProductFactory()
+    ProductVariantFactory(product=product)
+    stats = get_owner_stats([product.id])
+    with django_assert_num_queries(0):
+        assert get_owner_stats([product.id]) == stats
+
+
+@pytest.mark.django_db
+def test_shop_product_list_queries_dont_grow_with_page_size():
+    seller = ProductFactory().owner
+    api_client = APIClient()
+    api_client.force_authenticate(user=seller)
+    url = reverse("shop-product-list")
+
+    def count_list_queries():
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries), len(response.data["results"])
+
+    for _ in range(2):
+        ProductVariantFactory(product=ProductFactory(owner=seller))
+    queries_for_few, _ = count_list_queries()
+    for _ in range(5):
+        ProductVariantFactory(product=ProductFactory(owner=seller))
+    queries_for_many, listed = count_list_queries()
+    assert listed == 8
+    assert queries_for_many == queries_for_few
@@ -0,0 +1,103 @@
+import json
+from base64 import b64encode
+
+import pytest
+from django.urls import reverse
+from ecom_core.pagination import KeysetPagination
+from ecom_user.models import EcomUser
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from product.models import Product, ProductVariant
+
+
+@pytest.fixture
+def products_factory(subcategory_obj):
+    def create_products(number_of_products: int = 25):
+        user = EcomUser.objects.create_user(phone="09377964142")
+        products = []
+        for i in range(number_of_products):
+            product = Product.objects.create(
+                owner=user, name=f"Product {i}", subcategory=subcategory_obj
+            )
+            ProductVariant.objects.create(
+                product=product, name="variant", price=100 * (i % 5 + 1), on_hand_stock=5
+            )
+            products.append(product)
+        return products
+
+    return create_products
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", ["-created_at", "main_price", "-main_price"])
+def test_product_list_cursor_pagination_visits_each_product_once(
+    products_factory, subcategory_obj, ordering
+):
+    api_client = APIClient()
+    products = products_factory()
+    url = reverse("product-list")
+    response = api_client.get(
+        url,
+        data={
+            "subcategory": subcategory_obj.id,
+            "pagination": "cursor",
+            "ordering": ordering,
+        },
+    )
+    seen_ids = []
+    pages = 0
+    while True:
+        assert response.status_code == 200
+        assert "count" not in response.data
+        pages += 1
+        seen_ids.extend(product["id"] for product in response.data["results"])
+        if not response.data["next"]:
+            break
+        response = api_client.get(response.data["next"])
+    assert pages > 1
+    assert sorted(seen_ids) == sorted(product.id for product in products)
+
+
+@pytest.mark.django_db
+def test_product_list_cursor_pagination_previous_link(products_factory, subcategory_obj):
+    api_client = APIClient()
+    products_factory()
+    url = reverse("product-list")
+    first_page = api_client.get(
+        url, data={"subcategory": subcategory_obj.id, "pagination": "cursor"}
+    )
+    assert first_page.status_code == 200
+    assert first_page.data["previous"] is None
+    second_page = api_client.get(first_page.data["next"])
+    previous_page = api_client.get(second_page.data["previous"])
+    assert previous_page.status_code == 200
+    assert previous_page.data["results"] == first_page.data["results"]
+
+
+@pytest.mark.django_db
+def test_product_list_invalid_cursor(subcategory_obj):
+    api_client = APIClient()
+    response = api_client.get(
+        reverse("product-list"),
+        data={"subcategory": subcategory_obj.id, "cursor": "invalid"},
+    )
+    assert response.status_code == 404
+
+
+def cursor_request(position) -> Request:
+    encoded = b64encode(json.dumps(position).encode()).decode()
+    return Request(APIRequestFactory().get("/", {"cursor": encoded}))
+
+
+@pytest.mark.parametrize("value", [[1, 2], {"a": 1}])
+def test_decode_cursor_rejects_non_scalar_values(value):
+    with pytest.raises(NotFound):
+        KeysetPagination().decode_cursor(cursor_request({"v": value, "p": 1, "r": 0}))
+
+
+@pytest.mark.parametrize("value", ["name", 10, 9.5, None])
+def test_decode_cursor_accepts_scalar_values(value):
+    cursor = KeysetPagination().decode_cursor(cursor_request({"v": value, "p": 1, "r": 0}))
+    assert cursor == {"v": value, "p": 1, "r": False}
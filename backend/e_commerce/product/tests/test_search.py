@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from product.models import Tag, TechnicalDetail
+from product.services.search import normalize_search_text
+from product.tests.product_factory import ProductFactory, ProductVariantFactory
+
+
+@pytest.fixture
+def searchable_product_factory():
+    def create_product(**kwargs):
+        product = ProductFactory(**kwargs)
+        ProductVariantFactory(product=product)
+        return product
+
+    return create_product
+
+
+def search(subcategory_id, term, **params):
+    url = reverse("product-list")
+    data = {"subcategory": subcategory_id, "search": term, **params}
+    response = APIClient().get(url, data=data)
+    assert response.status_code == 200
+    return [product["id"] for product in response.data["results"]]
+
+
+def test_normalize_search_text():
+    # arabic yeh and kaf, ZWNJ, tatweel, diacritics and persian digits
+    assert normalize_search_text("كيف\u200cها") == "کیف ها"
+    assert normalize_search_text("مـــاوس") == "ماوس"
+    assert normalize_search_text("ک\u064fت ۴۲") == "کت 42"
+    assert normalize_search_text("  Gaming   MOUSE ") == "gaming mouse"
+
+
+@pytest.mark.django_db
+def test_search_matches_name_tags_and_technical_details(searchable_product_factory):
+    product = searchable_product_factory(name="کیف چرمی", description="")
+    other = searchable_product_factory(
+        name="Office chair", description="", subcategory=product.subcategory
+    )
+    subcategory_id = product.subcategory_id
+
+    # arabic yeh and kaf in the search term
+    assert search(subcategory_id, "كيف") == [product.id]
+
+    product.tags.add(Tag.objects.create(name="leather"))
+    assert search(subcategory_id, "leather") == [product.id]
+
+    TechnicalDetail.objects.create(product=other, attribute="material", value="mesh")
+    assert search(subcategory_id, "mesh") == [other.id]
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "postgresql", reason="requires postgres full text search"
+)
+def test_search_tolerates_typos_and_orders_by_relevance(searchable_product_factory):
+    best = searchable_product_factory(name="Wireless mouse", description="")
+    other = searchable_product_factory(
+        name="Mouse pad",
+        description="a pad for any wireless mouse",
+        subcategory=best.subcategory,
+    )
+    subcategory_id = best.subcategory_id
+
+    assert search(subcategory_id, "wireless mouse") == [best.id, other.id]
+    assert best.id in search(subcategory_id, "wireles")
@@ -5,6 +5,7 @@ from product import views
 urlpatterns = [
     path("<int:pk>/", views.ProductDetail.as_view(), name="product-detail"),
     path("", views.ProductList.as_view(), name="product-list"),
+    path("shop/", views.ShopProductList.as_view(), name="shop-product-list"),
     path(
         "<int:product_pk>/variants/",
         views.ProductVariantList.as_view(),
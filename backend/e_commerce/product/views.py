@@ -1,8 +1,11 @@
 import logging
 
 from django.core.cache import cache
+from django.http import HttpResponse
 from django_filters import rest_framework as filters
+from ecom_core.pagination import KeysetOrPageNumberPagination
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import (
     ListAPIView,
@@ -11,18 +14,18 @@ from rest_framework.generics import (
     RetrieveUpdateDestroyAPIView,
     get_object_or_404,
 )
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
 from product.cache_keys import (
     FULLCATEGORIES_CACHE_KEY,
     SUBCATEGORIES_CACHE_KEY,
-    breadcrumb_cache_key,
 )
 from product.filters import ProductFilter
 from product.models import (
     MainCategory,
     Product,
+    ProductListing,
     ProductVariant,
     SubCategory,
     TechnicalDetail,
@@ -31,13 +34,22 @@ from product.permissions import IsOwnerOrReadOnly, IsSellerVerified
 from product.serializers import (
     BreadcrumbSerializer,
     FullCategorySerializer,
+    ProductListingSerializer,
     ProductListSerializer,
     ProductSerializerForAny,
     ProductSerializerForOwner,
     ProductVariantSerializerForOwner,
+    ShopProductSerializer,
     SubCategorySerializer,
     TechnicalDetailSerializer,
 )
+from product.services.breadcrumb import get_breadcrumb
+from product.services.detail_cache import (
+    cache_product_detail,
+    get_cached_product_detail,
+    get_product_detail_version,
+)
+from product.services.view_count import record_product_view
 
 logger = logging.getLogger("order")
 
@@ -46,24 +58,26 @@ class ProductList(ListCreateAPIView):
     """
     GET method:
     Providing a subcategory via query parameter in the URL is required.
-    ordering field options: main_price, rating, created_at, view_count.
+    The products are served from the `ProductListing` read model.
+    ordering field options: main_price, rating_avg, created_at, view_count,
+    in_stock, total_number_sold.
     if you want the ordering to be descending, use - in front of the field.
     example: ?ordering=-view_count
     tags provided by the query parameter should be seperated by comma.
     example: ?tags=tag1,tag2
+    ?search= matches the name, description, tags and technical details of the
+    products, and orders the results by relevance if no ordering is provided.
+    For infinite scrolling, use keyset pagination via ?pagination=cursor and
+    follow the 'next' links.
     POST method:
     Only for authenticated users and admins. users also should have their
     seller profile verified, otherwise, they will get a 403 error.
     """
 
     permission_classes = [IsSellerVerified]
-    queryset = (
-        Product.objects.filter(is_valid=True)
-        .with_in_stock()
-        .with_main_variant_info()
-        .with_total_number_sold()
-    )
+    queryset = ProductListing.objects.filter(is_valid=True)
     serializer_class = ProductListSerializer
+    pagination_class = KeysetOrPageNumberPagination
     filter_backends = [OrderingFilter, filters.DjangoFilterBackend]
     filterset_class = ProductFilter
     ordering_fields = [
@@ -72,9 +86,15 @@ class ProductList(ListCreateAPIView):
         "view_count",
         "in_stock",
         "total_number_sold",
+        "rating_avg",
     ]
     ordering = ["-created_at", "in_stock"]
 
+    def get_serializer_class(self):
+        if self.request.method == "GET":
+            return ProductListingSerializer
+        return super().get_serializer_class()
+
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
@@ -84,6 +104,11 @@ class ProductDetail(RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
     _cached_object = None
 
+    def get_queryset(self):
+        if self.request.method == "GET":
+            return Product.objects.all().with_detail_relations()
+        return super().get_queryset()
+
     def get_object(self):
         if not self._cached_object:
             self._cached_object = super().get_object()
@@ -98,25 +123,37 @@ class ProductDetail(RetrieveUpdateDestroyAPIView):
 
     def get(self, request, *args, **kwargs):
         """
-        Upon calling, the view count of a product increases
-        with the constraint of having a cooldown period of
-        one day for each client, which is handled by caching the client's IP.
+        Upon calling, the view count of a product increases, each client's IP
+        is counted once per day. The views are buffered in Redis and written
+        to the product periodically (refer to `product.services.view_count`).
+
+        The rendered responses for anonymous users are cached, and invalidated
+        by the signals on writes to the product and its related objects.
         """
         user_ip = request.query_params.get("user_ip")
-        product_obj = self.get_object()
-        serializer = self.get_serializer(product_obj)
-        if not user_ip:
-            return Response(serializer.data)
-        self._cache_client_ip(product_obj, user_ip)
-        return Response(serializer.data)
-
-    def _cache_client_ip(self, product_obj, user_ip):
-        redis_key = f"product:{product_obj.id}:ip:{user_ip}"
-        redis_client = cache.client.get_client()
-        if redis_client.exists(redis_key) == 0:
-            product_obj.increase_view_count()
-            cooldown_period = 3600 * 24  # one hour in seconds * number of hours
-            redis_client.setex(redis_key, cooldown_period, 1)  # 1 is a dummy value
+        if request.user.is_authenticated or request.accepted_renderer.format != "json":
+            product_obj = self.get_object()
+            serializer = self.get_serializer(product_obj)
+            response = Response(serializer.data)
+        else:
+            response = self._get_cached_response()
+        if user_ip:
+            record_product_view(self.kwargs[self.lookup_field], user_ip)
+        return response
+
+    def _get_cached_response(self):
+        product_id = self.kwargs[self.lookup_field]
+        # the version is read before fetching the product, so that a concurrent
+        # write can't leave its stale response cached under the new version.
+        version = get_product_detail_version(product_id)
+        body = get_cached_product_detail(product_id, version)
+        if body is None:
+            serializer = self.get_serializer(self.get_object())
+            body = self.request.accepted_renderer.render(
+                serializer.data, renderer_context=self.get_renderer_context()
+            )
+            cache_product_detail(product_id, version, body)
+        return HttpResponse(body, content_type=self.request.accepted_renderer.media_type)
 
 
 class ProductVariantDetail(RetrieveUpdateDestroyAPIView):
@@ -182,14 +219,19 @@ class ProductTechnicalInfoList(ListCreateAPIView):
 
 
 class ShopProductList(ListAPIView):
-    "Lists all products belonging to current authenticated seller"
+    """
+    Lists all products belonging to current authenticated seller, along with
+    the stats of each product (stocks, rating, revenue, orders and units sold).
+    """
 
-    permission_classes = [IsSellerVerified]
-    queryset = Product.objects.all()
-    serializer_class = ProductListSerializer
+    permission_classes = [IsAuthenticated, IsSellerVerified]
+    queryset = Product.objects.select_related("main_variant")
+    serializer_class = ShopProductSerializer
 
     def get_queryset(self):
-        return super().get_queryset().filter(owner=self.request.user)
+        return (
+            super().get_queryset().filter(owner=self.request.user).order_by("-created_at")
+        )
 
 
 class SubcategoryList(ListAPIView):
@@ -241,10 +283,7 @@ class SubCategoryBreadCrumb(RetrieveAPIView):
     serializer_class = BreadcrumbSerializer
 
     def retrieve(self, request, *args, **kwargs):
-        cache_key = breadcrumb_cache_key(self.kwargs[self.lookup_field])
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return Response(cached_data)
-        response = super().retrieve(request, *args, **kwargs)
-        cache.set(cache_key, response.data, 60 * 60 * 24)  # 1 day
-        return response
+        breadcrumb = get_breadcrumb(self.kwargs[self.lookup_field])
+        if breadcrumb is None:
+            raise NotFound()
+        return Response(breadcrumb)